@@ -1,26 +1,54 @@
 import streamlit as st
 import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
+
+from mdex.dataset import tasting_data
+from mdex.ingest import BLANK_ATTR, read_tasting_file
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.store import default_store, session_dataset
 
 st.set_page_config(page_title="Catación de Café — EDA", layout="wide")
+perf = session_profiler(st.session_state, "SensoryLab")
 
 st.title(" EDA — Dataset de Catadores de Café")
 
-# Inicializar df
-if "df" not in st.session_state:
-    st.session_state.df = None
-
 # Subir archivo
-file = st.file_uploader("Sube tu archivo CSV", type="csv")
+file = st.file_uploader("Sube tu archivo de cata", type=["csv", "parquet", "feather"])
 
 if file:
-    st.session_state.df = pd.read_csv(file)
-    st.success("Archivo cargado correctamente")
-    st.dataframe(st.session_state.df.head())
-
-df = st.session_state.df
+    # Streamlit re-ejecuta el script en cada interacción: solo se lee de nuevo
+    # si se subió otro archivo. ``file_id`` cambia en cada subida, también al
+    # corregir un CSV sin cambiar su nombre ni su tamaño
+    file_key = file.file_id
+    if st.session_state.get("archivo") != file_key:
+        # La sesión guarda solo un handle; el almacén comparte una única copia
+        # entre todas las sesiones que suben el mismo contenido, y un archivo
+        # que otra sesión ya subió no se vuelve a leer
+        try:
+            with stage("lectura_archivo"):
+                st.session_state.dataset = default_store().put_upload(file, read_tasting_file)
+        except ValueError as e:
+            st.error(str(e))
+            perf_panel(perf)
+            st.stop()
+        nuevo = st.session_state.dataset.frame()
+        # Códigos enteros, puntajes float32 y grupos por catador/variedad: se
+        # codifica una sola vez y todas las páginas reutilizan el resultado
+        with stage("codificacion"):
+            tasting_data(nuevo)
+        st.session_state.archivo = file_key
+        st.session_state.sin_puntaje = nuevo.attrs.get(BLANK_ATTR, 0)
+    handle = st.session_state.dataset
+    st.success(
+        f"Archivo cargado correctamente ({handle.nbytes / 1024 ** 2:.2f} MB en memoria)"
+    )
+    if st.session_state.get("sin_puntaje"):
+        st.warning(f"Se descartaron {st.session_state.sin_puntaje} filas sin Puntaje_SCA.")
+
+df = session_dataset(st.session_state)
+if file and df is not None:
+    st.dataframe(df.head())
 if df is None:
+    perf_panel(perf)
     st.stop()
 
 # ======================================================
@@ -47,7 +75,8 @@ st.dataframe(df.head())
 # ESTADÍSTICAS
 # ======================================================
 st.header(" Estadísticas Descriptivas")
-st.dataframe(df[numeric_cols].describe().transpose())
+with stage("estadisticas"):
+    st.dataframe(df[numeric_cols].describe().transpose())
 
 # ======================================================
 # NULOS
@@ -57,7 +86,7 @@ st.header("Porcentaje de Valores Nulos por Tipo de Columna")
 
 # Crear DataFrame con tipo de dato y porcentaje de nulos
 nulos = pd.DataFrame({
-    "Tipo": df.dtypes,
+    "Tipo": df.dtypes.astype(str),
     "Porcentaje_Nulos": df.isna().mean() * 100
 }).reset_index()
 
@@ -72,8 +101,15 @@ st.dataframe(nulos)
 # ======================================================
 st.header(" Relación entre Perfil del Catador y Puntaje")
 
-fig, ax = plt.subplots(figsize=(8, 4))
-sns.boxplot(data=df, x="Perfil_Catador", y="Puntaje_SCA", ax=ax)
-ax.set_title("Puntaje SCA según el Perfil del Catador")
-st.pyplot(fig)
+with stage("grafica_perfil"):
+    # seaborn/matplotlib tardan en importarse: solo cuando hay datos que graficar
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+
+    fig, ax = plt.subplots(figsize=(8, 4))
+    sns.boxplot(data=df, x="Perfil_Catador", y="Puntaje_SCA", ax=ax)
+    ax.set_title("Puntaje SCA según el Perfil del Catador")
+    st.pyplot(fig)
+
+perf_panel(perf)
 
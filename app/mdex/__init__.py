@@ -0,0 +1,5 @@
+"""Lógica compartida de MDEX: diseños BIBD y análisis de catas.
+
+Las páginas de Streamlit importan desde aquí para que el cálculo pesado viva
+en módulos normales de Python (importables y cargados una sola vez por proceso).
+"""
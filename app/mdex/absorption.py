@@ -0,0 +1,186 @@
+"""Ajuste de bloques incompletos generales (no balanceados) por absorción.
+
+Cuando faltan celdas los atajos del BIBD dejan de valer. En lugar de la
+matriz de indicadores N × (v + b) absorbemos los bloques (centrado dentro de
+cada bloque) y trabajamos con el sistema reducido v × v
+
+    C τ = Q,   C = X'M_Z X = diag(r) - N K⁻¹ Nᵀ,   Q = T - N K⁻¹ B
+
+donde N es la incidencia v × b dispersa y K = diag(k_j). C se forma con un
+producto disperso y se resuelve con Cholesky denso de ``C + J/v`` para v
+moderado o con gradiente conjugado para v grande. Las sumas de cuadrados son
+las tipo II de ``anova_lm(typ=2)`` y los coeficientes son los contrastes
+contra el primer nivel, como en ``smf.ols``.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import linalg, sparse, stats
+from scipy.sparse import csgraph
+from scipy.sparse.linalg import LinearOperator, cg
+
+from mdex.matrix import BlockMatrices
+
+# Hasta este número de tratamientos se usa factorización densa
+DENSE_MAX_V = 2000
+
+
+@dataclass
+class AbsorptionResult:
+    v: int
+    b: int
+    n_obs: int
+    df_error: int
+    mse: float
+    tau: np.ndarray
+    cov_tau: np.ndarray  # σ² C⁺; None cuando se resolvió con gradiente conjugado
+    anova: pd.DataFrame
+    effects: pd.DataFrame
+    coefficients: pd.DataFrame
+    # Lo necesario para medias ajustadas (ver mdex.lsmeans)
+    labels: pd.Index = None
+    incidence: sparse.csr_matrix = None
+    block_sizes: np.ndarray = None
+    block_totals: np.ndarray = None
+    center: float = 0.0
+
+
+def reduced_system(n, b_tot, t_tot):
+    """(C, Q, k_j, r_i) a partir de la incidencia y los totales."""
+    n = n.astype(np.float64)
+    k_j = np.asarray(n.sum(axis=0)).ravel()
+    r_i = np.asarray(n.sum(axis=1)).ravel()
+    n_scaled = n @ sparse.diags(1.0 / k_j)
+    c = (sparse.diags(r_i) - n_scaled @ n.T).tocsr()
+    q = t_tot - n_scaled @ b_tot
+    return c, q, k_j, r_i
+
+
+def information_matrix(matrices, y=None):
+    """(C, Q, B, T, k_j, r_i) del modelo absorbido, con C dispersa."""
+    if y is None:
+        y = matrices.scores.astype(np.float64)
+    b_tot = np.bincount(matrices.block_codes, weights=y, minlength=matrices.b)
+    t_tot = np.bincount(matrices.treat_codes, weights=y, minlength=matrices.v)
+    c, q, k_j, r_i = reduced_system(matrices.incidence(), b_tot, t_tot)
+    return c, q, b_tot, t_tot, k_j, r_i
+
+
+def _solve(c, q, v, dense):
+    # C es singular (1 está en su núcleo); C + J/v es definida positiva si el
+    # diseño es conexo y su inversa es C⁺ + J/v
+    if dense:
+        a = c.toarray() + 1.0 / v
+        try:
+            factor = linalg.cho_factor(a)
+            inv = linalg.cho_solve(factor, np.eye(v))
+        except linalg.LinAlgError:
+            inv = np.linalg.pinv(a)
+        c_plus = inv - 1.0 / v
+        return c_plus @ q, c_plus
+    op = LinearOperator((v, v), matvec=lambda x: c @ x + x.mean(), dtype=np.float64)
+    tau, _ = cg(op, q, rtol=1e-10, maxiter=10 * v)
+    return tau - tau.mean(), None
+
+
+def fit_absorbed(df, block_col, treat_col, resp_col, matrices=None, dense=None):
+    """Ajusta Y = μ + τ + β + ε absorbiendo los bloques."""
+    matrices = matrices or BlockMatrices(df, block_col, treat_col, resp_col)
+    y = matrices.scores.astype(np.float64)
+    # Centrar evita la cancelación numérica en las sumas de cuadrados
+    center = y.mean()
+    y = y - center
+    b_tot = np.bincount(matrices.block_codes, weights=y, minlength=matrices.b)
+    t_tot = np.bincount(matrices.treat_codes, weights=y, minlength=matrices.v)
+    return fit_from_statistics(
+        matrices.incidence(), t_tot, b_tot, y.sum(), float(y @ y),
+        matrices.treat_labels, block_col, treat_col, center=center, dense=dense,
+    )
+
+
+def fit_from_statistics(n, t_tot, b_tot, y_sum, y_sq, treat_labels, block_col, treat_col,
+                        center=0.0, dense=None):
+    """Ajuste absorbido a partir de estadísticos suficientes.
+
+    ``n`` es la incidencia v × b, ``t_tot``/``b_tot`` los totales por
+    tratamiento y bloque, ``y_sum``/``y_sq`` la suma y la suma de cuadrados de
+    las respuestas, todo medido respecto de ``center``.
+    """
+    v, b = n.shape
+    n_obs = int(n.sum())
+    c, q, k_j, r_i = reduced_system(n, b_tot, t_tot)
+    dense = v <= DENSE_MAX_V if dense is None else dense
+    tau, c_plus = _solve(c, q, v, dense)
+
+    # Componentes conexas del grafo bipartito tratamiento-bloque
+    bipartite = sparse.bmat([[None, n], [n.T, None]])
+    n_comp = csgraph.connected_components(bipartite, directed=False)[0]
+
+    corr = y_sum ** 2 / n_obs
+    ss_total = y_sq - corr
+    ss_within = y_sq - float(b_tot @ (b_tot / k_j))
+    ss_treat_adj = float(tau @ q)
+    ss_error = ss_within - ss_treat_adj
+    ss_treat_unadj = float(t_tot @ (t_tot / r_i)) - corr
+    ss_blocks_adj = ss_total - ss_treat_unadj - ss_error
+
+    df_treat, df_blocks = v - n_comp, b - n_comp
+    df_error = n_obs - (b + v - n_comp)
+    mse = ss_error / df_error if df_error > 0 else np.nan
+
+    def f_row(ss, dof):
+        if not df_error > 0 or not mse > 0 or dof <= 0:
+            return np.nan, np.nan
+        f_val = (ss / dof) / mse
+        return f_val, stats.f.sf(f_val, dof, df_error)
+
+    f_t, p_t = f_row(ss_treat_adj, df_treat)
+    f_b, p_b = f_row(ss_blocks_adj, df_blocks)
+    anova = pd.DataFrame(
+        {
+            "sum_sq": [ss_treat_adj, ss_blocks_adj, ss_error],
+            "df": [float(df_treat), float(df_blocks), float(df_error)],
+            "F": [f_t, f_b, np.nan],
+            "PR(>F)": [p_t, p_b, np.nan],
+        },
+        index=[f"C({treat_col})", f"C({block_col})", "Residual"],
+    )
+
+    cov_tau = mse * c_plus if c_plus is not None else None
+    se_tau = np.sqrt(np.diag(cov_tau)) if cov_tau is not None else np.full(v, np.nan)
+    effects = pd.DataFrame(
+        {
+            "Efecto Ajustado": tau,
+            "Error Estándar": se_tau,
+        },
+        index=pd.Index(treat_labels, name=treat_col),
+    )
+
+    # Contrastes contra el nivel de referencia (primer nivel ordenado)
+    order = np.argsort(np.asarray(treat_labels))
+    ref, others = order[0], order[1:]
+    coef = tau[others] - tau[ref]
+    if cov_tau is not None:
+        var = (np.diag(cov_tau)[others] + cov_tau[ref, ref] - 2 * cov_tau[others, ref])
+        se = np.sqrt(var)
+    else:
+        se = np.full(len(others), np.nan)
+    t_val = coef / se
+    coefficients = pd.DataFrame(
+        {
+            "Coef.": coef,
+            "Std.Err.": se,
+            "t": t_val,
+            "P>|t|": 2 * stats.t.sf(np.abs(t_val), df_error) if df_error > 0 else np.nan,
+        },
+        index=[f"C({treat_col})[T.{treat_labels[i]}]" for i in others],
+    )
+
+    return AbsorptionResult(
+        v=v, b=b, n_obs=n_obs, df_error=df_error, mse=mse, tau=tau, cov_tau=cov_tau,
+        anova=anova, effects=effects.sort_index(), coefficients=coefficients,
+        labels=pd.Index(treat_labels, name=treat_col), incidence=n,
+        block_sizes=k_j, block_totals=b_tot, center=center,
+    )
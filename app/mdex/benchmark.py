@@ -0,0 +1,351 @@
+"""Benchmarks de las etapas de diseño y análisis y del arranque de la app.
+
+Dos suites, ambas sin red y con resultados en JSON para comparar corridas:
+
+- ``etapas``: cronometra cada etapa (búsqueda del BIBD, lectura del CSV,
+  matrices dispersas, grilla del heatmap, ajustes intrabloque y por
+  absorción, medias ajustadas y comparaciones) sobre paneles sintéticos de
+  ``mdex.synthetic`` de 10² a 10⁶ puntajes.
+- ``arranque``: por página, el tiempo de importar sus módulos de nivel
+  superior en un intérprete limpio (``python -X importtime``) y el tiempo de
+  la primera ejecución y de una re-ejecución con ``streamlit.testing``.
+
+Con ``--comparar base.json`` se marcan las mediciones que empeoraron más de
+``--tolerancia`` respecto a la corrida base (código de salida 1). En CI,
+``tests/test_benchmarks.py`` corre las mismas etapas con pytest y
+presupuestos de tiempo fijos.
+
+Uso::
+
+    python -m mdex.benchmark etapas --escalas 100 10000 1000000 -o etapas.json
+    python -m mdex.benchmark arranque -o arranque.json --comparar base.json
+"""
+
+import argparse
+import ast
+import glob
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCALES = (100, 1_000, 10_000, 100_000, 1_000_000)
+# Diseño base de los paneles: BIBD(13, 4, 1), 13 catadores y 52 puntajes por réplica
+DESIGN = (13, 4, 1)
+
+
+# ----------------------------------------------------------------------
+# Medición
+# ----------------------------------------------------------------------
+def measure(fn, repeat=5, min_time=0.2, max_time=30.0):
+    """Tiempos de ``fn()``: al menos ``repeat`` corridas o ``min_time`` segundos."""
+    times = []
+    start = time.perf_counter()
+    while True:
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+        elapsed = time.perf_counter() - start
+        if (len(times) >= repeat and elapsed >= min_time) or elapsed >= max_time:
+            break
+    times = np.array(times)
+    return {"min_s": float(times.min()), "median_s": float(np.median(times)),
+            "runs": len(times)}
+
+
+def environment():
+    import pandas as pd
+    import scipy
+
+    info = {
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+    }
+    try:
+        info["commit"] = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=APP_DIR,
+            capture_output=True, text=True, timeout=10,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        info["commit"] = None
+    return info
+
+
+# ----------------------------------------------------------------------
+# Etapas de diseño y análisis
+# ----------------------------------------------------------------------
+def panel_for_scale(n_scores, seed=0):
+    """Panel sintético de aproximadamente ``n_scores`` puntajes."""
+    from mdex.bibd import validate_parameters
+    from mdex.synthetic import synthetic_panel
+
+    v, k, lam = DESIGN
+    b, _ = validate_parameters(v, k, lam)
+    replicas = max(1, int(np.ceil(n_scores / (b * k))))
+    return synthetic_panel(v, k, lam, replicas=replicas, seed=seed)
+
+
+def stage_functions(df, tmp_dir):
+    """{nombre: función sin argumentos} con las etapas a medir sobre ``df``."""
+    from mdex.absorption import fit_absorbed
+    from mdex.cache import _hash_columns
+    from mdex.comparisons import compare_means
+    from mdex.dataset import TastingData
+    from mdex.heatmap import prepare_grid
+    from mdex.ingest import read_tasting_file
+    from mdex.intrablock import fit_intrablock
+    from mdex.lsmeans import adjusted_means, ls_means_cov
+    from mdex.matrix import BlockMatrices
+
+    cols = ("Catador_ID", "Variedad_Codigo", "Puntaje_SCA")
+    csv_path = os.path.join(tmp_dir, "panel.csv")
+    df.to_csv(csv_path, index=False)
+    matrices = BlockMatrices(df, *cols)
+    absorbed = fit_absorbed(df, *cols, matrices=matrices)
+    means, cov = ls_means_cov(absorbed)
+
+    def build_matrices():
+        m = BlockMatrices(df, *cols)
+        m.incidence()
+        m.score_csr()
+
+    return {
+        "lectura_csv": lambda: read_tasting_file(csv_path),
+        "hash_datos": lambda: _hash_columns(df, cols),
+        "codificacion": lambda: TastingData.from_frame(df, *cols),
+        "matrices": build_matrices,
+        "grilla_heatmap": lambda: prepare_grid(BlockMatrices(df, *cols), page_size=1000),
+        "ajuste_intrabloque": lambda: fit_intrablock(df, *cols, matrices=matrices),
+        "ajuste_absorcion": lambda: fit_absorbed(df, *cols, matrices=matrices),
+        "medias_ajustadas": lambda: adjusted_means(df, *cols, fit=absorbed),
+        "comparaciones": lambda: compare_means(means, absorbed.labels, absorbed.df_error, cov=cov),
+    }
+
+
+def design_functions():
+    """Búsqueda de BIBD (no depende del tamaño del panel)."""
+    from mdex.bibd import find_bibd
+    from mdex.constructions import _construct
+
+    def cold(v, k, lam):
+        # Sin catálogo ni la memoria de construcciones: mide la construcción o búsqueda
+        _construct.cache_clear()
+        return find_bibd(v, k, lam, use_catalog=False)
+
+    # Construcciones directas y (10, 4, 2), que requiere búsqueda
+    cases = [(5, 3, 3), (7, 3, 1), (11, 5, 2), (21, 5, 1), (10, 4, 2)]
+    return {f"find_bibd({v},{k},{lam})": (lambda v=v, k=k, lam=lam: cold(v, k, lam))
+            for v, k, lam in cases}
+
+
+def run_stages(scales=SCALES, repeat=5, min_time=0.2, stages=None, log=print):
+    results = []
+    for name, fn in design_functions().items():
+        if stages and "find_bibd" not in stages:
+            break
+        stats = measure(fn, repeat, min_time)
+        results.append({"tipo": "diseño", "etapa": name, "puntajes": None, **stats})
+        log(f"{name:<28} {stats['median_s'] * 1000:10.2f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n in scales:
+            df = panel_for_scale(n)
+            for name, fn in stage_functions(df, tmp_dir).items():
+                if stages and name not in stages:
+                    continue
+                # En los paneles grandes basta con menos repeticiones
+                stats = measure(fn, repeat if n < 100_000 else 1, min_time)
+                results.append({"tipo": "etapa", "etapa": name, "puntajes": len(df), **stats})
+                log(f"{name:<28} {len(df):>9} {stats['median_s'] * 1000:10.2f} ms")
+    return results
+
+
+# ----------------------------------------------------------------------
+# Arranque de la app
+# ----------------------------------------------------------------------
+def page_scripts():
+    return [os.path.join(APP_DIR, "SensoryLab.py")] + sorted(glob.glob(os.path.join(APP_DIR, "pages", "*.py")))
+
+
+def top_level_imports(path):
+    """Módulos importados al nivel superior del script (los que paga cada ejecución en frío)."""
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and node.level == 0:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+
+def _importtime(code):
+    """{módulo: segundos acumulados} de las importaciones de primer nivel de ``code``."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=APP_DIR, capture_output=True, text=True, timeout=300,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    top = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        # Las importaciones anidadas van indentadas; solo cuentan las de primer nivel
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        top[name.strip()] = int(cumulative) / 1e6
+    return top
+
+
+def import_time(modules):
+    """(segundos totales, {módulo: segundos}) de importar ``modules`` en un intérprete limpio.
+
+    Los módulos que el intérprete carga al arrancar (``site``, ``encodings``...)
+    no se cuentan.
+    """
+    startup = _importtime("pass")
+    code = "; ".join(f"import {m}" for m in modules) or "pass"
+    top = {m: t for m, t in _importtime(code).items() if m not in startup}
+    return sum(top.values()), top
+
+
+# Se ejecuta en un proceso aparte para que cada página arranque en frío
+_RENDER_DRIVER = """
+import json, sys, time
+sys.path.insert(0, {app_dir!r})
+t0 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+from mdex.benchmark import panel_for_scale
+from mdex.store import default_store
+setup = time.perf_counter() - t0
+handle = default_store().put(panel_for_scale({n_scores}), "sintetico.csv")
+at = AppTest.from_file({page!r}, default_timeout=600)
+at.session_state["dataset"] = handle
+t0 = time.perf_counter(); at.run(); first = time.perf_counter() - t0
+t0 = time.perf_counter(); at.run(); rerun = time.perf_counter() - t0
+print(json.dumps({{"arranque_streamlit_s": setup, "primera_ejecucion_s": first,
+                  "reejecucion_s": rerun, "errores": [str(e.value) for e in at.exception]}}))
+"""
+
+
+def render_time(page, n_scores=1_000):
+    proc = subprocess.run(
+        [sys.executable, "-c", _RENDER_DRIVER.format(app_dir=APP_DIR, page=page, n_scores=n_scores)],
+        cwd=APP_DIR, capture_output=True, text=True, timeout=900,
+    )
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines() or ["error desconocido"]
+        return {"errores": [lines[-1]]}
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def run_startup(n_scores=1_000, render=True, log=print):
+    results = []
+    for page in page_scripts():
+        name = os.path.relpath(page, APP_DIR)
+        entry = {"tipo": "arranque", "etapa": name, "puntajes": n_scores}
+        try:
+            total, per_module = import_time(top_level_imports(page))
+        except RuntimeError as e:
+            entry["errores"] = [str(e)]
+            results.append(entry)
+            log(f"{name:<34} ❌ {e}")
+            continue
+        entry["importacion_s"] = total
+        entry["modulos"] = dict(sorted(per_module.items(), key=lambda x: -x[1])[:8])
+        if render:
+            entry.update(render_time(page, n_scores))
+        results.append(entry)
+        first = entry.get("primera_ejecucion_s")
+        log(f"{name:<34} import {total * 1000:8.1f} ms"
+            + (f"  primera ejecución {first * 1000:8.1f} ms" if first is not None else ""))
+    return results
+
+
+# ----------------------------------------------------------------------
+# Comparación entre corridas
+# ----------------------------------------------------------------------
+METRICS = ("median_s", "importacion_s", "primera_ejecucion_s", "reejecucion_s")
+
+
+def compare(baseline, current, tolerance=0.25, min_seconds=0.005):
+    """Mediciones de ``current`` más lentas que ``baseline`` en más de ``tolerance``."""
+    def index(results):
+        return {(r["tipo"], r["etapa"], r["puntajes"]): r for r in results}
+
+    base = index(baseline["resultados"])
+    regressions = []
+    for key, entry in index(current["resultados"]).items():
+        old = base.get(key)
+        if old is None:
+            continue
+        for metric in METRICS:
+            before, after = old.get(metric), entry.get(metric)
+            if before is None or after is None or max(before, after) < min_seconds:
+                continue  # tiempos muy cortos: dominados por ruido
+            if after > before * (1 + tolerance):
+                regressions.append({"etapa": key[1], "puntajes": key[2], "métrica": metric,
+                                    "antes_s": before, "despues_s": after,
+                                    "cambio": after / before - 1})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mdex.benchmark",
+        description="Benchmarks de etapas de análisis y del arranque de la app.",
+    )
+    sub = parser.add_subparsers(dest="suite", required=True)
+    stages = sub.add_parser("etapas", help="etapas de diseño y análisis a varias escalas")
+    stages.add_argument("--escalas", type=int, nargs="+", default=list(SCALES))
+    stages.add_argument("--etapas", nargs="+", default=None, help="solo estas etapas")
+    stages.add_argument("--repeticiones", type=int, default=5)
+    startup = sub.add_parser("arranque", help="importación y primera ejecución de cada página")
+    startup.add_argument("--puntajes", type=int, default=1_000, help="tamaño del panel cargado")
+    startup.add_argument("--sin-render", action="store_true", help="solo tiempos de importación")
+    for p in (stages, startup):
+        p.add_argument("-o", "--out", default=None, help="archivo JSON de resultados")
+        p.add_argument("--comparar", default=None, help="JSON de una corrida base")
+        p.add_argument("--tolerancia", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    sys.path.insert(0, APP_DIR)
+    if args.suite == "etapas":
+        results = run_stages(args.escalas, args.repeticiones, stages=args.etapas)
+    else:
+        results = run_startup(args.puntajes, render=not args.sin_render)
+    report = {"suite": args.suite, "entorno": environment(), "resultados": results}
+    out = args.out or f"benchmark_{args.suite}.json"
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"Resultados en {out}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressions = compare(json.load(f), report, args.tolerancia)
+        for r in regressions:
+            print(f"⚠️ {r['etapa']} ({r['puntajes']}) {r['métrica']}: "
+                  f"{r['antes_s'] * 1000:.1f} → {r['despues_s'] * 1000:.1f} ms (+{r['cambio']:.0%})",
+                  file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
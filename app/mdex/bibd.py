@@ -0,0 +1,128 @@
+"""Generador de diseños BIBD usado por la página 1_Diseño BIBD."""
+
+import time
+
+import numpy as np
+import pandas as pd
+
+from mdex.catalog import default_catalog
+from mdex.constructions import construct_bibd, construction_method
+from mdex.diagnostics import diagnose
+from mdex.matrix import BlockMatrices
+from mdex.search import exact_cover_bibd
+from mdex.local_search import portfolio_bibd
+
+
+# ----------------------------------------------------------------------
+# --------------------------- BIBD GENERATOR ---------------------------
+# ----------------------------------------------------------------------
+
+def validate_parameters(v, k, lam):
+    num = lam * v * (v - 1)
+    den = k * (k - 1)
+    if num % den != 0:
+        raise ValueError("❌ b no es entero — parámetros no compatibles.")
+    b = num // den
+
+    if (lam * (v - 1)) % (k - 1) != 0:
+        raise ValueError("❌ r no es entero — parámetros no compatibles.")
+    r = (lam * (v - 1)) // (k - 1)
+
+    if b * k != v * r:
+        raise ValueError("❌ condición bk = vr no satisfecha.")
+
+    return int(b), int(r)
+
+
+def is_bibd(blocks, v, k, lam):
+    """Comprueba que ``blocks`` sea un BIBD(v, k, λ) válido."""
+    b, r = validate_parameters(v, k, lam)
+    if len(blocks) != b or any(len(blk) != k for blk in blocks):
+        return False
+    treats = np.asarray(blocks, dtype=np.int64).ravel()
+    if treats.min() < 0 or treats.max() >= v:
+        return False
+    matrices = BlockMatrices.from_codes(np.repeat(np.arange(b), k), np.arange(b),
+                                        treats, np.arange(v), np.zeros(len(treats)))
+    diag = diagnose(matrices, pair_rows=0, efficiency=False)
+    return diag.is_bibd and diag.parameters == (k, r, lam)
+
+
+def find_bibd(v, k, lam, max_iters=2_000_000, time_limit=None,
+              stochastic=False, seed=0, workers=None, use_catalog=True, progress=None):
+    b, r = validate_parameters(v, k, lam)
+    start = time.perf_counter()
+
+    # El catálogo (memoria + disco) se consulta antes que cualquier
+    # construcción o búsqueda
+    catalog = default_catalog() if use_catalog else None
+    if catalog is not None:
+        cached = catalog.get(v, k, lam)
+        if cached is not None:
+            method, blocks = cached
+            return {
+                "v": v,
+                "k": k,
+                "lambda": lam,
+                "b": b,
+                "r": r,
+                "blocks": list(blocks),
+                "method": method,
+                "stats": {"nodes": 0, "elapsed": time.perf_counter() - start, "catalog": True},
+            }
+
+    # Primero las construcciones algebraicas directas; la búsqueda sólo se
+    # usa cuando ninguna aplica.
+    blocks = construct_bibd(v, k, lam)
+    method = construction_method(v, k, lam)
+    stats = {"nodes": 0}
+    if blocks is None and stochastic:
+        # Modo estocástico: portafolio paralelo de recocido simulado
+        bibd = portfolio_bibd(
+            v, k, lam, seed=seed, workers=workers,
+            time_limit=10.0 if time_limit is None else time_limit,
+        )
+        if catalog is not None:
+            catalog.put(bibd)
+        return bibd
+    if blocks is None:
+        blocks, stats = exact_cover_bibd(v, k, lam, max_nodes=max_iters, time_limit=time_limit,
+                                         progress=progress)
+        method = "búsqueda"
+    stats["elapsed"] = time.perf_counter() - start
+    if blocks is None:
+        raise RuntimeError(
+            f"❌ No se encontró un BIBD válido ({stats['nodes']} nodos explorados). Cambia parámetros."
+        )
+
+    bibd = {
+        "v": v,
+        "k": k,
+        "lambda": lam,
+        "b": b,
+        "r": r,
+        "blocks": blocks,
+        "method": method,
+        "stats": stats,
+    }
+    if catalog is not None:
+        catalog.put(bibd)
+    return bibd
+
+
+def blocks_to_dataframe(bibd, labels=None):
+    blocks = bibd["blocks"]
+    v = bibd["v"]
+
+    if labels is None:
+        labels = [f"Tratamiento {i+1}" for i in range(v)]
+
+    rows = []
+    for bi, blk in enumerate(blocks, start=1):
+        for t in blk:
+            rows.append({
+                "Block": bi,
+                "Tratamiento_ID": chr(ord("A") + t) if t < 26 else f"T{t + 1}",
+                "Nombre": labels[t]
+            })
+    return pd.DataFrame(rows)
@@ -0,0 +1,184 @@
+"""Bootstrap por catadores de la probabilidad de ser el mejor café.
+
+Cada réplica remuestrea los b catadores con reemplazo, lo que equivale a
+darle a cada bloque una multiplicidad ``W_rj`` (multinomial). Como la
+información de un bloque es aditiva, para R réplicas a la vez
+
+- ``Q_r = Σ_j W_rj Q_j``         (R × v, un producto disperso)
+- ``C_r = diag(W_r Nᵀ) - Σ_j (W_rj/k_j) n_j n_jᵀ``  (R × v², un producto disperso)
+
+y las ecuaciones normales reducidas ``(C_r + J/v) τ_r = Q_r`` se resuelven
+juntas con ``np.linalg.solve`` sobre la pila R × v × v. Las medias
+ajustadas salen con los mismos pesos de contraste que en Medias Ajustadas
+(``mdex.lsmeans.mean_weights``). Los lotes de réplicas se reparten con
+``mdex.jobs.run_batches``, cada uno con su semilla derivada de ``seed``.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+
+from mdex.lsmeans import mean_weights
+from mdex.jobs import batch_sizes, run_batches
+from mdex.matrix import BlockMatrices
+
+# Hasta este número de variedades la pila R × v × v es razonable
+MAX_V = 300
+# Elementos de la pila R × v × v por lote
+BATCH_CELLS = 8_000_000
+# Por debajo de este trabajo total (réplicas × nnz de las matrices de bloque)
+# no vale la pena lanzar procesos
+PARALLEL_MIN_WORK = 50_000_000
+
+
+@dataclass
+class BootstrapResult:
+    n_boot: int
+    n_failed: int  # réplicas desconectadas (rango de C < v - 1); no cuentan en las probabilidades
+    prob_best: pd.Series
+    rank_probs: pd.DataFrame  # filas: café; columnas: puesto 1..v
+    elapsed: float
+    seed: int
+
+    @property
+    def mean_rank(self):
+        ranks = np.arange(1, self.rank_probs.shape[1] + 1)
+        return self.rank_probs.to_numpy() @ ranks
+
+
+class _Problem:
+    """Aportes de cada bloque a Q, C y a los pesos de las medias ajustadas."""
+
+    def __init__(self, matrices):
+        self.v, self.b = matrices.v, matrices.b
+        y = matrices.scores.astype(np.float64)
+        self.center = y.mean()
+        y = y - self.center
+        n = matrices.incidence().astype(np.float64).tocsc()  # v × b
+        self.incidence = n
+        self.k = np.asarray(n.sum(axis=0)).ravel()
+        b_tot = np.bincount(matrices.block_codes, weights=y, minlength=self.b)
+        self.block_means = b_tot / self.k
+
+        # Q_j = T_j - n_j B_j / k_j como filas de una matriz b × v dispersa
+        t_blk = sparse.csr_matrix(
+            (y, (matrices.block_codes, matrices.treat_codes)), shape=(self.b, self.v)
+        )
+        self.q_blk = (t_blk - sparse.diags(self.block_means) @ n.T).tocsr()
+        self.r_blk = n.T.tocsr()  # b × v
+
+        # vec(n_j n_jᵀ / k_j) como filas de una matriz b × v² dispersa
+        nt = n.T.tocsr()
+        lengths = np.diff(nt.indptr)
+        row = np.repeat(np.arange(self.b), lengths)  # bloque de cada no nulo
+        reps = lengths[row]
+        first = np.repeat(np.arange(nt.nnz), reps)
+        within = np.arange(reps.sum()) - np.repeat(np.cumsum(reps) - reps, reps)
+        second = nt.indptr[row[first]] + within
+        blk = row[first]
+        self.outer_blk = sparse.csr_matrix(
+            (nt.data[first] * nt.data[second] / self.k[blk],
+             (blk, nt.indices[first] * self.v + nt.indices[second])),
+            shape=(self.b, self.v * self.v),
+        )
+
+    @property
+    def work(self):
+        return self.outer_blk.nnz + self.q_blk.nnz
+
+    @staticmethod
+    def _connected(c):
+        """Réplicas cuyo diseño es conexo, es decir con rango(C_r) = v - 1.
+
+        Se unen las variedades que comparten algún catador (``C_ij < 0``) en
+        un único grafo con las R réplicas como componentes separadas; una
+        variedad sin catadores queda aislada.
+        """
+        reps, v, _ = c.shape
+        rep, i, j = np.nonzero(c < -1e-12)
+        graph = sparse.csr_matrix(
+            (np.ones(len(rep)), (rep * v + i, rep * v + j)), shape=(reps * v, reps * v)
+        )
+        labels = csgraph.connected_components(graph, directed=False)[1].reshape(reps, v)
+        return (labels == labels[:, :1]).all(axis=1)
+
+    def means(self, weights):
+        """Medias ajustadas (R × v) para multiplicidades de bloque R × b."""
+        v = self.v
+        q = (self.q_blk.T @ weights.T).T
+        r = (self.r_blk.T @ weights.T).T
+        c = -(self.outer_blk.T @ weights.T).T.reshape(-1, v, v)
+        c[:, np.arange(v), np.arange(v)] += r
+        ok = self._connected(c)
+        tau = np.full((len(weights), v), np.nan)
+        if ok.any():
+            a = c[ok] + 1.0 / v
+            try:
+                tau[ok] = np.linalg.solve(a, q[ok][:, :, None])[:, :, 0]
+            except np.linalg.LinAlgError:
+                tau[ok] = np.einsum("rij,rj->ri", np.linalg.pinv(a), q[ok])
+        tau -= tau.mean(axis=1, keepdims=True)
+        w = mean_weights(self.incidence, weights / self.k)
+        a_bar = (weights @ self.block_means) / self.b
+        return tau - (tau * w).sum(axis=1, keepdims=True) + a_bar[:, None] + self.center
+
+    def run_batch(self, seed_seq, size):
+        rng = np.random.default_rng(seed_seq)
+        weights = rng.multinomial(self.b, np.full(self.b, 1.0 / self.b), size=size).astype(np.float64)
+        means = self.means(weights)
+        valid = ~np.isnan(means).any(axis=1)
+        means = means[valid]
+        # rank[r, i] = puesto de la variedad i en la réplica r (0 = mejor)
+        order = np.argsort(-means, axis=1, kind="stable")
+        rank = np.empty_like(order)
+        np.put_along_axis(rank, order, np.arange(self.v)[None, :], axis=1)
+        counts = np.zeros((self.v, self.v), dtype=np.int64)
+        np.add.at(counts, (np.broadcast_to(np.arange(self.v), rank.shape), rank), 1)
+        return counts, int((~valid).sum())
+
+
+def bootstrap_best(df, block_col, treat_col, resp_col, n_boot=2000, seed=0,
+                   time_limit=None, workers=None, matrices=None, progress=None):
+    """Probabilidad de ser el mejor y distribución de puestos por café.
+
+    ``progress(réplicas, n_boot)`` se llama al terminar cada lote.
+    """
+    start = time.perf_counter()
+    matrices = matrices or BlockMatrices(df, block_col, treat_col, resp_col)
+    if matrices.v > MAX_V:
+        raise ValueError(f"❌ El bootstrap de puestos admite hasta {MAX_V} variedades.")
+    problem = _Problem(matrices)
+    v = problem.v
+
+    size = int(np.clip(BATCH_CELLS // (v * v), 1, 1000))
+    sizes = batch_sizes(n_boot, size)
+    deadline = time.monotonic() + time_limit if time_limit else None
+    results = run_batches(problem.run_batch, sizes, seed, deadline, workers,
+                          parallel=problem.work * n_boot >= PARALLEL_MIN_WORK,
+                          progress=progress)
+
+    done = [(res, k) for res, k in zip(results, sizes) if res is not None]
+    counts = sum((res[0] for res, _ in done), np.zeros((v, v), dtype=np.int64))
+    failed = sum(res[1] for res, _ in done)
+    valid = max(int(counts[0].sum()), 1)
+
+    labels = pd.Index(matrices.treat_labels, name="Café")
+    rank_probs = pd.DataFrame(
+        counts / valid, index=labels, columns=[f"Puesto {i + 1}" for i in range(v)]
+    )
+    # Orden: mayor P(mejor), luego menor puesto medio
+    mean_rank = rank_probs.to_numpy() @ np.arange(1, v + 1)
+    order = np.lexsort((mean_rank, -rank_probs.iloc[:, 0].to_numpy()))
+    rank_probs = rank_probs.iloc[order]
+    return BootstrapResult(
+        n_boot=int(counts[0].sum()),
+        n_failed=failed,
+        prob_best=rank_probs.iloc[:, 0].rename("P(mejor)"),
+        rank_probs=rank_probs,
+        elapsed=time.perf_counter() - start,
+        seed=seed,
+    )
@@ -0,0 +1,92 @@
+"""Índice variedad → filas para explorar quién puntuó cada café.
+
+Recorrer ``df.groupby(variedad)`` y crear un expander con dos tablas por
+variedad en cada ejecución no escala a cientos de variedades. El índice se
+arma una vez por conjunto de datos (queda en la caché de ajustes) sobre
+``TastingData``, que ya tiene las filas agrupadas por variedad como un CSR:
+
+- las variedades se listan en orden alfabético (``sorted_positions``);
+- las filas de una variedad son una rebanada de ``order``, por catador;
+- la tabla catador → perfil, con una fila por catador en orden de ID
+  (numérico si los IDs son enteros, igual que ``mdex.ingest.taster_ids``).
+
+Las páginas muestran solo la variedad elegida y una página de resumen.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from mdex.ingest import taster_ids
+
+
+@dataclass
+class VarietyIndex:
+    labels: pd.Index          # variedades en orden de código (posición = código)
+    names: np.ndarray         # nombre de cada variedad ("" si no hay columna de nombre)
+    sorted_positions: np.ndarray  # posiciones en orden alfabético de variedad
+    order: np.ndarray         # filas del DataFrame ordenadas por (variedad, catador)
+    offsets: np.ndarray       # filas de la variedad i: order[offsets[i]:offsets[i + 1]]
+    n_tasters: np.ndarray     # catadores distintos por variedad
+    tasters: pd.DataFrame     # una fila por catador con su perfil
+
+    @property
+    def counts(self):
+        return np.diff(self.offsets)
+
+    def rows(self, i):
+        return self.order[self.offsets[i]:self.offsets[i + 1]]
+
+    def search(self, text):
+        """Posiciones, en orden alfabético, de las variedades cuyo código o nombre contiene ``text``."""
+        text = text.strip().lower()
+        if not text:
+            return self.sorted_positions
+        codes = self.labels.astype(str).str.lower().str.contains(text, regex=False)
+        names = pd.Index(self.names).str.lower().str.contains(text, regex=False)
+        hits = np.asarray(codes) | np.asarray(names)
+        return self.sorted_positions[hits[self.sorted_positions]]
+
+    def summary(self, positions):
+        """Tabla de resumen (una fila por variedad) de ``positions``."""
+        table = pd.DataFrame({
+            "Variedad": self.labels[positions],
+            "Nombre": self.names[positions],
+            "Puntuaciones": self.counts[positions],
+            "Catadores": self.n_tasters[positions],
+        })
+        if not (self.names != "").any():
+            table = table.drop(columns="Nombre")
+        return table
+
+    def scores(self, df, i, columns):
+        """Filas de la variedad ``i`` con ``columns``, ordenadas por catador."""
+        return df.iloc[self.rows(i)][list(columns)].reset_index(drop=True)
+
+    def taster_profiles(self, df, i, block_col):
+        """Catadores únicos de la variedad ``i`` con su perfil, en orden de ID."""
+        ids = pd.unique(df[block_col].to_numpy()[self.rows(i)])
+        return self.tasters[self.tasters.index.isin(ids)].reset_index()
+
+
+def build_variety_index(data):
+    """``VarietyIndex`` a partir de un ``TastingData``."""
+    order, offsets = data.variety_order, data.variety_offsets
+
+    # Catadores distintos por variedad: cambios de catador dentro de cada tramo
+    sorted_blocks = data.taster_codes[order]
+    sorted_treats = data.variety_codes[order]
+    new = np.ones(len(order), dtype=bool)
+    new[1:] = (sorted_blocks[1:] != sorted_blocks[:-1]) | (sorted_treats[1:] != sorted_treats[:-1])
+    n_tasters = np.bincount(sorted_treats[new], minlength=data.v)
+
+    block_col = data.columns[0]
+    profiles = data.taster_profiles()
+    tasters = (pd.DataFrame(index=data.tasters.rename(block_col)) if profiles is None
+               else profiles.rename_axis(block_col).to_frame())
+    # Orden de la categoría de ``taster_ids``: 1, 2, 10 aunque los IDs sean texto
+    ids = taster_ids(pd.Series(tasters.index.astype(str)))
+    tasters = tasters.iloc[np.argsort(ids.cat.codes.to_numpy(), kind="stable")]
+    return VarietyIndex(data.varieties, data.variety_names(), np.argsort(data.varieties),
+                        order, offsets, n_tasters, tasters)
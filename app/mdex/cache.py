@@ -0,0 +1,272 @@
+"""Caché de ajustes compartida entre páginas, indexada por el contenido.
+
+Las páginas Ajuste Intrabloque, Medias Ajustadas y Veredicto Final ajustan
+el mismo modelo ``Variedad + Catador``. La clave de cada ajuste es un hash
+del contenido de las columnas usadas más los nombres de columna elegidos, de
+modo que cambiar de página no vuelve a ajustar y subir un archivo nuevo
+nunca devuelve resultados del anterior. Los artefactos (ajuste BIBD, ajuste
+absorbido, medias ajustadas, comparaciones) se guardan por separado en un LRU con tope de
+memoria configurable con ``MDEX_CACHE_MB``.
+
+Los DataFrames se tratan como inmutables: el hash se memoriza por identidad
+del objeto mientras siga vivo.
+"""
+
+import hashlib
+import os
+import threading
+import weakref
+from collections import OrderedDict
+from dataclasses import fields, is_dataclass
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+DEFAULT_MAX_MB = 512
+
+_fingerprints = {}  # id(df) -> (weakref, {columnas: hash})
+
+
+def _hash_columns(df, columns):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(columns).encode())
+    digest.update(str(len(df)).encode())
+    for col in columns:
+        hashed = pd.util.hash_pandas_object(df[col], index=False)
+        digest.update(hashed.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def dataset_key(df, columns):
+    """Hash del contenido de ``columns``, memorizado por identidad de ``df``."""
+    columns = tuple(columns)
+    entry = _fingerprints.get(id(df))
+    if entry is None or entry[0]() is not df:
+        ref = weakref.ref(df, lambda _, i=id(df): _fingerprints.pop(i, None))
+        entry = _fingerprints[id(df)] = (ref, {})
+    hashes = entry[1]
+    if columns not in hashes:
+        hashes[columns] = _hash_columns(df, columns)
+    return hashes[columns]
+
+
+def nbytes(obj):
+    """Estimación de la memoria ocupada por un resultado."""
+    if obj is None:
+        return 0
+    if isinstance(obj, (bytes, str)):
+        return len(obj)
+    if isinstance(obj, (pd.DataFrame, pd.Series)):
+        usage = obj.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(obj, pd.DataFrame) else usage)
+    if isinstance(obj, pd.Index):
+        return int(obj.memory_usage(deep=True))
+    if isinstance(obj, np.ndarray):
+        return int(obj.nbytes)
+    if sparse.issparse(obj):
+        obj = obj.tocsr()
+        return int(obj.data.nbytes + obj.indices.nbytes + obj.indptr.nbytes)
+    if is_dataclass(obj):
+        return sum(nbytes(getattr(obj, f.name)) for f in fields(obj))
+    if isinstance(obj, (list, tuple)):
+        return sum(nbytes(x) for x in obj)
+    if isinstance(obj, dict):
+        return sum(nbytes(x) for x in obj.values())
+    return 64
+
+
+class AnalysisCache:
+    """LRU de resultados con tope de memoria, seguro entre hilos."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 ** 2):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # clave -> (resultado, bytes)
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key][0]
+
+    def put(self, key, value):
+        size = nbytes(value)
+        with self._lock:
+            if key in self._entries:
+                self.total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return value  # no cabe: se devuelve sin guardar
+            self._entries[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, old) = self._entries.popitem(last=False)
+                self.total_bytes -= old
+        return value
+
+    def get_or_compute(self, key, compute, keep=None):
+        """Valor en caché o ``compute()``; si ``keep(valor)`` es falso no se guarda."""
+        value = self.get(key)
+        if value is None:
+            with self._lock:
+                self.misses += 1
+            value = compute()
+            if keep is None or keep(value):
+                self.put(key, value)
+        return value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+@lru_cache(maxsize=1)
+def default_cache():
+    """Caché del proceso, compartida por todas las sesiones de Streamlit."""
+    max_mb = float(os.environ.get("MDEX_CACHE_MB", DEFAULT_MAX_MB))
+    return AnalysisCache(int(max_mb * 1024 ** 2))
+
+
+class Analysis:
+    """Ajustes de un conjunto de datos, calculados una sola vez y compartidos."""
+
+    def __init__(self, df, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                 resp_col="Puntaje_SCA", cache=None):
+        self.df = df
+        self.block_col = block_col
+        self.treat_col = treat_col
+        self.resp_col = resp_col
+        self.cache = cache or default_cache()
+        self.key = dataset_key(df, (block_col, treat_col, resp_col))
+        self._matrices = None
+
+    def _cols(self):
+        return self.block_col, self.treat_col, self.resp_col
+
+    @property
+    def data(self):
+        """``TastingData`` del conjunto (en caché: se codifica una vez por archivo)."""
+        from mdex.dataset import tasting_data
+
+        return tasting_data(self.df, *self._cols(), cache=self.cache)
+
+    @property
+    def matrices(self):
+        if self._matrices is None:
+            self._matrices = self.data.matrices(self.treat_col)
+        return self._matrices
+
+    def diagnostics(self):
+        """``DesignDiagnostics``: balance, conectividad y eficiencia del diseño."""
+        from mdex.diagnostics import diagnose
+
+        return self.cache.get_or_compute(
+            (self.key, "diagnostics"), lambda: diagnose(self.matrices)
+        )
+
+    def intrablock(self):
+        """``IntrablockResult`` si los datos son un BIBD, si no None."""
+        from mdex.intrablock import fit_intrablock
+
+        # None es un resultado válido: se guarda envuelto en una tupla
+        return self.cache.get_or_compute(
+            (self.key, "intrablock"),
+            lambda: (fit_intrablock(self.df, *self._cols(), matrices=self.matrices),),
+        )[0]
+
+    def absorbed(self):
+        from mdex.absorption import fit_absorbed
+
+        return self.cache.get_or_compute(
+            (self.key, "absorbed"),
+            lambda: fit_absorbed(self.df, *self._cols(), matrices=self.matrices),
+        )
+
+    def combined(self, method="reml"):
+        """``CombinedResult`` intra/interbloque si los datos son un BIBD, si no None."""
+        from mdex.interblock import fit_combined
+
+        return self.cache.get_or_compute(
+            (self.key, "combined", method),
+            lambda: (fit_combined(self.df, *self._cols(), method=method,
+                                  matrices=self.matrices),),
+        )[0]
+
+    def permutation(self, n_perm=9999, seed=0, time_limit=None, progress=None):
+        """``PermutationResult`` con permutaciones dentro de cada bloque.
+
+        Una prueba cortada por ``time_limit`` no se guarda: con la misma clave
+        otra llamada podría completar un número distinto de permutaciones.
+        """
+        from mdex.permutation import permutation_test
+
+        return self.cache.get_or_compute(
+            (self.key, "permutation", n_perm, seed, time_limit),
+            lambda: permutation_test(self.df, *self._cols(), n_perm=n_perm, seed=seed,
+                                     time_limit=time_limit, matrices=self.matrices,
+                                     progress=progress),
+            keep=lambda res: res.n_perm == n_perm,
+        )
+
+    def bootstrap(self, n_boot=2000, seed=0, time_limit=None, progress=None):
+        """``BootstrapResult`` con la probabilidad de ser el mejor de cada café.
+
+        Igual que en ``permutation``, un bootstrap cortado por tiempo no se guarda.
+        """
+        from mdex.bootstrap import bootstrap_best
+
+        return self.cache.get_or_compute(
+            (self.key, "bootstrap", n_boot, seed, time_limit),
+            lambda: bootstrap_best(self.df, *self._cols(), n_boot=n_boot, seed=seed,
+                                   time_limit=time_limit, matrices=self.matrices,
+                                   progress=progress),
+            keep=lambda res: res.n_boot + res.n_failed == n_boot,
+        )
+
+    def variety_index(self):
+        """``VarietyIndex`` variedad → filas para el explorador de catadores."""
+        from mdex.browser import build_variety_index
+
+        return self.cache.get_or_compute(
+            (self.key, "variety_index"), lambda: build_variety_index(self.data)
+        )
+
+    def anova(self):
+        fit = self.intrablock()
+        return fit.anova if fit is not None else self.absorbed().anova
+
+    def comparisons(self, alpha=0.05, adjustment="tukey"):
+        """(tabla de parejas, letras) de las medias ajustadas."""
+        from mdex.comparisons import compare_means
+        from mdex.lsmeans import ls_means_cov
+
+        def compute():
+            fit = self.absorbed()
+            means, cov = ls_means_cov(fit)
+            intra = self.intrablock()
+            se_diff = intra.se_diff if intra is not None else None
+            if se_diff is None and cov is None:
+                raise ValueError("❌ Demasiadas variedades para la covarianza completa.")
+            return compare_means(means, fit.labels, fit.df_error, cov=cov, se_diff=se_diff,
+                                 alpha=alpha, adjustment=adjustment)
+
+        return self.cache.get_or_compute((self.key, "comparisons", alpha, adjustment), compute)
+
+    def adjusted_means(self, alpha=0.05):
+        from mdex.lsmeans import adjusted_means
+
+        return self.cache.get_or_compute(
+            (self.key, "adjusted_means", alpha),
+            lambda: adjusted_means(self.df, *self._cols(), alpha=alpha, fit=self.absorbed(),
+                                   simple=self.data.variety_means(self.treat_col)),
+        )
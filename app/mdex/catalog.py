@@ -0,0 +1,138 @@
+"""Catálogo persistente de diseños BIBD indexado por (v, k, λ).
+
+Un diseño para unos parámetros dados nunca cambia, así que ``find_bibd``
+consulta primero este catálogo: una capa LRU en memoria del proceso y debajo
+un archivo SQLite local. Cada diseño se verifica al leerse del disco; las
+filas inválidas se descartan. La base se siembra en su creación con los
+diseños de ``data/designs.json`` (parámetros comunes que ninguna
+construcción directa cubre).
+
+La ruta por defecto es ``~/.cache/mdex/designs.sqlite3`` y puede cambiarse
+con la variable de entorno ``MDEX_CATALOG``.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from functools import lru_cache
+
+SEED_PATH = os.path.join(os.path.dirname(__file__), "data", "designs.json")
+
+
+def default_path():
+    return os.environ.get(
+        "MDEX_CATALOG",
+        os.path.join(os.path.expanduser("~"), ".cache", "mdex", "designs.sqlite3"),
+    )
+
+
+class DesignCatalog:
+    """Almacén de diseños con caché LRU en memoria sobre SQLite."""
+
+    def __init__(self, path=None, maxsize=128):
+        self.path = path or default_path()
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk = True
+        try:
+            self._init_db()
+        except (sqlite3.Error, OSError):
+            # Sin disco escribible el catálogo sigue funcionando en memoria
+            self._disk = False
+
+    # ------------------------------------------------------------------
+    # SQLite
+    # ------------------------------------------------------------------
+
+    def _connect(self):
+        return closing(sqlite3.connect(self.path, timeout=5))
+
+    def _init_db(self):
+        folder = os.path.dirname(self.path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as con, con:
+            con.execute(
+                "CREATE TABLE IF NOT EXISTS designs ("
+                " v INTEGER, k INTEGER, lam INTEGER, method TEXT, blocks TEXT,"
+                " PRIMARY KEY (v, k, lam))"
+            )
+            if os.path.exists(SEED_PATH):
+                with open(SEED_PATH, encoding="utf-8") as fh:
+                    seed = json.load(fh)
+                con.executemany(
+                    "INSERT OR IGNORE INTO designs VALUES (?, ?, ?, ?, ?)",
+                    [(d["v"], d["k"], d["lambda"], d["method"], json.dumps(d["blocks"]))
+                     for d in seed],
+                )
+
+    def _read(self, v, k, lam):
+        from mdex.bibd import is_bibd
+
+        with self._connect() as con:
+            row = con.execute(
+                "SELECT method, blocks FROM designs WHERE v = ? AND k = ? AND lam = ?",
+                (v, k, lam),
+            ).fetchone()
+        if row is None:
+            return None
+        method, raw = row
+        blocks = tuple(tuple(blk) for blk in json.loads(raw))
+        if not is_bibd(blocks, v, k, lam):
+            with self._connect() as con, con:
+                con.execute("DELETE FROM designs WHERE v = ? AND k = ? AND lam = ?", (v, k, lam))
+            return None
+        return method, blocks
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def get(self, v, k, lam):
+        """Diseño guardado como ``(method, blocks)`` o None."""
+        key = (v, k, lam)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        if not self._disk:
+            return None
+        try:
+            found = self._read(v, k, lam)
+        except sqlite3.Error:
+            return None
+        if found is not None:
+            self._remember(key, found)
+        return found
+
+    def put(self, bibd):
+        key = (bibd["v"], bibd["k"], bibd["lambda"])
+        entry = (bibd["method"], tuple(tuple(blk) for blk in bibd["blocks"]))
+        self._remember(key, entry)
+        if not self._disk:
+            return
+        try:
+            with self._connect() as con, con:
+                con.execute(
+                    "INSERT OR REPLACE INTO designs VALUES (?, ?, ?, ?, ?)",
+                    key + (entry[0], json.dumps(entry[1])),
+                )
+        except sqlite3.Error:
+            pass
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._memory[key] = entry
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.maxsize:
+                self._memory.popitem(last=False)
+
+
+@lru_cache(maxsize=None)
+def default_catalog():
+    """Catálogo compartido por todo el proceso (todas las sesiones)."""
+    return DesignCatalog()
@@ -0,0 +1,172 @@
+"""Comparaciones múltiples de todas las parejas de medias ajustadas.
+
+Las v(v-1)/2 diferencias se calculan de una vez con índices de triángulo
+superior. El error estándar de cada diferencia sale de la forma cerrada
+``2kσ²/(λv)`` en un BIBD o de la covarianza general ``Var(τ̂_i - τ̂_j)`` en
+datos no balanceados. Los p-valores se ajustan por Tukey-HSD (rango
+studentizado), Bonferroni y Holm, y las letras de agrupamiento se obtienen
+con el algoritmo de inserción y absorción de Piepho (2004).
+"""
+
+import string
+import warnings
+
+import numpy as np
+import pandas as pd
+from scipy import interpolate, stats
+
+ADJUSTMENTS = ("tukey", "bonferroni", "holm")
+
+# Por encima de este número de parejas la cola del rango studentizado se
+# interpola en una grilla en lugar de integrarse pareja por pareja
+TUKEY_GRID = 48
+
+
+def tukey_pvalues(q, v, df_error):
+    """P(Q_{v, df} > q) para un vector de estadísticos de rango studentizado."""
+    q = np.asarray(q, dtype=np.float64)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        if len(q) <= TUKEY_GRID:
+            return stats.studentized_range.sf(q, v, df_error)
+        # Nodos en los cuantiles de los propios q: densos donde hay parejas
+        grid = np.unique(np.concatenate([[0.0], np.quantile(q, np.linspace(0, 1, TUKEY_GRID))]))
+        sf = stats.studentized_range.sf(grid, v, df_error)
+    # log(sf) es suave en q: spline monótona sobre la grilla
+    log_sf = np.log(np.clip(sf, 1e-300, 1.0))
+    log_sf = np.minimum.accumulate(log_sf)
+    spline = interpolate.PchipInterpolator(grid, log_sf)
+    return np.clip(np.exp(spline(q)), 0.0, 1.0)
+
+
+def holm(p):
+    """p-valores ajustados de Holm (escalonado descendente)."""
+    m = len(p)
+    order = np.argsort(p)
+    adjusted = np.maximum.accumulate((m - np.arange(m)) * p[order])
+    out = np.empty(m)
+    out[order] = np.minimum(adjusted, 1.0)
+    return out
+
+
+def pairwise_table(means, labels, df_error, cov=None, se_diff=None):
+    """Todas las diferencias m_i - m_j con sus p-valores ajustados.
+
+    ``cov`` es la covarianza de los efectos (o de las medias ajustadas); si se
+    da ``se_diff`` (BIBD) se usa ese error estándar común para todas las parejas.
+    """
+    means = np.asarray(means, dtype=np.float64)
+    v = len(means)
+    i, j = np.triu_indices(v, 1)
+    diff = means[i] - means[j]
+    if se_diff is not None:
+        se = np.full(len(diff), float(se_diff))
+    elif cov is not None:
+        d = np.diag(cov)
+        se = np.sqrt(d[i] + d[j] - 2 * cov[i, j])
+    else:
+        raise ValueError("❌ Se necesita la covarianza o el error estándar de las diferencias.")
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = diff / se
+    p = 2 * stats.t.sf(np.abs(t), df_error)
+    m = len(p)
+    labels = np.asarray(labels)
+    return pd.DataFrame(
+        {
+            "Café A": labels[i],
+            "Café B": labels[j],
+            "Diferencia": diff,
+            "Error Estándar": se,
+            "t": t,
+            "p": p,
+            "p Tukey": tukey_pvalues(np.abs(t) * np.sqrt(2), v, df_error),
+            "p Bonferroni": np.minimum(p * m, 1.0),
+            "p Holm": holm(p),
+        }
+    )
+
+
+def _letter(n):
+    # a..z, A..Z, luego aa, ab, ...
+    letters = string.ascii_lowercase + string.ascii_uppercase
+    if n < len(letters):
+        return letters[n]
+    out = ""
+    n -= len(letters) - 27
+    while n:
+        n, rem = divmod(n - 1, 26)
+        out = string.ascii_lowercase[rem] + out
+    return out
+
+
+def compact_letters(means, labels, different):
+    """Letras de agrupamiento: dos medias sin letra común difieren.
+
+    ``different`` es una lista de parejas (i, j) de índices significativamente
+    distintas. Recorriendo las medias de mayor a menor, cada grupo se extiende
+    con las medias compatibles con todos sus miembros; luego se agregan grupos
+    para las parejas no distintas que quedaron sin letra común y se eliminan
+    los grupos contenidos en otro.
+    """
+    means = np.asarray(means, dtype=np.float64)
+    v = len(means)
+    order = np.argsort(-means, kind="stable")
+    same = np.ones((v, v), dtype=bool)
+    for i, j in different:
+        same[i, j] = same[j, i] = False
+    same = same[np.ix_(order, order)]
+
+    def grow(seed):
+        # Extiende el grupo con las medias compatibles con todos sus miembros
+        members = np.zeros(v, dtype=bool)
+        members[seed] = True
+        ok = np.logical_and.reduce(same[seed])
+        for j in np.flatnonzero(ok):
+            if ok[j]:
+                members[j] = True
+                ok &= same[j]
+        return members
+
+    groups = [grow([i]) for i in range(v)]
+
+    # Parejas no distintas sin letra común: un grupo nuevo a partir de cada una
+    covered = np.zeros((v, v), dtype=bool)
+    for g in groups:
+        covered |= np.outer(g, g)
+    pending = np.triu(same & ~covered, 1)
+    while pending.any():
+        a, b = np.argwhere(pending)[0]
+        g = grow([a, b])
+        groups.append(g)
+        pending &= ~np.outer(g, g)
+    groups = np.array(groups)
+
+    # Absorción: quitar grupos repetidos o contenidos en otro
+    groups = np.unique(groups, axis=0)
+    as_int = groups.astype(np.int32)
+    inside = (as_int @ (1 - as_int).T) == 0
+    np.fill_diagonal(inside, False)
+    groups = groups[~inside.any(axis=1)]
+
+    # Letras en el orden de la mejor media de cada grupo
+    groups = groups[np.argsort(np.argmax(groups, axis=1), kind="stable")]
+    # Con más de 52 grupos las letras tienen varios caracteres: se separan
+    sep = "" if len(groups) <= 52 else " "
+    letters = np.empty(v, dtype=object)
+    letters[order] = [sep.join(_letter(c) for c in np.flatnonzero(groups[:, t]))
+                      for t in range(v)]
+    return pd.Series(list(letters), index=pd.Index(labels, name="Café"), name="Grupo")
+
+
+def compare_means(means, labels, df_error, cov=None, se_diff=None, alpha=0.05,
+                  adjustment="tukey"):
+    """(tabla de parejas, letras) con significancia según ``adjustment``."""
+    if adjustment not in ADJUSTMENTS:
+        raise ValueError(f"❌ Ajuste desconocido: {adjustment}. Opciones: {', '.join(ADJUSTMENTS)}")
+    table = pairwise_table(means, labels, df_error, cov=cov, se_diff=se_diff)
+    column = {"tukey": "p Tukey", "bonferroni": "p Bonferroni", "holm": "p Holm"}[adjustment]
+    table["Significativa"] = table[column] < alpha
+    i, j = np.triu_indices(len(means), 1)
+    sig = table["Significativa"].to_numpy()
+    letters = compact_letters(means, labels, zip(i[sig], j[sig]))
+    return table, letters
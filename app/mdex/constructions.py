@@ -0,0 +1,473 @@
+"""Construcciones algebraicas directas de BIBD.
+
+Antes de buscar un diseño por backtracking intentamos las construcciones
+clásicas conocidas: diseño trivial (todos los k-subconjuntos), geometrías
+proyectivas y afines sobre GF(q), conjuntos de diferencias de Paley, sistemas
+triples de Steiner (Bose / Skolem), complementos y múltiplos de diseños con
+λ menor y, al final, familias de diferencias cíclicas. Estas últimas son una
+búsqueda acotada: solo se intentan cuando nada más directo aplica, también
+al construir la base de un complemento o de un múltiplo.
+
+Todas las funciones devuelven una lista de bloques (tuplas ordenadas de
+tratamientos 0..v-1) o ``None`` si la construcción no aplica.
+"""
+
+from functools import lru_cache, partial
+from itertools import combinations, product
+from math import comb
+
+
+# ----------------------------------------------------------------------
+# ------------------------- ARITMÉTICA EN GF(q) ------------------------
+# ----------------------------------------------------------------------
+
+def prime_power(q):
+    """Devuelve (p, n) si q = p^n con p primo, o None."""
+    if q < 2:
+        return None
+    p = 2
+    while p * p <= q:
+        if q % p == 0:
+            break
+        p += 1
+    else:
+        return q, 1
+    n = 0
+    while q % p == 0:
+        q //= p
+        n += 1
+    return (p, n) if q == 1 else None
+
+
+def _poly_mod(a, m, p):
+    # a, m: coeficientes de menor a mayor grado; m mónico
+    a = list(a)
+    while len(a) >= len(m):
+        c = a[-1]
+        if c:
+            shift = len(a) - len(m)
+            for i, mi in enumerate(m):
+                a[shift + i] = (a[shift + i] - c * mi) % p
+        a.pop()
+    return a
+
+
+def _irreducible(p, n):
+    # Primer polinomio mónico de grado n sin factores de grado <= n/2
+    for coefs in product(range(p), repeat=n):
+        poly = list(coefs) + [1]
+        if poly[0] == 0:
+            continue
+        reducible = False
+        for d in range(1, n // 2 + 1):
+            for low in product(range(p), repeat=d):
+                if not any(_poly_mod(poly, list(low) + [1], p)):
+                    reducible = True
+                    break
+            if reducible:
+                break
+        if not reducible:
+            return poly
+    raise ValueError(f"No existe polinomio irreducible de grado {n} sobre GF({p})")
+
+
+class GaloisField:
+    """Campo finito GF(p^n) con elementos codificados como enteros 0..q-1.
+
+    El entero ``e = c_0 + c_1 p + ... + c_{n-1} p^{n-1}`` representa el
+    polinomio con coeficientes ``c_i``. Para n = 1 la aritmética es módulo p.
+    """
+
+    def __init__(self, q):
+        pn = prime_power(q)
+        if pn is None:
+            raise ValueError(f"{q} no es potencia de primo")
+        self.q = q
+        self.p, self.n = pn
+        if self.n > 1:
+            self._build_tables()
+
+    def _digits(self, e):
+        out = []
+        for _ in range(self.n):
+            out.append(e % self.p)
+            e //= self.p
+        return out
+
+    def _number(self, digits):
+        e = 0
+        for c in reversed(digits):
+            e = e * self.p + c
+        return e
+
+    def _build_tables(self):
+        p, q = self.p, self.q
+        modulus = _irreducible(p, self.n)
+        digits = [self._digits(e) for e in range(q)]
+        self._add = [[self._number([(x + y) % p for x, y in zip(da, db)]) for db in digits] for da in digits]
+        self._mul = [[0] * q for _ in range(q)]
+        for a in range(q):
+            for b in range(a, q):
+                prod = [0] * (2 * self.n - 1)
+                for i, x in enumerate(digits[a]):
+                    if x:
+                        for j, y in enumerate(digits[b]):
+                            prod[i + j] = (prod[i + j] + x * y) % p
+                red = _poly_mod(prod, modulus, p) + [0] * self.n
+                self._mul[a][b] = self._mul[b][a] = self._number(red[:self.n])
+
+    def add(self, a, b):
+        if self.n == 1:
+            return (a + b) % self.p
+        return self._add[a][b]
+
+    def mul(self, a, b):
+        if self.n == 1:
+            return (a * b) % self.p
+        return self._mul[a][b]
+
+    def inv(self, a):
+        if a == 0:
+            raise ZeroDivisionError("0 no tiene inverso en GF(q)")
+        if self.n == 1:
+            return pow(a, self.p - 2, self.p)
+        row = self._mul[a]
+        return row.index(1)
+
+    def squares(self):
+        """Conjunto de cuadrados no nulos del campo."""
+        return {self.mul(x, x) for x in range(1, self.q)}
+
+
+@lru_cache(maxsize=None)
+def galois_field(q):
+    return GaloisField(q)
+
+
+# ----------------------------------------------------------------------
+# ----------------------------- UTILIDADES -----------------------------
+# ----------------------------------------------------------------------
+
+def _normalize(blocks):
+    return sorted(tuple(sorted(b)) for b in blocks)
+
+
+def _develop(base_blocks, v):
+    # Desarrollo cíclico de bloques base en Z_v
+    return [tuple(sorted((x + g) % v for x in base)) for base in base_blocks for g in range(v)]
+
+
+def _projective_points(field, dim):
+    # Vectores de GF(q)^(dim+1) normalizados: primera coordenada no nula = 1
+    q = field.q
+    points = []
+    for vec in product(range(q), repeat=dim + 1):
+        lead = next((c for c in vec if c), None)
+        if lead == 1:
+            points.append(vec)
+    return points
+
+
+def _dot(field, a, b):
+    s = 0
+    for x, y in zip(a, b):
+        if x and y:
+            s = field.add(s, field.mul(x, y))
+    return s
+
+
+# ----------------------------------------------------------------------
+# ---------------------------- CONSTRUCCIONES --------------------------
+# ----------------------------------------------------------------------
+
+def trivial_design(v, k, lam):
+    """Todos los k-subconjuntos (λ0 = C(v-2, k-2)), repetidos λ/λ0 veces."""
+    if not 2 <= k <= v:
+        return None
+    lam0 = comb(v - 2, k - 2)
+    if lam % lam0 != 0:
+        return None
+    # Evitar materializar diseños gigantes: basta con que quepan en memoria
+    if comb(v, k) * (lam // lam0) > 200_000:
+        return None
+    return list(combinations(range(v), k)) * (lam // lam0)
+
+
+def projective_geometry(v, k, lam):
+    """Puntos vs hiperplanos de PG(d, q)."""
+    for q in range(2, v):
+        if prime_power(q) is None:
+            continue
+        d = 2
+        while True:
+            pts = (q ** (d + 1) - 1) // (q - 1)
+            if pts > v:
+                break
+            kk = (q ** d - 1) // (q - 1)
+            ll = (q ** (d - 1) - 1) // (q - 1)
+            if (pts, kk, ll) == (v, k, lam):
+                field = galois_field(q)
+                points = _projective_points(field, d)
+                index = {pt: i for i, pt in enumerate(points)}
+                blocks = []
+                for h in points:
+                    blocks.append(tuple(index[pt] for pt in points if _dot(field, h, pt) == 0))
+                return _normalize(blocks)
+            d += 1
+    return None
+
+
+def affine_geometry(v, k, lam):
+    """Puntos vs hiperplanos (y sus trasladados) de AG(d, q)."""
+    for q in range(2, v + 1):
+        if prime_power(q) is None:
+            continue
+        d = 2
+        while q ** d <= v:
+            if (q ** d, q ** (d - 1), (q ** (d - 1) - 1) // (q - 1)) == (v, k, lam):
+                field = galois_field(q)
+                points = list(product(range(q), repeat=d))
+                index = {pt: i for i, pt in enumerate(points)}
+                blocks = []
+                # Cada dirección normal (punto proyectivo de PG(d-1, q)) define
+                # una clase paralela de q hiperplanos
+                for normal in _projective_points(field, d - 1):
+                    classes = [[] for _ in range(q)]
+                    for pt in points:
+                        classes[_dot(field, normal, pt)].append(index[pt])
+                    blocks.extend(tuple(c) for c in classes)
+                return _normalize(blocks)
+            d += 1
+    return None
+
+
+def geometry_lines(v, k, lam):
+    """Puntos vs rectas de PG(d, q) o AG(d, q) con d >= 3 (λ = 1)."""
+    if lam != 1:
+        return None
+    for q in range(2, k + 1):
+        if prime_power(q) is None:
+            continue
+        field = galois_field(q) if k in (q, q + 1) else None
+        if field is None:
+            continue
+        d = 3
+        while q ** d <= v:
+            if k == q + 1 and (q ** (d + 1) - 1) // (q - 1) == v:
+                points = _projective_points(field, d)
+                affine = False
+            elif k == q and q ** d == v:
+                points = list(product(range(q), repeat=d))
+                affine = True
+            else:
+                d += 1
+                continue
+            index = {pt: i for i, pt in enumerate(points)}
+            minus_one = _neg_one(field)
+            lines = set()
+            for a, b in combinations(points, 2):
+                if affine:
+                    # Recta a + t (b - a), t ∈ GF(q)
+                    diff = tuple(field.add(y, field.mul(minus_one, x)) for x, y in zip(a, b))
+                    line = {tuple(field.add(x, field.mul(t, dx)) for x, dx in zip(a, diff)) for t in range(q)}
+                else:
+                    # Recta proyectiva generada por a y b: {b} ∪ {a + t b}
+                    line = {b}
+                    for t in range(q):
+                        vec = tuple(field.add(x, field.mul(t, y)) for x, y in zip(a, b))
+                        lead = next(c for c in vec if c)
+                        inv = field.inv(lead)
+                        line.add(tuple(field.mul(inv, c) for c in vec))
+                lines.add(tuple(sorted(index[pt] for pt in line)))
+            return _normalize(lines)
+    return None
+
+
+def _neg_one(field):
+    # -1 en GF(p^n): el único x con 1 + x = 0
+    return next(x for x in range(field.q) if field.add(1, x) == 0)
+
+
+def paley_design(v, k, lam):
+    """Conjunto de diferencias de Paley en GF(q), q ≡ 3 (mod 4)."""
+    if v % 4 != 3 or prime_power(v) is None:
+        return None
+    if (k, lam) != ((v - 1) // 2, (v - 3) // 4):
+        return None
+    field = galois_field(v)
+    base = sorted(field.squares())
+    return _normalize(tuple(field.add(x, g) for x in base) for g in range(v))
+
+
+def steiner_triple_system(v, k, lam):
+    """Sistemas triples de Steiner: Bose (v ≡ 3 mod 6) y Skolem (v ≡ 1 mod 6)."""
+    if k != 3 or lam != 1 or v < 7:
+        return None
+    blocks = []
+    if v % 6 == 3:
+        m = v // 3  # orden del cuasigrupo idempotente conmutativo
+        half = (m + 1) // 2
+
+        def pt(x, i):
+            return x + m * (i % 3)
+
+        def op(x, y):
+            return (half * (x + y)) % m
+
+        for x in range(m):
+            blocks.append((pt(x, 0), pt(x, 1), pt(x, 2)))
+        for x, y in combinations(range(m), 2):
+            for i in range(3):
+                blocks.append((pt(x, i), pt(y, i), pt(op(x, y), i + 1)))
+    elif v % 6 == 1:
+        n = (v - 1) // 6
+        m = 2 * n  # orden del cuasigrupo semi-idempotente conmutativo
+        inf = v - 1
+
+        def pt(x, i):
+            return x + m * (i % 3)
+
+        def op(x, y):
+            s = (x + y) % m
+            return s // 2 if s % 2 == 0 else s // 2 + n
+
+        for x in range(n):
+            blocks.append((pt(x, 0), pt(x, 1), pt(x, 2)))
+            for i in range(3):
+                blocks.append((inf, pt(n + x, i), pt(x, i + 1)))
+        for x, y in combinations(range(m), 2):
+            for i in range(3):
+                blocks.append((pt(x, i), pt(y, i), pt(op(x, y), i + 1)))
+    else:
+        return None
+    return _normalize(blocks)
+
+
+def cyclic_difference_family(v, k, lam, max_work=400_000):
+    """Familia de diferencias cíclica en Z_v buscada con backtracking acotado.
+
+    Sólo se consideran órbitas completas, por lo que se requiere
+    λ(v-1) ≡ 0 (mod k(k-1)). ``max_work`` acota las diferencias actualizadas
+    (menos de medio segundo en el peor caso).
+    """
+    if k < 3 or k >= v or (lam * (v - 1)) % (k * (k - 1)) != 0:
+        return None
+    t = lam * (v - 1) // (k * (k - 1))
+    diff_count = [0] * v
+    bases = []
+    work = 0
+
+    def add(block, x, sign):
+        nonlocal work
+        work += len(block)
+        ok = True
+        for y in block:
+            d = (x - y) % v
+            diff_count[d] += sign
+            diff_count[v - d] += sign
+            if diff_count[d] > lam or diff_count[v - d] > lam:
+                ok = False
+        return ok
+
+    def new_block():
+        # La menor diferencia aún no cubierta debe aparecer en algún bloque
+        # restante; trasladándolo, podemos suponer que contiene {0, d}.
+        d = next(i for i in range(1, v) if diff_count[i] < lam)
+        ok = add([0], d, 1)
+        if ok and extend([0, d], 1):
+            return True
+        add([0], d, -1)
+        return False
+
+    def extend(block, start):
+        if work > max_work:
+            return False
+        if len(block) == k:
+            bases.append(tuple(block))
+            if len(bases) == t or new_block():
+                return True
+            bases.pop()
+            return False
+        for x in range(start, v):
+            if x in block:
+                continue
+            if add(block, x, 1) and extend(block + [x], x + 1):
+                return True
+            add(block, x, -1)
+            if work > max_work:
+                return False
+        return False
+
+    if not new_block():
+        return None
+    return _normalize(_develop(bases, v))
+
+
+def complement_design(v, k, lam, search=True):
+    """Complemento de un diseño (v, v-k, λ') con λ' = b - 2r + λ."""
+    if 2 * k <= v or v - k < 2:
+        return None
+    b = lam * v * (v - 1) // (k * (k - 1))
+    r = lam * (v - 1) // (k - 1)
+    lam_c = b - 2 * r + lam
+    if lam_c < 1:
+        return None
+    found = _construct(v, v - k, lam_c, search)
+    if found is None:
+        return None
+    blocks = found[1]
+    full = set(range(v))
+    return _normalize(tuple(full - set(blk)) for blk in blocks)
+
+
+def multiple_design(v, k, lam, search=True):
+    """Repite m veces un diseño con λ/m, probando primero el divisor mayor."""
+    for m in range(2, lam + 1):
+        if lam % m != 0:
+            continue
+        found = _construct(v, k, lam // m, search)
+        if found is not None:
+            return _normalize(list(found[1]) * m)
+    return None
+
+
+# Construcciones directas: milisegundos en el peor caso
+CONSTRUCTIONS = [
+    ("trivial", trivial_design),
+    ("geometría proyectiva", projective_geometry),
+    ("geometría afín", affine_geometry),
+    ("Paley", paley_design),
+    ("sistema triple de Steiner", steiner_triple_system),
+    ("rectas de una geometría", geometry_lines),
+]
+# A partir de un diseño con otros parámetros; aceptan ``search``
+DERIVED = [
+    ("complemento", complement_design),
+    ("múltiplo", multiple_design),
+]
+
+
+@lru_cache(maxsize=256)
+def _construct(v, k, lam, search=True):
+    """(método, bloques) o None. Sin ``search`` no se busca ninguna familia
+    de diferencias, tampoco en la base de un complemento o un múltiplo."""
+    builders = CONSTRUCTIONS + [(name, partial(fn, search=False)) for name, fn in DERIVED]
+    if search:
+        builders += [("familia de diferencias cíclica", cyclic_difference_family)] + DERIVED
+    for name, builder in builders:
+        blocks = builder(v, k, lam)
+        if blocks is not None:
+            return name, tuple(tuple(b) for b in blocks)
+    return None
+
+
+def construct_bibd(v, k, lam):
+    """Bloques de un BIBD(v, k, λ) por construcción directa, o None."""
+    found = _construct(v, k, lam)
+    return None if found is None else [tuple(b) for b in found[1]]
+
+
+def construction_method(v, k, lam):
+    """Nombre de la construcción usada para (v, k, λ), o None."""
+    found = _construct(v, k, lam)
+    return None if found is None else found[0]
@@ -0,0 +1,221 @@
+"""Representación compacta de un archivo de cata compartida por todas las páginas.
+
+Cada página volvía a derivar la misma estructura de las columnas de texto o
+categorías (``unique()``, ``groupby``, ``factorize`` en cada ajuste y en
+cada ejecución). ``TastingData`` se construye una vez por conjunto de datos
+y queda en la caché de ajustes:
+
+- códigos int32 de catador y variedad por puntaje, en orden de aparición
+  igual que ``pd.factorize``, y el perfil (atributo del catador) por catador;
+- puntajes float32;
+- diccionarios código → etiqueta (``tasters``, ``varieties``, ``profiles``,
+  ``names``) y, por catador/variedad, su perfil y su nombre;
+- desplazamientos tipo CSR por catador y por variedad: las filas de un grupo
+  son una rebanada de ``*_order``.
+
+Las matrices de bloques (``BlockMatrices``) salen de los mismos códigos sin
+volver a codificar, también cuando la variedad se identifica por su nombre.
+"""
+
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from mdex.matrix import BlockMatrices
+
+TASTER_COL = "Catador_ID"
+VARIETY_COL = "Variedad_Codigo"
+SCORE_COL = "Puntaje_SCA"
+PROFILE_COL = "Perfil_Catador"
+NAME_COL = "Variedad_Nombre"
+
+
+def _codes(values):
+    codes, labels = pd.factorize(values)
+    return codes.astype(np.int32), pd.Index(labels)
+
+
+def _group_offsets(codes, other, n):
+    """(orden de filas por ``codes`` y luego ``other``, desplazamientos)."""
+    order = np.lexsort((other, codes)).astype(np.int32)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(codes, minlength=n), out=offsets[1:])
+    return order, offsets
+
+
+def _first_per_group(codes, values, n, fill=-1):
+    """Valor de la primera fila de cada grupo."""
+    first = np.full(n, fill, dtype=values.dtype)
+    first[codes[::-1]] = values[::-1]
+    return first
+
+
+@dataclass
+class TastingData:
+    taster_codes: np.ndarray     # int32, uno por puntaje
+    variety_codes: np.ndarray    # int32
+    scores: np.ndarray           # float32
+    tasters: pd.Index            # código → catador
+    varieties: pd.Index          # código → variedad
+    profiles: pd.Index           # código → perfil
+    names: pd.Index              # código → nombre de variedad
+    taster_profile: np.ndarray   # int32: perfil de cada catador (su primera fila), -1 si no hay
+    variety_name: np.ndarray     # int32: nombre de cada variedad (su primera fila), -1 si no hay
+    taster_order: np.ndarray     # filas por (catador, variedad)
+    taster_offsets: np.ndarray
+    variety_order: np.ndarray    # filas por (variedad, catador)
+    variety_offsets: np.ndarray
+    columns: tuple               # (catador, variedad, puntaje, perfil, nombre); None si falta
+    _matrices: dict = field(default_factory=dict, repr=False, compare=False)
+
+    @classmethod
+    def from_frame(cls, df, taster_col=TASTER_COL, variety_col=VARIETY_COL, score_col=SCORE_COL,
+                   profile_col=PROFILE_COL, name_col=NAME_COL):
+        used = {taster_col, variety_col, score_col}
+        profile_col = profile_col if profile_col in df.columns and profile_col not in used else None
+        name_col = name_col if name_col in df.columns and name_col not in used else None
+
+        taster_codes, tasters = _codes(df[taster_col])
+        variety_codes, varieties = _codes(df[variety_col])
+        b, v = len(tasters), len(varieties)
+        if profile_col is not None:
+            profile_codes, profiles = _codes(df[profile_col])
+            taster_profile = _first_per_group(taster_codes, profile_codes, b)
+        else:
+            profiles, taster_profile = pd.Index([]), np.full(b, -1, dtype=np.int32)
+        if name_col is not None:
+            name_codes, names = _codes(df[name_col])
+            variety_name = _first_per_group(variety_codes, name_codes, v)
+        else:
+            names, variety_name = pd.Index([]), np.full(v, -1, dtype=np.int32)
+
+        taster_order, taster_offsets = _group_offsets(taster_codes, variety_codes, b)
+        variety_order, variety_offsets = _group_offsets(variety_codes, taster_codes, v)
+        return cls(
+            taster_codes=taster_codes,
+            variety_codes=variety_codes,
+            scores=df[score_col].to_numpy(dtype=np.float32),
+            tasters=tasters,
+            varieties=varieties,
+            profiles=profiles,
+            names=names,
+            taster_profile=taster_profile,
+            variety_name=variety_name,
+            taster_order=taster_order,
+            taster_offsets=taster_offsets,
+            variety_order=variety_order,
+            variety_offsets=variety_offsets,
+            columns=(taster_col, variety_col, score_col, profile_col, name_col),
+        )
+
+    # ------------------------------------------------------------------
+    # Tamaños
+    # ------------------------------------------------------------------
+    @property
+    def n_obs(self):
+        return len(self.scores)
+
+    @property
+    def b(self):
+        return len(self.tasters)
+
+    @property
+    def v(self):
+        return len(self.varieties)
+
+    @property
+    def nbytes(self):
+        arrays = (self.taster_codes, self.variety_codes, self.scores,
+                  self.taster_profile, self.variety_name, self.taster_order,
+                  self.taster_offsets, self.variety_order, self.variety_offsets)
+        labels = (self.tasters, self.varieties, self.profiles, self.names)
+        return (sum(a.nbytes for a in arrays)
+                + sum(int(i.memory_usage(deep=True)) for i in labels))
+
+    # ------------------------------------------------------------------
+    # Grupos
+    # ------------------------------------------------------------------
+    def taster_rows(self, i):
+        """Filas del catador de código ``i``, ordenadas por variedad."""
+        return self.taster_order[self.taster_offsets[i]:self.taster_offsets[i + 1]]
+
+    def variety_rows(self, j):
+        """Filas de la variedad de código ``j``, ordenadas por catador."""
+        return self.variety_order[self.variety_offsets[j]:self.variety_offsets[j + 1]]
+
+    def variety_counts(self):
+        return np.diff(self.variety_offsets)
+
+    def variety_names(self):
+        """Nombre de cada variedad ("" si no hay columna de nombre)."""
+        if not len(self.names):
+            return np.full(self.v, "", dtype=object)
+        names = np.asarray(self.names.astype(str), dtype=object)
+        return np.where(self.variety_name >= 0, names[self.variety_name], "")
+
+    def taster_profiles(self):
+        """Serie catador → perfil (None si no hay columna de perfil)."""
+        if not len(self.profiles):
+            return None
+        labels = np.asarray(self.profiles, dtype=object)
+        values = np.where(self.taster_profile >= 0, labels[self.taster_profile], None)
+        return pd.Series(values, index=self.tasters, name=self.columns[3])
+
+    def variety_means(self, treat_col=None):
+        """Media simple por variedad (o por nombre), sin contar puntajes vacíos."""
+        codes, labels = self._treatment(treat_col)
+        valid = ~np.isnan(self.scores)
+        sums = np.bincount(codes[valid], weights=self.scores[valid], minlength=len(labels))
+        counts = np.bincount(codes[valid], minlength=len(labels))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = sums / counts
+        return pd.Series(means, index=labels.rename(treat_col or self.columns[1]))
+
+    # ------------------------------------------------------------------
+    # Matrices
+    # ------------------------------------------------------------------
+    def _treatment(self, treat_col=None):
+        """(códigos por puntaje, etiquetas) de la variedad o de su nombre."""
+        if treat_col is None or treat_col == self.columns[1]:
+            return self.variety_codes, self.varieties
+        if treat_col == self.columns[4]:
+            if (self.variety_name < 0).any():
+                raise ValueError("❌ Hay variedades sin nombre.")
+            # Nombres en orden de aparición, igual que factorize sobre la columna
+            used = np.unique(self.variety_name, return_index=True)[1]
+            first = np.sort(used)
+            remap = np.full(len(self.names), -1, dtype=np.int32)
+            remap[self.variety_name[first]] = np.arange(len(first), dtype=np.int32)
+            return remap[self.variety_name][self.variety_codes], self.names[self.variety_name[first]]
+        raise KeyError(f"❌ La columna {treat_col} no es la variedad ni su nombre.")
+
+    def matrices(self, treat_col=None):
+        """``BlockMatrices`` catador × variedad (o × nombre) a partir de los códigos."""
+        key = treat_col or self.columns[1]
+        if key not in self._matrices:
+            treat_codes, treat_labels = self._treatment(treat_col)
+            self._matrices[key] = BlockMatrices.from_codes(
+                self.taster_codes, self.tasters, treat_codes, treat_labels, self.scores
+            )
+        return self._matrices[key]
+
+
+def tasting_data(df, taster_col=TASTER_COL, variety_col=VARIETY_COL, score_col=SCORE_COL,
+                 cache=None):
+    """``TastingData`` de ``df``, construido una vez por contenido y columnas.
+
+    Si la variedad se pide por su nombre se reutiliza la representación por
+    código (``matrices(NAME_COL)`` da la misma matriz).
+    """
+    from mdex.cache import dataset_key, default_cache
+
+    if variety_col == NAME_COL and VARIETY_COL in df.columns:
+        variety_col = VARIETY_COL
+    cols = [taster_col, variety_col, score_col]
+    cols += [c for c in (PROFILE_COL, NAME_COL) if c in df.columns and c not in cols]
+    cache = cache or default_cache()
+    return cache.get_or_compute(
+        (dataset_key(df, cols), "tasting", taster_col, variety_col, score_col),
+        lambda: TastingData.from_frame(df, taster_col, variety_col, score_col),
+    )
@@ -0,0 +1,182 @@
+"""Verificación del diseño de un conjunto de datos subido.
+
+Antes de tratar los datos como un BIBD se comprueba el balance con la
+incidencia dispersa ``N`` (v × b) y la concurrencia ``NNᵀ``, obtenida con un
+único producto disperso: repeticiones r por variedad, tamaños k por catador,
+conteos λ por pareja de variedades, celdas repetidas y conectividad.
+
+La eficiencia del diseño es el factor de eficiencia A
+
+    E = (v - 1) / (r̄ · tr C⁺),    C = R - N K⁻¹ Nᵀ
+
+que en un BIBD vale exactamente λv/(rk) y no requiere autovalores. En los
+demás diseños se calcula con los autovalores de C (v × v, denso) mientras v
+no supere ``EIGEN_MAX_V``. Todo el costo depende de las observaciones y de
+v, no de recorrer parejas en Python: 10⁵ catadores toman milisegundos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.sparse import csgraph
+
+# Por encima de este número de variedades no se descompone C
+EIGEN_MAX_V = 2000
+# Parejas con mayor desviación que se listan
+PAIR_ROWS = 20
+
+
+@dataclass
+class DesignDiagnostics:
+    v: int
+    b: int
+    n_obs: int
+    repeated: int          # celdas catador × variedad con más de un puntaje
+    r_min: int
+    r_max: int
+    k_min: int
+    k_max: int
+    lam_min: int           # 0 si alguna pareja nunca coincide
+    lam_max: int
+    lam_mean: float
+    lam_sd: float
+    pairs_missing: int     # parejas de variedades que ningún catador comparó
+    components: int        # componentes conexas del grafo de variedades
+    efficiency: float      # factor de eficiencia A (NaN si no se calculó)
+    efficiency_method: str
+    pairs: pd.DataFrame    # parejas con mayor |λ_ij - λ̄|
+
+    @property
+    def connected(self):
+        return self.components == 1
+
+    @property
+    def is_bibd(self):
+        return (self.repeated == 0 and self.v >= 2 and self.r_min == self.r_max
+                and self.k_min == self.k_max and self.lam_min == self.lam_max > 0)
+
+    @property
+    def parameters(self):
+        """(k, r, λ) si el diseño es un BIBD, o None."""
+        if not self.is_bibd:
+            return None
+        return self.k_max, self.r_max, self.lam_max
+
+    def issues(self):
+        """Lista de problemas de balance, en texto para la interfaz."""
+        found = []
+        if self.repeated:
+            found.append(f"{self.repeated} celdas catador × variedad con puntajes repetidos.")
+        if not self.connected:
+            found.append(f"El diseño no es conexo: {self.components} grupos de variedades "
+                         "que no se pueden comparar entre sí.")
+        if self.r_min != self.r_max:
+            found.append(f"Repeticiones desiguales: r entre {self.r_min} y {self.r_max}.")
+        if self.k_min != self.k_max:
+            found.append(f"Catadores con distinto número de variedades: k entre "
+                         f"{self.k_min} y {self.k_max}.")
+        if self.pairs_missing:
+            found.append(f"{self.pairs_missing} parejas de variedades nunca coinciden en un catador.")
+        elif self.lam_min != self.lam_max:
+            found.append(f"Concurrencias desiguales: λ entre {self.lam_min} y {self.lam_max}.")
+        return found
+
+    def as_dict(self):
+        design = {"v": self.v, "b": self.b, "n_obs": self.n_obs,
+                  "conexo": self.connected, "bibd": self.is_bibd,
+                  "eficiencia": None if np.isnan(self.efficiency) else self.efficiency}
+        if self.is_bibd:
+            design.update(dict(zip(("k", "r", "lambda"), self.parameters)))
+        return design
+
+
+def _pair_table(conc, v, lam_mean, labels, rows):
+    """Parejas con mayor desviación respecto de λ̄ (incluye las que valen 0)."""
+    if rows == 0:
+        return pd.DataFrame(columns=["Variedad A", "Variedad B", "λ", "Desviación"])
+    if v <= EIGEN_MAX_V:
+        dense = conc.toarray()
+        i, j = np.triu_indices(v, 1)
+        counts = dense[i, j]
+    else:
+        # Solo las parejas observadas; las ausentes se informan por conteo
+        upper = sparse.triu(conc, 1).tocoo()
+        i, j, counts = upper.row, upper.col, upper.data
+    dev = counts - lam_mean
+    top = np.argsort(-np.abs(dev), kind="stable")[:rows]
+    labels = np.asarray(labels if labels is not None else np.arange(v), dtype=object)
+    return pd.DataFrame({
+        "Variedad A": labels[i[top]],
+        "Variedad B": labels[j[top]],
+        "λ": counts[top].astype(int),
+        "Desviación": dev[top],
+    })
+
+
+def _efficiency(n, r, k, v, bibd, lam):
+    """(factor de eficiencia A, método)."""
+    r_bar = r.mean()
+    if bibd:
+        return lam * v / (r[0] * k[0]), "λv/(rk)"
+    if v > EIGEN_MAX_V:
+        return float("nan"), "no calculada (demasiadas variedades)"
+    # C = R - N K⁻¹ Nᵀ
+    c = np.diag(r.astype(float)) - (n @ sparse.diags(1.0 / k) @ n.T).toarray()
+    eig = np.linalg.eigvalsh(c)[1:]
+    if eig[0] <= 1e-9 * max(eig[-1], 1.0):
+        return 0.0, "autovalores de C"
+    return float((v - 1) / (r_bar * (1.0 / eig).sum())), "autovalores de C"
+
+
+def design_diagnostics(n, labels=None, pair_rows=PAIR_ROWS, efficiency=True):
+    """``DesignDiagnostics`` a partir de la incidencia ``N`` (CSR v × b con
+    el número de puntajes por celda, ``BlockMatrices.incidence``).
+
+    Cada catador (columna de N) debe tener al menos un puntaje.
+    """
+    v, b = n.shape
+    repeated = int((n.data > 1).sum())
+    r = np.asarray(n.sum(axis=1)).ravel()
+    k = np.asarray(n.sum(axis=0)).ravel()
+    conc = (n @ n.T).tocsr()
+
+    # Parejas: triángulo superior de la concurrencia sin pasar a denso
+    upper = sparse.triu(conc, 1)
+    n_pairs = v * (v - 1) // 2
+    observed = upper.nnz
+    missing = n_pairs - observed
+    total = upper.sum()
+    lam_mean = total / n_pairs if n_pairs else 0.0
+    sq = (upper.data.astype(float) ** 2).sum()
+    lam_sd = float(np.sqrt(max(sq / n_pairs - lam_mean ** 2, 0.0))) if n_pairs else 0.0
+    lam_max = int(upper.data.max()) if observed else 0
+    lam_min = 0 if missing or not observed else int(upper.data.min())
+
+    components = int(csgraph.connected_components(conc, directed=False)[0]) if v else 0
+    diag = DesignDiagnostics(
+        v=v, b=b, n_obs=int(n.sum()), repeated=repeated,
+        r_min=int(r.min()), r_max=int(r.max()),
+        k_min=int(k.min()), k_max=int(k.max()),
+        lam_min=lam_min, lam_max=lam_max,
+        lam_mean=float(lam_mean), lam_sd=lam_sd,
+        pairs_missing=int(missing),
+        components=components,
+        efficiency=float("nan"),
+        efficiency_method="no calculada",
+        pairs=_pair_table(conc, v, lam_mean, labels, pair_rows),
+    )
+    if efficiency:
+        value, diag.efficiency_method = _efficiency(n, r, k, v, diag.is_bibd, lam_max)
+        diag.efficiency = float(value)
+    return diag
+
+
+def diagnose(matrices, **options):
+    """Diagnóstico del diseño de un ``BlockMatrices``.
+
+    Solo cuenta los puntajes observados: ``BlockMatrices`` ya descartó las
+    filas con el puntaje vacío.
+    """
+    return design_diagnostics(matrices.incidence(), labels=matrices.treat_labels, **options)
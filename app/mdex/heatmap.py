@@ -0,0 +1,275 @@
+"""Mapa de calor escalable de la grilla catador × variedad.
+
+``sns.heatmap(annot=True)`` dibuja un texto por celda y rehace la figura en
+cada ejecución de Streamlit, lo que no escala a miles de catadores. Aquí la
+grilla se prepara a partir de la matriz dispersa de puntajes (paginada,
+ordenada, agrupada) y el tipo de figura se elige por número de celdas:
+
+- hasta ``MPL_MAX_CELLS``: imagen estática de matplotlib, con los puntajes
+  escritos solo si cada celda mide al menos ``MIN_CELL_PX``;
+- hasta ``PLOTLY_MAX_CELLS``: heatmap interactivo de Plotly (una sola traza);
+- más: imagen rasterizada con un píxel por celda (promediando filas si hay
+  más de ``RASTER_MAX_ROWS``).
+
+La figura lista para mostrar (PNG o JSON de Plotly) queda en la caché de
+ajustes indexada por el hash de los datos y las opciones de visualización.
+"""
+
+import warnings
+from dataclasses import dataclass
+from io import BytesIO
+
+import numpy as np
+from scipy import sparse
+
+
+MPL_MAX_CELLS = 2_000
+PLOTLY_MAX_CELLS = 200_000
+RASTER_MAX_ROWS = 2_000
+# Tamaño mínimo (ancho, alto en píxeles) de una celda para escribir el puntaje
+MIN_CELL_PX = (34, 16)
+# Por encima de estas filas el agrupamiento jerárquico se reemplaza por la
+# proyección sobre la primera componente principal
+CLUSTER_MAX_ROWS = 3_000
+
+ORDERS = ("original", "media", "cluster")
+AGGREGATIONS = ("ninguna", "grupo", "bloques")
+
+
+@dataclass
+class Heatmap:
+    kind: str          # "matplotlib", "plotly" o "raster"
+    payload: object    # PNG (bytes) o figura de Plotly en JSON (str)
+    n_rows: int        # filas de la grilla mostrada
+    n_cols: int
+    total_rows: int    # filas antes de paginar
+    annotated: bool
+
+
+# ----------------------------------------------------------------------
+# Preparación de la grilla
+# ----------------------------------------------------------------------
+def _dense_rows(values, rows):
+    """Filas ``rows`` de la grilla dispersa como densa float32 con NaN."""
+    sub = values[rows]
+    grid = np.full(sub.shape, np.nan, dtype=np.float32)
+    r = np.repeat(np.arange(sub.shape[0]), np.diff(sub.indptr))
+    grid[r, sub.indices] = sub.data
+    return grid
+
+
+def _row_means(values, mask):
+    counts = np.asarray(mask.sum(axis=1)).ravel()
+    return np.asarray(values.sum(axis=1)).ravel() / np.maximum(counts, 1)
+
+
+def order_rows(grid, method):
+    """Permutación de filas: original, por media descendente o agrupamiento."""
+    n = len(grid)
+    if method == "original" or n < 3:
+        return np.arange(n)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # filas o columnas sin datos
+        row_mean = np.nanmean(grid, axis=1)
+        col_mean = np.nan_to_num(np.nanmean(grid, axis=0))
+    if method == "media":
+        return np.argsort(-np.nan_to_num(row_mean, nan=-np.inf), kind="stable")
+    filled = np.where(np.isnan(grid), col_mean[None, :], grid).astype(np.float64)
+    if n <= CLUSTER_MAX_ROWS:
+        from scipy.cluster import hierarchy
+
+        return hierarchy.leaves_list(hierarchy.linkage(filled, "average"))
+    centered = filled - filled.mean(axis=0)
+    _, _, vt = np.linalg.svd(centered, full_matrices=False)
+    return np.argsort(centered @ vt[0], kind="stable")
+
+
+def aggregate(grid, codes, n_groups):
+    """Promedio por grupo de filas (``codes`` indica el grupo de cada fila)."""
+    valid = ~np.isnan(grid)
+    sums = np.zeros((n_groups, grid.shape[1]))
+    counts = np.zeros((n_groups, grid.shape[1]))
+    np.add.at(sums, codes, np.where(valid, grid, 0.0))
+    np.add.at(counts, codes, valid)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (sums / counts).astype(np.float32)
+
+
+def bin_rows(grid, labels, size):
+    """Promedio de cada ``size`` filas consecutivas."""
+    codes = np.arange(len(grid)) // size
+    n_bins = int(codes[-1]) + 1 if len(grid) else 0
+    starts = np.arange(n_bins) * size
+    ends = np.minimum(starts + size, len(grid)) - 1
+    names = [f"{labels[s]}…{labels[e]}" if s != e else str(labels[s])
+             for s, e in zip(starts, ends)]
+    return aggregate(grid, codes, n_bins), names
+
+
+def prepare_grid(matrices, order="original", page=0, page_size=500, agg="ninguna",
+                 bin_size=10, groups=None, row_fmt="#{}"):
+    """(grilla, etiquetas de fila, total de filas) lista para dibujar.
+
+    ``groups`` es una serie alineada con las filas del DataFrame original
+    (por ejemplo ``Perfil_Catador``) y se usa con ``agg="grupo"``.
+    """
+    values = matrices.score_csr()
+    mask = values.copy()
+    mask.data = np.ones_like(mask.data)
+
+    if agg == "grupo":
+        # Promedio por grupo directamente sobre la matriz dispersa
+        codes, names = _block_groups(matrices, groups)
+        indicator = sparse.csr_matrix(
+            (np.ones(matrices.b), (codes, np.arange(matrices.b))), shape=(len(names), matrices.b)
+        )
+        with np.errstate(invalid="ignore", divide="ignore"):
+            grid = ((indicator @ values).toarray() / (indicator @ mask).toarray()).astype(np.float32)
+        perm = order_rows(grid, order)
+        return grid[perm], [str(names[i]) for i in perm], len(names)
+
+    labels = [row_fmt.format(x) for x in matrices.block_labels]
+    total = matrices.b
+    if order == "media":
+        perm = np.argsort(-_row_means(values, mask), kind="stable")
+    elif order == "cluster" and matrices.is_small() and total <= CLUSTER_MAX_ROWS:
+        perm = order_rows(_dense_rows(values, np.arange(total)), "cluster")
+    else:
+        perm = np.arange(total)
+    rows = perm[page * page_size:(page + 1) * page_size]
+    grid = _dense_rows(values, rows)
+    row_labels = [labels[i] for i in rows]
+    if order == "cluster" and not (matrices.is_small() and total <= CLUSTER_MAX_ROWS):
+        # Panel grande: el agrupamiento se hace dentro de la página
+        local = order_rows(grid, "cluster")
+        grid, row_labels = grid[local], [row_labels[i] for i in local]
+    if agg == "bloques" and bin_size > 1:
+        grid, row_labels = bin_rows(grid, row_labels, bin_size)
+    return grid, row_labels, total
+
+
+def _block_groups(matrices, groups):
+    # Grupo de cada catador: el de su primera fila
+    groups = groups.to_numpy()
+    first = np.full(matrices.b, -1)
+    first[matrices.block_codes[::-1]] = np.arange(len(matrices.block_codes))[::-1]
+    names, codes = np.unique(groups[first].astype(str), return_inverse=True)
+    return codes, names
+
+
+# ----------------------------------------------------------------------
+# Dibujo
+# ----------------------------------------------------------------------
+def choose_kind(n_cells):
+    if n_cells <= MPL_MAX_CELLS:
+        return "matplotlib"
+    if n_cells <= PLOTLY_MAX_CELLS:
+        return "plotly"
+    return "raster"
+
+
+def figure_height(n_rows):
+    return int(np.clip(22 * n_rows, 300, 900))
+
+
+def should_annotate(n_rows, n_cols, width_px=1100):
+    cell_w = width_px / max(n_cols, 1)
+    cell_h = figure_height(n_rows) / max(n_rows, 1)
+    return n_rows * n_cols <= MPL_MAX_CELLS and cell_w >= MIN_CELL_PX[0] and cell_h >= MIN_CELL_PX[1]
+
+
+def _render_matplotlib(grid, row_labels, col_labels, annotate, width_px, cmap):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    dpi = 100
+    fig, ax = plt.subplots(figsize=(width_px / dpi, figure_height(len(grid)) / dpi), dpi=dpi)
+    masked = np.ma.masked_invalid(grid)
+    image = ax.imshow(masked, aspect="auto", cmap=cmap, interpolation="nearest")
+    ax.set_xticks(range(len(col_labels)), [str(c) for c in col_labels])
+    step = max(1, len(row_labels) // 40)
+    ax.set_yticks(range(0, len(row_labels), step), row_labels[::step])
+    if annotate:
+        lo, hi = np.nanmin(grid), np.nanmax(grid)
+        mid = (lo + hi) / 2
+        for (i, j), val in np.ndenumerate(grid):
+            if not np.isnan(val):
+                ax.text(j, i, f"{val:.2f}", ha="center", va="center", fontsize=8,
+                        color="black" if val > mid else "white")
+    fig.colorbar(image, ax=ax)
+    fig.tight_layout()
+    buffer = BytesIO()
+    fig.savefig(buffer, format="png")
+    plt.close(fig)
+    return buffer.getvalue()
+
+
+def _render_plotly(grid, row_labels, col_labels, annotate, width_px, cmap):
+    import plotly.graph_objects as go
+
+    trace = go.Heatmap(
+        z=np.where(np.isnan(grid), None, grid.round(2)).tolist(),
+        x=[str(c) for c in col_labels],
+        y=row_labels,
+        colorscale=cmap.capitalize(),
+        hoverongaps=False,
+    )
+    if annotate:
+        trace.update(texttemplate="%{z:.2f}")
+    fig = go.Figure(trace)
+    fig.update_layout(height=figure_height(len(grid)), width=width_px,
+                      yaxis=dict(autorange="reversed"), margin=dict(l=10, r=10, t=10, b=10))
+    return fig.to_json()
+
+
+def _render_raster(grid, cmap):
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    buffer = BytesIO()
+    colormap = matplotlib.colormaps[cmap].with_extremes(bad="lightgrey")
+    plt.imsave(buffer, np.ma.masked_invalid(grid), cmap=colormap, format="png")
+    return buffer.getvalue()
+
+
+def render(grid, row_labels, col_labels, total_rows=None, width_px=1100, cmap="viridis"):
+    """Dibuja la grilla con el método adecuado para su tamaño."""
+    if len(grid) > RASTER_MAX_ROWS and choose_kind(grid.size) == "raster":
+        grid, row_labels = bin_rows(grid, row_labels, -(-len(grid) // RASTER_MAX_ROWS))
+    kind = choose_kind(grid.size)
+    annotate = kind != "raster" and should_annotate(len(grid), grid.shape[1], width_px)
+    if kind == "matplotlib":
+        payload = _render_matplotlib(grid, row_labels, col_labels, annotate, width_px, cmap)
+    elif kind == "plotly":
+        payload = _render_plotly(grid, row_labels, col_labels, annotate, width_px, cmap)
+    else:
+        payload = _render_raster(grid, cmap)
+    return Heatmap(kind, payload, len(grid), grid.shape[1],
+                   total_rows if total_rows is not None else len(grid), annotate)
+
+
+def cached_heatmap(df, block_col, treat_col, resp_col, group_col=None, width_px=1100,
+                   cmap="viridis", cache=None, **options):
+    """Heatmap en caché por contenido de los datos y opciones de visualización.
+
+    ``options`` se pasa a ``prepare_grid`` (orden, página, agregación...).
+    """
+    from mdex.cache import dataset_key, default_cache
+    from mdex.dataset import tasting_data
+
+    cache = cache or default_cache()
+    cols = (block_col, treat_col, resp_col) + ((group_col,) if group_col else ())
+    key = (dataset_key(df, cols), "heatmap", width_px, cmap, tuple(sorted(options.items())))
+
+    def compute():
+        data = tasting_data(df, block_col, treat_col, resp_col, cache=cache)
+        matrices = data.matrices(treat_col)
+        groups = df[group_col] if group_col else None
+        grid, row_labels, total = prepare_grid(matrices, groups=groups, **options)
+        return render(grid, row_labels, list(matrices.treat_labels), total, width_px, cmap)
+
+    return cache.get_or_compute(key, compute)
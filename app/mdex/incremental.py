@@ -0,0 +1,236 @@
+"""Análisis incremental para sesiones de cata en vivo.
+
+Durante una sesión los puntajes llegan catador por catador. ``LiveSession``
+guarda solo los estadísticos suficientes del modelo de bloques absorbidos
+(totales por variedad y por catador, conteos de incidencia, suma y suma de
+cuadrados) y los actualiza en O(1) por fila, O(k) por catador. Las medias
+ajustadas y la tabla ANOVA se calculan a pedido con
+``mdex.absorption.fit_from_statistics`` sin volver a leer el historial.
+
+Uso desde un script de estación de cata::
+
+    sesion = LiveSession()
+    sesion.add_block("T17", {"A": 86.5, "C": 82.0, "D": 84.25})
+    sesion.anova()
+    sesion.adjusted_means()
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+class _Totals:
+    """Vector float64 que crece por duplicación de capacidad."""
+
+    def __init__(self):
+        self._data = np.zeros(16)
+        self.size = 0
+
+    def grow(self, size):
+        if size > len(self._data):
+            data = np.zeros(max(size, 2 * len(self._data)))
+            data[:self.size] = self._data[:self.size]
+            self._data = data
+        self.size = max(self.size, size)
+
+    def add(self, codes, values):
+        np.add.at(self._data, codes, values)
+
+    @property
+    def values(self):
+        return self._data[:self.size]
+
+
+class LiveSession:
+    """Estadísticos suficientes del modelo Y = μ + τ + β + ε que admiten filas nuevas."""
+
+    def __init__(self, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                 resp_col="Puntaje_SCA"):
+        self.block_col = block_col
+        self.treat_col = treat_col
+        self.resp_col = resp_col
+        self._blocks = {}  # etiqueta -> código
+        self._treats = {}
+        self.block_labels = []
+        self.treat_labels = []
+        self._b_tot = _Totals()
+        self._t_tot = _Totals()
+        self._t_count = _Totals()
+        # Incidencia consolidada + pares (tratamiento, bloque) aún sin consolidar
+        self._incidence = sparse.csr_matrix((0, 0), dtype=np.int32)
+        self._pending_t = []
+        self._pending_b = []
+        self.n_obs = 0
+        # Sumas respecto del primer puntaje para evitar cancelación numérica
+        self.shift = None
+        self._y_sum = 0.0
+        self._y_sq = 0.0
+        self._fit = None  # último ajuste; se invalida al agregar puntajes
+
+    @classmethod
+    def from_frame(cls, df, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                   resp_col="Puntaje_SCA"):
+        session = cls(block_col, treat_col, resp_col)
+        session.add_rows(df)
+        return session
+
+    @classmethod
+    def from_data(cls, data):
+        """Sesión con los puntajes de un ``TastingData``, reutilizando sus matrices."""
+        # Las matrices ya descartan los puntajes vacíos y los catadores sin puntajes
+        matrices = data.matrices()
+        session = cls(*data.columns[:3])
+        session.block_labels = list(matrices.block_labels)
+        session.treat_labels = list(matrices.treat_labels)
+        session._blocks = {label: i for i, label in enumerate(session.block_labels)}
+        session._treats = {label: i for i, label in enumerate(session.treat_labels)}
+        if len(matrices.scores):
+            session._accumulate(matrices.block_codes, matrices.treat_codes,
+                                matrices.scores.astype(np.float64))
+        return session
+
+    @property
+    def v(self):
+        return len(self.treat_labels)
+
+    @property
+    def b(self):
+        return len(self.block_labels)
+
+    # ------------------------------------------------------------------
+    # Altas
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _code(index, labels, label):
+        code = index.get(label)
+        if code is None:
+            code = index[label] = len(labels)
+            labels.append(label)
+        return code
+
+    def _encode(self, index, labels, values):
+        uniques = pd.unique(values)
+        for label in uniques:
+            self._code(index, labels, label)
+        codes = np.fromiter((index[u] for u in uniques), dtype=np.int32, count=len(uniques))
+        return codes[pd.Index(uniques).get_indexer(values)]
+
+    def _accumulate(self, b_codes, t_codes, y):
+        if self.shift is None:
+            self.shift = float(y[0])
+        y = y - self.shift
+        self._b_tot.grow(self.b)
+        self._t_tot.grow(self.v)
+        self._t_count.grow(self.v)
+        self._b_tot.add(b_codes, y)
+        self._t_tot.add(t_codes, y)
+        self._t_count.add(t_codes, 1.0)
+        self._pending_t.extend(t_codes.tolist())
+        self._pending_b.extend(b_codes.tolist())
+        self.n_obs += len(y)
+        self._y_sum += float(y.sum())
+        self._y_sq += float(y @ y)
+        self._fit = None
+
+    def block_label(self, text):
+        """Etiqueta de catador escrita a mano, del mismo tipo que las ya registradas.
+
+        Así "2" es el mismo catador que el ``2`` de los datos cargados (y
+        viceversa). Sin catadores previos se sigue la regla de ``mdex.ingest``:
+        entero si el ID es entero, texto si no.
+        """
+        text = str(text).strip()
+        if not self.block_labels:
+            try:
+                return int(text)
+            except ValueError:
+                return text
+        kind = type(self.block_labels[0])
+        try:
+            return kind(text)
+        except ValueError:
+            raise ValueError(
+                f"❌ Los catadores de la sesión tienen IDs de tipo {kind.__name__}: "
+                f"«{text}» no es válido."
+            ) from None
+
+    def add_row(self, block, treat, score):
+        """Agrega un puntaje en O(1)."""
+        b_code = self._code(self._blocks, self.block_labels, block)
+        t_code = self._code(self._treats, self.treat_labels, treat)
+        self._accumulate(np.array([b_code]), np.array([t_code]), np.array([float(score)]))
+
+    def add_block(self, block, scores):
+        """Agrega los puntajes de un catador (``{variedad: puntaje}``) en O(k)."""
+        if not scores:
+            return
+        b_code = self._code(self._blocks, self.block_labels, block)
+        t_codes = np.array([self._code(self._treats, self.treat_labels, t) for t in scores])
+        y = np.fromiter(scores.values(), dtype=np.float64, count=len(scores))
+        self._accumulate(np.full(len(y), b_code), t_codes, y)
+
+    def add_rows(self, df):
+        """Agrega un lote de filas con las columnas de bloque, tratamiento y respuesta.
+
+        Las filas sin puntaje se ignoran.
+        """
+        df = df[df[self.resp_col].notna()]
+        if len(df) == 0:
+            return self
+        b_codes = self._encode(self._blocks, self.block_labels, df[self.block_col])
+        t_codes = self._encode(self._treats, self.treat_labels, df[self.treat_col])
+        self._accumulate(b_codes, t_codes, df[self.resp_col].to_numpy(dtype=np.float64))
+        return self
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def incidence(self):
+        """N (v × b) con los conteos por celda."""
+        if self._pending_t:
+            pending = sparse.csr_matrix(
+                (np.ones(len(self._pending_t), dtype=np.int32),
+                 (self._pending_t, self._pending_b)),
+                shape=(self.v, self.b),
+            )
+            self._incidence.resize((self.v, self.b))
+            self._incidence = (self._incidence + pending).tocsr()
+            self._pending_t, self._pending_b = [], []
+        return self._incidence
+
+    def fit(self, dense=None):
+        """Ajuste absorbido actual (``AbsorptionResult``).
+
+        Con ``dense=None`` se reutiliza mientras no lleguen puntajes nuevos.
+        """
+        from mdex.absorption import fit_from_statistics
+
+        if self.n_obs == 0:
+            raise ValueError("❌ La sesión todavía no tiene puntajes.")
+        if dense is None and self._fit is not None:
+            return self._fit
+        fit = fit_from_statistics(
+            self.incidence(), self._t_tot.values, self._b_tot.values, self._y_sum,
+            self._y_sq, pd.Index(self.treat_labels), self.block_col, self.treat_col,
+            center=self.shift, dense=dense,
+        )
+        if dense is None:
+            self._fit = fit
+        return fit
+
+    def anova(self):
+        return self.fit().anova
+
+    def simple_means(self):
+        means = self._t_tot.values / self._t_count.values + self.shift
+        return pd.Series(means, index=pd.Index(self.treat_labels, name=self.treat_col))
+
+    def adjusted_means(self, alpha=0.05, fit=None):
+        """Misma tabla que ``mdex.lsmeans.adjusted_means`` con los datos actuales."""
+        from mdex.lsmeans import ls_means
+
+        table = ls_means(fit if fit is not None else self.fit(), alpha)
+        resultados = table.reset_index().rename(columns={self.treat_col: "Café"})
+        resultados.insert(1, "Media Simple", self.simple_means().reindex(table.index).to_numpy())
+        return resultados
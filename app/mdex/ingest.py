@@ -0,0 +1,158 @@
+"""Carga tipada de archivos de cata (CSV, Parquet y Feather).
+
+Los identificadores y nombres se leen como categorías y el puntaje como
+float32, con el motor CSV de pyarrow cuando está instalado. Los IDs de
+catador tienen el mismo tipo por cualquier ruta de lectura: categorías
+enteras (orden numérico) si todos los IDs son enteros, de texto si no. Los CSV muy
+grandes se leen por trozos, validando cada trozo antes de unirlos, para no
+mantener en memoria el archivo completo como texto.
+
+Las filas con el puntaje vacío no se pueden analizar: se descartan al
+validar y su número queda en ``df.attrs[BLANK_ATTR]`` para informarlo.
+"""
+
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+SCHEMA = {
+    "Catador_ID": "category",
+    "Perfil_Catador": "category",
+    "Variedad_Codigo": "category",
+    "Variedad_Nombre": "category",
+    "Puntaje_SCA": "float32",
+}
+
+REQUIRED = ["Catador_ID", "Variedad_Codigo", "Puntaje_SCA"]
+
+# Rango válido de un puntaje SCA
+SCORE_RANGE = (0.0, 100.0)
+
+# Clave de ``DataFrame.attrs`` con las filas descartadas por no tener puntaje
+BLANK_ATTR = "filas_sin_puntaje"
+
+# A partir de este tamaño (bytes) los CSV se leen por trozos
+CHUNK_THRESHOLD = 64 * 1024 * 1024
+CHUNK_ROWS = 500_000
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def _file_name(source):
+    return getattr(source, "name", None) or (source if isinstance(source, str) else "")
+
+
+def _file_size(source):
+    size = getattr(source, "size", None)
+    if size is None and isinstance(source, str) and os.path.exists(source):
+        size = os.path.getsize(source)
+    return size or 0
+
+
+def validate(df, where="archivo"):
+    """Comprueba columnas requeridas y rango de puntajes; lanza ValueError.
+
+    Devuelve ``df`` sin las filas de puntaje vacío (cuántas en ``attrs[BLANK_ATTR]``).
+    """
+    missing = [c for c in REQUIRED if c not in df.columns]
+    if missing:
+        raise ValueError(f"❌ Faltan columnas en el {where}: {', '.join(missing)}")
+    if df["Catador_ID"].isna().any() or df["Variedad_Codigo"].isna().any():
+        raise ValueError(f"❌ Hay catadores o variedades vacíos en el {where}.")
+    scores = df["Puntaje_SCA"]
+    low, high = SCORE_RANGE
+    bad = scores.notna() & ((scores < low) | (scores > high))
+    if bad.any():
+        raise ValueError(
+            f"❌ {int(bad.sum())} puntajes fuera del rango {low:.0f}–{high:.0f} en el {where}."
+        )
+    blank = scores.isna()
+    if blank.any():
+        df = df[~blank.to_numpy()].reset_index(drop=True)
+    df.attrs[BLANK_ATTR] = int(blank.sum())
+    return df
+
+
+def taster_ids(ids):
+    """Categoría de IDs de catador: enteros si todos lo son, texto si no.
+
+    pyarrow lee ``1, 2, 10`` como int64 y ``dtype=SCHEMA`` como texto
+    (``'1', '10', '2'``); aquí ambas quedan con categorías int64 ordenadas.
+    """
+    ids = ids if isinstance(ids.dtype, pd.CategoricalDtype) else ids.astype("category")
+    categories = ids.cat.categories
+    numeric = pd.to_numeric(pd.Series(categories.astype(str)), errors="coerce").to_numpy()
+    if len(categories) and np.isfinite(numeric).all() and (numeric == np.round(numeric)).all():
+        labels = numeric.astype(np.int64)
+    else:
+        labels = np.asarray(categories.astype(str), dtype=object)
+    # "1" y "01" (o 1 y "1") son el mismo catador: se unen sus códigos
+    uniques, inverse = np.unique(labels, return_inverse=True)
+    codes = ids.cat.codes.to_numpy()
+    codes = np.where(codes >= 0, inverse[codes], -1)
+    return pd.Series(pd.Categorical.from_codes(codes, uniques), index=ids.index, name=ids.name)
+
+
+def apply_schema(df):
+    """Convierte las columnas conocidas a los tipos de ``SCHEMA``."""
+    types = {c: t for c, t in SCHEMA.items() if c in df.columns and df[c].dtype != t}
+    df = df.astype(types) if types else df
+    if "Catador_ID" in df.columns:
+        df = df.assign(Catador_ID=taster_ids(df["Catador_ID"]))
+    return df
+
+
+def _concat_chunks(chunks):
+    # Unir categorías de todos los trozos antes de concatenar; si no, pandas
+    # degrada las columnas categóricas a object
+    for col, dtype in SCHEMA.items():
+        if dtype != "category" or col not in chunks[0].columns:
+            continue
+        union = union_categoricals([c[col] for c in chunks], sort_categories=True).categories
+        for c in chunks:
+            c[col] = c[col].cat.set_categories(union)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def read_csv(source, chunksize=None):
+    size = _file_size(source)
+    if chunksize is None and size > CHUNK_THRESHOLD:
+        chunksize = CHUNK_ROWS
+    if chunksize:
+        reader = pd.read_csv(source, dtype=SCHEMA, chunksize=chunksize)
+        chunks = [validate(chunk, f"trozo {i + 1}") for i, chunk in enumerate(reader)]
+        blank = sum(chunk.attrs[BLANK_ATTR] for chunk in chunks)
+        df = apply_schema(_concat_chunks(chunks))
+        df.attrs[BLANK_ATTR] = blank
+        return df
+    if HAS_PYARROW:
+        df = pd.read_csv(source, engine="pyarrow")
+    else:
+        df = pd.read_csv(source, dtype=SCHEMA)
+    return validate(apply_schema(df))
+
+
+def read_tasting_file(source, chunksize=None):
+    """Lee un archivo de cata subido o una ruta y devuelve un DataFrame tipado."""
+    name = _file_name(source).lower()
+    if name.endswith((".parquet", ".pq", ".feather", ".arrow")):
+        try:
+            if name.endswith((".feather", ".arrow")):
+                df = pd.read_feather(source)
+            else:
+                df = pd.read_parquet(source)
+        except ImportError:
+            raise ValueError("❌ Leer Parquet/Feather requiere instalar pyarrow.") from None
+        df = validate(apply_schema(df))
+    else:
+        df = read_csv(source, chunksize=chunksize)
+    if df.empty:
+        raise ValueError("❌ El archivo no tiene ningún puntaje.")
+    return df
+
+
+def memory_usage_mb(df):
+    return float(np.round(df.memory_usage(deep=True).sum() / 1024 ** 2, 2))
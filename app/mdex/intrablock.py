@@ -0,0 +1,117 @@
+"""Análisis intrabloque de un BIBD en forma cerrada.
+
+Para un BIBD la matriz de información es ``C_τ = (λv/k)(I - J/v)``, de modo
+que todo el análisis sale de los totales por tratamiento y por bloque en
+O(N + v²), sin construir la matriz de diseño con variables indicadoras:
+
+- totales ajustados ``Q_i = T_i - (1/k) Σ_j n_ij B_j``
+- efectos ajustados ``τ̂_i = k Q_i / (λv)``
+- ``SC_trat(aj) = (k / λv) Σ Q_i²``
+- ``Var(τ̂_i - τ̂_j) = 2kσ² / (λv)``
+
+La tabla ANOVA usa las mismas sumas de cuadrados tipo II que
+``sm.stats.anova_lm(modelo, typ=2)``: tratamientos ajustados por bloques y
+bloques ajustados por tratamientos.
+"""
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from mdex.diagnostics import diagnose
+from mdex.matrix import BlockMatrices
+
+
+@dataclass
+class IntrablockResult:
+    v: int
+    b: int
+    k: int
+    r: int
+    lam: int
+    n_obs: int
+    mse: float
+    anova: pd.DataFrame
+    effects: pd.DataFrame
+
+    @property
+    def se_diff(self):
+        """Error estándar de la diferencia entre dos efectos ajustados."""
+        return float(np.sqrt(2 * self.k * self.mse / (self.lam * self.v)))
+
+
+def bibd_parameters(matrices):
+    """(k, r, λ) si los datos forman un BIBD, o None."""
+    return diagnose(matrices, pair_rows=0, efficiency=False).parameters
+
+
+def fit_intrablock(df, block_col, treat_col, resp_col, matrices=None):
+    """Ajusta Y = μ + τ + β + ε en forma cerrada; None si no es un BIBD."""
+    matrices = matrices or BlockMatrices(df, block_col, treat_col, resp_col)
+    params = bibd_parameters(matrices)
+    if params is None:
+        return None
+    k, r, lam = params
+    v, b = matrices.v, matrices.b
+    y = matrices.scores.astype(np.float64)
+    n_obs = len(y)
+    # Centrar evita la cancelación numérica en Σy² - G²/N (Q no cambia)
+    center = y.mean()
+    y = y - center
+
+    t_tot = np.bincount(matrices.treat_codes, weights=y, minlength=v)
+    b_tot = np.bincount(matrices.block_codes, weights=y, minlength=b)
+    grand = y.sum()
+    corr = grand ** 2 / n_obs
+
+    # Σ_j n_ij B_j: suma de los totales de los bloques donde aparece i
+    q = t_tot - np.bincount(matrices.treat_codes, weights=b_tot[matrices.block_codes], minlength=v) / k
+    tau = k * q / (lam * v)
+
+    ss_total = float(y @ y) - corr
+    ss_blocks = float(b_tot @ b_tot) / k - corr
+    ss_treat_unadj = float(t_tot @ t_tot) / r - corr
+    ss_treat_adj = float(q @ tau)
+    ss_error = ss_total - ss_blocks - ss_treat_adj
+    ss_blocks_adj = ss_total - ss_treat_unadj - ss_error
+
+    df_treat, df_blocks = v - 1, b - 1
+    df_error = n_obs - v - b + 1
+    mse = ss_error / df_error if df_error > 0 else np.nan
+
+    def f_row(ss, dof):
+        if not df_error > 0 or mse <= 0:
+            return np.nan, np.nan
+        f_val = (ss / dof) / mse
+        return f_val, stats.f.sf(f_val, dof, df_error)
+
+    f_t, p_t = f_row(ss_treat_adj, df_treat)
+    f_b, p_b = f_row(ss_blocks_adj, df_blocks)
+    anova = pd.DataFrame(
+        {
+            "sum_sq": [ss_treat_adj, ss_blocks_adj, ss_error],
+            "df": [float(df_treat), float(df_blocks), float(df_error)],
+            "F": [f_t, f_b, np.nan],
+            "PR(>F)": [p_t, p_b, np.nan],
+        },
+        index=[f"C({treat_col})", f"C({block_col})", "Residual"],
+    )
+
+    # Var(τ̂) = σ² C⁺ con C⁺ = (k/λv)(I - J/v)
+    se_tau = np.sqrt(mse * k * (v - 1) / (lam * v * v))
+    effects = pd.DataFrame(
+        {
+            "Total": t_tot + r * center,
+            "Q": q,
+            "Efecto Ajustado": tau,
+            "Error Estándar": se_tau,
+            "Media Ajustada": center + grand / n_obs + tau,
+        },
+        index=pd.Index(matrices.treat_labels, name=treat_col),
+    ).sort_index()
+
+    return IntrablockResult(
+        v=v, b=b, k=k, r=r, lam=lam, n_obs=n_obs, mse=mse, anova=anova, effects=effects,
+    )
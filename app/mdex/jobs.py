@@ -0,0 +1,300 @@
+"""Trabajos en segundo plano con progreso, cancelación y deduplicación.
+
+Las búsquedas de diseños, los ajustes y los remuestreos largos corrían dentro
+del script de la página: la sesión quedaba congelada y cada nueva ejecución
+lanzaba el mismo cálculo otra vez. Con ``JobRunner``:
+
+- la página envía ``fn(progress=...)`` (p. ej. un ``partial``) con una clave;
+  si ya hay un trabajo con esa clave en curso (o terminado con éxito) se
+  devuelve el mismo ``Job``, así que volver a ejecutar la página no duplica
+  el cálculo;
+- ``fn`` informa su avance con ``progress(hechos, total)``; esa misma llamada
+  lanza ``JobCancelled`` si se pidió cancelar, de modo que la cancelación
+  ocurre en el siguiente punto de control;
+- el ``Job`` queda en ``st.session_state`` y ``show_job`` muestra el progreso
+  (que se refresca solo) o entrega el resultado sin bloquear la interfaz.
+
+Se usan hilos: el resultado se entrega en el mismo proceso y los cálculos
+pesados (bootstrap, permutaciones, diseños óptimos) ya reparten su trabajo en
+procesos. ``MDEX_JOB_WORKERS`` fija el número de hilos.
+"""
+
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+
+from mdex.profiling import stage
+
+DEFAULT_WORKERS = 4
+HISTORY = 32  # trabajos terminados que se conservan para entregar su resultado
+
+_ids = itertools.count(1)
+
+_task = None  # tarea de ``run_batches`` en cada proceso trabajador
+
+
+class JobCancelled(Exception):
+    """El trabajo se canceló desde la interfaz."""
+
+
+class Job:
+    """Un cálculo en segundo plano; seguro para consultar desde otros hilos."""
+
+    def __init__(self, key, name="", unit=""):
+        self.id = next(_ids)
+        self.key = key
+        self.name = name
+        self.unit = unit
+        self.done_units = 0
+        self.total_units = None
+        self.submitted = time.time()
+        self.started = None
+        self.finished = None
+        self.future = None
+        self._cancel = threading.Event()
+
+    # -- desde el trabajo ------------------------------------------------
+    def report(self, done, total=None):
+        """Registra el avance; lanza ``JobCancelled`` si se pidió cancelar."""
+        self.done_units = done
+        if total is not None:
+            self.total_units = total
+        if self._cancel.is_set():
+            raise JobCancelled()
+
+    # -- desde la página -------------------------------------------------
+    def cancel(self):
+        self._cancel.set()
+        self.future.cancel()  # si aún no empezó, no llega a ejecutarse
+
+    @property
+    def done(self):
+        return self.future.done()
+
+    @property
+    def cancelled(self):
+        return self.future.cancelled() or (self.done and isinstance(self.error, JobCancelled))
+
+    @property
+    def error(self):
+        if not self.done or self.future.cancelled():
+            return None
+        return self.future.exception()
+
+    @property
+    def status(self):
+        if self.cancelled:
+            return "cancelado"
+        if self.done:
+            return "error" if self.error is not None else "terminado"
+        if self._cancel.is_set():
+            return "cancelando"
+        return "en curso" if self.started is not None else "en cola"
+
+    @property
+    def fraction(self):
+        """Avance entre 0 y 1, o None si el trabajo no informa un total."""
+        if self.done:
+            return 1.0
+        if not self.total_units:
+            return None
+        return min(self.done_units / self.total_units, 1.0)
+
+    @property
+    def elapsed(self):
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+    def result(self, timeout=None):
+        return self.future.result(timeout)
+
+    def wait(self, timeout):
+        """Espera hasta ``timeout`` segundos; True si terminó."""
+        try:
+            self.future.exception(timeout)
+        except Exception:
+            pass
+        return self.done
+
+    def describe(self):
+        text = f"{self.name or 'Trabajo'}: {self.status}"
+        if self.total_units:
+            text += f" — {self.done_units:,} de {self.total_units:,} {self.unit}".rstrip()
+        elif self.done_units:
+            text += f" — {self.done_units:,} {self.unit}".rstrip()
+        return text + f" ({self.elapsed:.1f} s)"
+
+
+class JobRunner:
+    """Grupo de hilos con trabajos deduplicados por clave."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, history=HISTORY):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="mdex-job")
+        self._jobs = OrderedDict()  # clave -> Job
+        self._lock = threading.Lock()
+        self.history = history
+
+    def __len__(self):
+        return len(self._jobs)
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    def submit(self, key, fn, name="", unit=""):
+        """Ejecuta ``fn(progress=...)`` en segundo plano, o devuelve el trabajo igual ya enviado.
+
+        ``fn`` no debe leer variables que la página reasigne en la siguiente
+        ejecución: conviene fijar los argumentos con ``functools.partial``.
+
+        Un trabajo cancelado o con error se vuelve a lanzar al enviarlo de nuevo.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (job.cancelled or job.error is not None
+                                        or job._cancel.is_set()):
+                self._jobs.move_to_end(key)
+                return job
+            job = self._jobs[key] = Job(key, name, unit)
+            job.future = self._pool.submit(self._run, job, fn)
+            self._prune()
+        return job
+
+    def _run(self, job, fn):
+        job.started = time.time()
+        try:
+            with stage(f"trabajo:{job.name or job.key}"):
+                job.report(0)  # cancelado antes de empezar
+                return fn(progress=job.report)
+        finally:
+            job.finished = time.time()
+
+    def _prune(self):
+        finished = [k for k, j in self._jobs.items() if j.done]
+        for key in finished[:max(len(finished) - self.history, 0)]:
+            del self._jobs[key]
+
+    def cancel_all(self):
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.done:
+                    job.cancel()
+
+
+@lru_cache(maxsize=1)
+def default_runner():
+    """Ejecutor del proceso, compartido por todas las sesiones de Streamlit."""
+    return JobRunner(int(os.environ.get("MDEX_JOB_WORKERS", DEFAULT_WORKERS)))
+
+
+def gather(futures, progress=None, sizes=None):
+    """Resultados de ``futures`` en orden, informando el avance tras cada uno.
+
+    Si ``progress`` lanza (cancelación) se cancelan los que aún no empezaron,
+    para que el ``ProcessPoolExecutor`` no espere a todo el lote al cerrarse.
+    """
+    sizes = sizes if sizes is not None else [1] * len(futures)
+    total, done, results = sum(sizes), 0, []
+    try:
+        for future, size in zip(futures, sizes):
+            results.append(future.result())
+            done += size
+            if progress is not None:
+                progress(done, total)
+    except BaseException:
+        for future in futures:
+            future.cancel()
+        raise
+    return results
+
+
+def batch_sizes(total, size):
+    """``total`` unidades en lotes de ``size`` (el último puede ser menor)."""
+    return [size] * (total // size) + ([total % size] if total % size else [])
+
+
+def _init_batches(task):
+    global _task
+    _task = task
+
+
+def _run_batch(seed_seq, size, deadline):
+    if deadline is not None and time.monotonic() > deadline:
+        return None
+    return _task(seed_seq, size)
+
+
+def run_batches(task, sizes, seed=0, deadline=None, workers=None, parallel=False,
+                progress=None):
+    """Resultados de ``task(seed_seq, tamaño)`` para cada lote de ``sizes``, en orden.
+
+    Cada lote usa su propia semilla derivada de ``seed`` con ``SeedSequence``,
+    de modo que el resultado no depende del número de procesos. Con más de un
+    trabajador (``workers``, o todos los núcleos si ``parallel``) los lotes se
+    reparten en un ``ProcessPoolExecutor``; ``task`` se envía una sola vez a
+    cada proceso. Los lotes que empezarían después de ``deadline``
+    (``time.monotonic()``) devuelven None. ``progress(hechos, total)`` se llama
+    al terminar cada lote.
+    """
+    import numpy as np
+
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if workers is None:
+        workers = (os.cpu_count() or 1) if parallel else 1
+    workers = min(workers, len(sizes))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_batches,
+                                 initargs=(task,)) as pool:
+            futures = [pool.submit(_run_batch, s, k, deadline) for s, k in zip(seeds, sizes)]
+            return gather(futures, progress, sizes)
+
+    results, finished, total = [], 0, sum(sizes)
+    for s, k in zip(seeds, sizes):
+        if deadline is not None and time.monotonic() > deadline:
+            results.append(None)
+            continue
+        results.append(task(s, k))
+        finished += k
+        if progress is not None:
+            progress(finished, total)
+    return results
+
+
+def show_job(job, wait=0.2, poll=0.5):
+    """Resultado de ``job`` si terminó bien; si no, muestra su estado y devuelve None.
+
+    Espera hasta ``wait`` segundos (los casos rápidos no muestran progreso).
+    Mientras corre, un fragmento se refresca cada ``poll`` segundos con la
+    barra de avance y el botón de cancelar, y vuelve a ejecutar la página al
+    terminar; el resto de la página sigue respondiendo.
+    """
+    import streamlit as st
+
+    if job is None:
+        return None
+    if not job.done:
+        job.wait(wait)
+    if job.done:
+        if job.cancelled:
+            st.info(f"{job.name or 'Trabajo'} cancelado.")
+        elif job.error is not None:
+            st.error(str(job.error))
+        else:
+            return job.result()
+        return None
+
+    @st.fragment(run_every=poll)
+    def progress_panel():
+        if job.done:
+            st.rerun()
+        st.progress(job.fraction or 0.0, text=job.describe())
+        if st.button("Cancelar", key=f"cancelar_trabajo_{job.id}", disabled=job._cancel.is_set()):
+            job.cancel()
+
+    progress_panel()
+    return None
@@ -0,0 +1,202 @@
+"""Búsqueda local estocástica de BIBD con un portafolio de procesos.
+
+Para parámetros donde la búsqueda exacta no termina usamos recocido
+simulado: el estado es una lista de b bloques con cada tratamiento repetido
+exactamente r veces, el movimiento intercambia un tratamiento entre dos
+bloques (lo que conserva r) y el costo es ``Σ (n_ij - λ)²`` sobre los pares.
+Un costo 0 es un BIBD.
+
+``portfolio_bibd`` lanza varios trabajadores con semillas independientes en
+un ``ProcessPoolExecutor``. Los trabajadores avanzan en épocas de un número
+fijo de pasos; cuando uno encuentra un diseño publica su época y los demás
+terminan esa misma época antes de detenerse. Como la trayectoria de cada
+trabajador depende sólo de su semilla, el ganador (menor época, menor índice)
+es el mismo en cada ejecución con la misma semilla, salvo que el límite de
+tiempo corte la búsqueda antes.
+"""
+
+import math
+import multiprocessing as mp
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# Pasos de recocido entre consultas a la señal de parada compartida
+EPOCH_STEPS = 20_000
+
+_stop_epoch = None
+
+
+def _init_worker(stop_epoch):
+    global _stop_epoch
+    _stop_epoch = stop_epoch
+
+
+def _initial_blocks(v, k, r, b, rng):
+    # r permutaciones concatenadas cortadas en bloques de k: sólo los bloques
+    # que cruzan una frontera pueden repetir tratamientos, y se reparan
+    pool = []
+    for _ in range(r):
+        perm = list(range(v))
+        rng.shuffle(perm)
+        pool.extend(perm)
+    blocks = [pool[i * k:(i + 1) * k] for i in range(b)]
+    for bi, blk in enumerate(blocks):
+        while len(set(blk)) < k:
+            pos = next(p for p, t in enumerate(blk) if t in blk[:p])
+            x = blk[pos]
+            cj = rng.randrange(b)
+            other = blocks[cj]
+            if cj == bi or x in other:
+                continue
+            q = rng.randrange(k)
+            y = other[q]
+            if y in blk:
+                continue
+            blk[pos], other[q] = y, x
+    return blocks
+
+
+def anneal_bibd(v, k, lam, seed=0, max_steps=None, deadline=None, worker=0):
+    """Recocido simulado para un BIBD(v, k, λ).
+
+    Devuelve ``(blocks | None, steps, epoch)``; ``epoch`` es la época en que
+    se encontró el diseño (o la última completada).
+    """
+    r = lam * (v - 1) // (k - 1)
+    b = v * r // k
+    rng = random.Random(seed * 1_000_003 + worker)
+
+    blocks = _initial_blocks(v, k, r, b, rng)
+    members = [set(blk) for blk in blocks]
+    count = [[0] * v for _ in range(v)]
+    for blk in blocks:
+        for i in blk:
+            for j in blk:
+                if i != j:
+                    count[i][j] += 1
+    cost = sum((count[i][j] - lam) ** 2 for i in range(v) for j in range(i + 1, v))
+
+    temp0 = 2.0
+    temp = temp0
+    best = cost
+    stale = 0
+    steps = 0
+    epoch = 0
+
+    while cost > 0:
+        steps += 1
+        if steps % EPOCH_STEPS == 0:
+            epoch += 1
+            if _stop_epoch is not None and _stop_epoch.value < epoch:
+                return None, steps, epoch
+            if deadline is not None and time.monotonic() > deadline:
+                return None, steps, epoch
+        if max_steps is not None and steps > max_steps:
+            return None, steps, epoch
+
+        b1 = rng.randrange(b)
+        b2 = rng.randrange(b)
+        if b1 == b2:
+            continue
+        p1 = rng.randrange(k)
+        p2 = rng.randrange(k)
+        x = blocks[b1][p1]
+        y = blocks[b2][p2]
+        if x in members[b2] or y in members[b1]:
+            continue
+
+        # Cambio neto de concurrencias al mover x: b1 -> b2 e y: b2 -> b1;
+        # los tratamientos presentes en ambos bloques se cancelan
+        change = {}
+        for z in blocks[b1]:
+            if z != x and z not in members[b2]:
+                change[(x, z)] = -1
+                change[(y, z)] = 1
+        for w in blocks[b2]:
+            if w != y and w not in members[b1]:
+                change[(y, w)] = -1
+                change[(x, w)] = 1
+        delta = 0
+        for (i, j), c in change.items():
+            n = count[i][j] - lam
+            delta += 2 * c * n + 1
+
+        if delta > 0 and rng.random() >= math.exp(-delta / temp):
+            continue
+
+        for (i, j), c in change.items():
+            count[i][j] += c
+            count[j][i] += c
+        blocks[b1][p1], blocks[b2][p2] = y, x
+        members[b1].discard(x)
+        members[b1].add(y)
+        members[b2].discard(y)
+        members[b2].add(x)
+        cost += delta
+
+        # Enfriamiento con recalentamiento cuando no hay mejora
+        if cost < best:
+            best, stale = cost, 0
+        else:
+            stale += 1
+        temp = max(0.05, temp * 0.9999)
+        if stale > 50 * b * k:
+            temp, stale, best = temp0, 0, cost
+
+    return sorted(tuple(sorted(blk)) for blk in blocks), steps, epoch
+
+
+def _portfolio_worker(v, k, lam, seed, worker, deadline):
+    blocks, steps, epoch = anneal_bibd(v, k, lam, seed=seed, deadline=deadline, worker=worker)
+    if blocks is not None:
+        with _stop_epoch.get_lock():
+            if epoch < _stop_epoch.value:
+                _stop_epoch.value = epoch
+    return worker, blocks, steps, epoch
+
+
+def portfolio_bibd(v, k, lam, seed=0, workers=None, time_limit=10.0):
+    """Portafolio paralelo de recocido simulado.
+
+    Devuelve el mismo diccionario que ``find_bibd`` (con ``method`` y
+    ``stats``) o lanza ``RuntimeError`` si se agota el tiempo.
+    """
+    start = time.perf_counter()
+    r = lam * (v - 1) // (k - 1)
+    b = v * r // k
+    workers = workers or os.cpu_count() or 1
+    deadline = time.monotonic() + time_limit
+
+    stop_epoch = mp.Value("i", 2 ** 31 - 1)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=(stop_epoch,)) as pool:
+        futures = [pool.submit(_portfolio_worker, v, k, lam, seed, w, deadline)
+                   for w in range(workers)]
+        results = [f.result() for f in futures]
+
+    steps = sum(res[2] for res in results)
+    found = [res for res in results if res[1] is not None]
+    if not found:
+        raise RuntimeError(
+            f"❌ No se encontró un BIBD válido en {time_limit:.0f} s ({steps} pasos de recocido)."
+        )
+    worker, blocks, _, epoch = min(found, key=lambda res: (res[3], res[0]))
+
+    return {
+        "v": v,
+        "k": k,
+        "lambda": lam,
+        "b": b,
+        "r": r,
+        "blocks": blocks,
+        "method": "recocido simulado",
+        "stats": {
+            "nodes": steps,
+            "elapsed": time.perf_counter() - start,
+            "worker": worker,
+            "epoch": epoch,
+            "seed": seed,
+        },
+    }
@@ -0,0 +1,77 @@
+"""Medias ajustadas (medias de mínimos cuadrados) a partir de los coeficientes.
+
+La media ajustada de una variedad es el promedio, sobre todos los catadores,
+de la predicción del modelo para esa variedad. Con los bloques absorbidos
+eso es
+
+    m = L τ̂ + ā 1,   L = I - 1 wᵀ,   w_i = (1/b) Σ_j n_ij / k_j
+
+donde ā es el promedio de las medias de bloque. Como ``Q = X'M_Z y`` no está
+correlacionado con los totales de bloque, ``Cov(m) = L Cov(τ̂) Lᵀ + Var(ā) J``
+con ``Var(ā) = σ²/b² Σ_j 1/k_j``: una sola multiplicación por la matriz de
+contrastes en vez de v llamadas a ``modelo.predict``.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+
+def mean_weights(incidence, block_weights):
+    """Pesos w de la matriz de contrastes ``L = I - 1wᵀ``.
+
+    ``block_weights`` es ``1/k_j`` por bloque o, para varias réplicas bootstrap
+    a la vez, una matriz R × b con la multiplicidad de cada bloque dividida por
+    ``k_j``; el resultado tiene forma (v,) o (R, v).
+    """
+    block_weights = np.asarray(block_weights, dtype=np.float64)
+    return (incidence @ block_weights.T).T / incidence.shape[1]
+
+
+def ls_means_cov(fit):
+    """(medias ajustadas, covarianza) en el orden de ``fit.labels``."""
+    v, b = fit.v, fit.b
+    inv_k = 1.0 / fit.block_sizes
+    w = mean_weights(fit.incidence, inv_k)
+    contrast = np.eye(v) - np.outer(np.ones(v), w)
+    a_bar = fit.center + float(fit.block_totals @ inv_k) / b
+    means = contrast @ fit.tau + a_bar
+    if fit.cov_tau is None:
+        return means, None
+    var_a = fit.mse * inv_k.sum() / b ** 2
+    cov = contrast @ fit.cov_tau @ contrast.T + var_a
+    return means, cov
+
+
+def ls_means(fit, alpha=0.05):
+    """Tabla de medias ajustadas con error estándar e intervalo de confianza."""
+    means, cov = ls_means_cov(fit)
+    se = np.sqrt(np.diag(cov)) if cov is not None else np.full(len(means), np.nan)
+    t_crit = stats.t.ppf(1 - alpha / 2, fit.df_error) if fit.df_error > 0 else np.nan
+    return pd.DataFrame(
+        {
+            "Media Ajustada": means,
+            "Error Estándar": se,
+            "IC Inferior": means - t_crit * se,
+            "IC Superior": means + t_crit * se,
+        },
+        index=fit.labels,
+    ).sort_index()
+
+
+def adjusted_means(df, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                   resp_col="Puntaje_SCA", alpha=0.05, fit=None, simple=None):
+    """Resultados por variedad: media simple, media ajustada, error estándar e IC.
+
+    ``simple`` (medias simples por variedad) evita agrupar ``df`` si ya se conocen.
+    """
+    if fit is None:
+        from mdex.absorption import fit_absorbed
+
+        fit = fit_absorbed(df, block_col, treat_col, resp_col)
+    table = ls_means(fit, alpha)
+    if simple is None:
+        simple = df.groupby(treat_col, observed=True)[resp_col].mean()
+    resultados = table.reset_index().rename(columns={treat_col: "Café"})
+    resultados.insert(1, "Media Simple", simple.reindex(table.index).to_numpy())
+    return resultados
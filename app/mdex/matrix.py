@@ -0,0 +1,123 @@
+"""Matrices catador × variedad construidas de forma vectorizada.
+
+Los catadores (bloques) y variedades (tratamientos) se codifican una sola vez
+como enteros; a partir de esos códigos se obtienen la matriz de incidencia
+``N`` (v × b, como en la página de teoría), la concurrencia ``NNᵀ`` y la
+grilla de puntajes, densa en float32 para paneles pequeños o dispersa (CSR)
+para paneles grandes.
+
+Las filas con el puntaje vacío no son observaciones: se descartan antes de
+codificar, así que no cuentan en ``N`` ni en los totales de los modelos, y un
+catador sin ningún puntaje no es un bloque.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+# Por encima de este número de celdas la grilla densa deja de ser razonable
+DENSE_MAX_CELLS = 5_000_000
+
+
+def _compact(codes, labels):
+    """Recodifica ``codes`` sin las etiquetas que ya no aparecen (conserva el orden)."""
+    used = np.zeros(len(labels), dtype=bool)
+    used[codes] = True
+    if used.all():
+        return codes, labels
+    remap = np.cumsum(used) - 1
+    return remap[codes], labels[used]
+
+
+class BlockMatrices:
+    """Códigos enteros de bloque/tratamiento y las matrices derivadas."""
+
+    def __init__(self, df, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                 resp_col="Puntaje_SCA"):
+        # factorize conserva el orden de aparición, igual que ``unique()``
+        block_codes, block_labels = pd.factorize(df[block_col])
+        treat_codes, treat_labels = pd.factorize(df[treat_col])
+        self._set(block_codes, block_labels, treat_codes, treat_labels,
+                  df[resp_col].to_numpy(dtype=np.float32))
+
+    @classmethod
+    def from_codes(cls, block_codes, block_labels, treat_codes, treat_labels, scores):
+        """Matrices a partir de códigos ya calculados (p. ej. de ``TastingData``)."""
+        matrices = cls.__new__(cls)
+        matrices._set(block_codes, block_labels, treat_codes, treat_labels, scores)
+        return matrices
+
+    def _set(self, block_codes, block_labels, treat_codes, treat_labels, scores):
+        scored = ~np.isnan(scores)
+        self.dropped = int(len(scored) - scored.sum())  # filas sin puntaje descartadas
+        if self.dropped:
+            block_codes, block_labels = _compact(block_codes[scored], block_labels)
+            treat_codes, treat_labels = _compact(treat_codes[scored], treat_labels)
+            scores = scores[scored]
+        self.block_codes = block_codes.astype(np.int32, copy=False)
+        self.treat_codes = treat_codes.astype(np.int32, copy=False)
+        self.block_labels = block_labels
+        self.treat_labels = treat_labels
+        self.scores = scores.astype(np.float32, copy=False)
+        self.b = len(self.block_labels)
+        self.v = len(self.treat_labels)
+        self._last = None
+
+    @property
+    def shape(self):
+        return self.b, self.v
+
+    def is_small(self):
+        return self.b * self.v <= DENSE_MAX_CELLS
+
+    def _last_rows(self):
+        # Si un catador puntuó dos veces la misma variedad gana la última fila
+        if self._last is None:
+            linear = self.block_codes.astype(np.int64) * self.v + self.treat_codes
+            _, first_in_reversed = np.unique(linear[::-1], return_index=True)
+            self._last = np.sort(len(linear) - 1 - first_in_reversed)
+        return self._last
+
+    def incidence(self):
+        """N como CSR v × b con el número de observaciones por celda."""
+        ones = np.ones(len(self.treat_codes), dtype=np.int32)
+        return sparse.csr_matrix(
+            (ones, (self.treat_codes, self.block_codes)), shape=(self.v, self.b)
+        )
+
+    def concurrence(self):
+        """NNᵀ (v × v) con un único producto disperso."""
+        n = self.incidence()
+        return (n @ n.T).tocsr()
+
+    def score_csr(self):
+        """Grilla de puntajes b × v dispersa; las celdas vacías no se guardan."""
+        rows = self._last_rows()
+        return sparse.csr_matrix(
+            (self.scores[rows], (self.block_codes[rows], self.treat_codes[rows])),
+            shape=(self.b, self.v),
+        )
+
+    def score_dense(self, block_slice=None):
+        """Grilla de puntajes float32 con NaN en las celdas vacías."""
+        rows = self._last_rows()
+        b_codes = self.block_codes[rows]
+        start, stop = 0, self.b
+        if block_slice is not None:
+            start, stop, _ = block_slice.indices(self.b)
+            keep = (b_codes >= start) & (b_codes < stop)
+            rows, b_codes = rows[keep], b_codes[keep]
+        grid = np.full((stop - start, self.v), np.nan, dtype=np.float32)
+        grid[b_codes - start, self.treat_codes[rows]] = self.scores[rows]
+        return grid
+
+    def score_frame(self, block_slice=None, block_fmt="#{}"):
+        """Grilla densa como DataFrame con etiquetas de catador y variedad."""
+        labels = self.block_labels
+        if block_slice is not None:
+            labels = labels[block_slice]
+        return pd.DataFrame(
+            self.score_dense(block_slice),
+            index=[block_fmt.format(i) for i in labels],
+            columns=self.treat_labels,
+        )
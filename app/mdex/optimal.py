@@ -0,0 +1,325 @@
+"""Diseños de bloques incompletos A/D-óptimos para cualquier (v, k, b).
+
+Cuando (v, k, λ) no cumple las condiciones de un BIBD —lo habitual con el
+número real de catadores— se busca el diseño de b bloques de tamaño k más
+eficiente con un algoritmo de intercambio: en cada bloque se prueba
+reemplazar un tratamiento p por otro q que no esté en el bloque.
+
+Con ``M = C + J/v`` (``C = R - NNᵀ/k``) y ``V = M⁻¹``, el cambio de ``C`` al
+reemplazar p por q en el bloque j es ``d uᵀ + u dᵀ`` con ``d = e_q - e_p`` y
+``u = (1 - 1/k)(e_p + e_q)/2 - (n_j - e_p)/k``, es decir dos actualizaciones
+de rango uno. Por Sherman–Morrison–Woodbury, con ``G = [[a, 1+β], [1+β, c]]``
+(``a = dᵀVd``, ``β = dᵀVu``, ``c = uᵀVu``):
+
+- D: ``det(M') / det(M) = (1+β)² - ac``
+- A: ``tr(M'⁻¹) = tr(V) - tr(G⁻¹ Wᵀ V² W)`` con ``W = [d u]``
+
+Todas las formas bilineales salen de entradas de V, V² y de ``V n_j``, así
+que se evalúan todos los intercambios de un bloque a la vez sin calcular
+autovalores; al aceptar uno, V se actualiza con Woodbury en O(v²).
+
+Los arranques se reparten con ``mdex.jobs.run_batches``, cada uno con su
+semilla derivada de ``seed``. Con ``time_limit`` se lanzan tandas de
+arranques nuevas hasta agotar el tiempo o alcanzar la cota. La eficiencia A
+se informa respecto de la cota de un BIBD hipotético con los mismos
+(v, k, b): ``tr C⁺ ≥ (v-1)² / (b(k-1))``.
+
+Un BIBD alcanza esa cota y es A- y D-óptimo, pero el intercambio suele
+quedarse en óptimos locales cerca de él. Por eso, si (v, k, b) son
+parámetros de BIBD, antes de buscar se consulta el catálogo y las
+construcciones directas de ``mdex.constructions``.
+"""
+
+import random
+import time
+from dataclasses import dataclass
+from functools import partial
+
+import numpy as np
+
+from mdex.catalog import default_catalog
+from mdex.constructions import construct_bibd, construction_method
+from mdex.jobs import run_batches
+from mdex.local_search import _initial_blocks
+
+CRITERIA = ("A", "D")
+# Intentos de diseño inicial conexo por arranque
+INIT_TRIES = 20
+# Por debajo de este trabajo (arranques × rondas × b × k × v²) no se lanzan procesos
+PARALLEL_MIN_WORK = 5_000_000
+
+
+@dataclass
+class OptimalDesign:
+    v: int
+    k: int
+    b: int
+    criterion: str
+    blocks: list           # b tuplas ordenadas de tratamientos 0..v-1
+    trace: float           # tr C⁺ (criterio A)
+    log_det: float         # log del producto de autovalores no nulos de C (criterio D)
+    a_efficiency: float    # cota BIBD / tr C⁺
+    d_efficiency: float
+    replications: np.ndarray
+    starts: int
+    sweeps: int
+    elapsed: float
+    seed: int
+    method: str
+
+    @property
+    def concurrence(self):
+        n = np.zeros((self.v, self.b))
+        for j, blk in enumerate(self.blocks):
+            n[list(blk), j] = 1
+        return n @ n.T
+
+    @property
+    def is_bibd(self):
+        nn = self.concurrence
+        off = nn[~np.eye(self.v, dtype=bool)]
+        return bool(np.ptp(np.diag(nn)) == 0 and np.ptp(off) == 0)
+
+    def as_dict(self):
+        """Diccionario con las claves que usa ``blocks_to_dataframe``."""
+        return {"v": self.v, "k": self.k, "b": self.b, "blocks": self.blocks,
+                "method": self.method}
+
+
+def bounds(v, k, b):
+    """(cota de tr C⁺, cota de log det) de un BIBD con los mismos (v, k, b)."""
+    theta = b * (k - 1) / (v - 1)  # autovalor común de C en un BIBD
+    return (v - 1) / theta, (v - 1) * np.log(theta)
+
+
+def validate_sizes(v, k, b):
+    if v < 2 or k < 2 or b < 1:
+        raise ValueError("❌ Se necesitan v ≥ 2, k ≥ 2 y al menos un bloque.")
+    if k > v:
+        raise ValueError("❌ El tamaño de bloque k no puede superar al número de tratamientos v.")
+    if b * (k - 1) < v - 1:
+        raise ValueError(
+            f"❌ Con b={b} bloques de tamaño k={k} el diseño no puede ser conexo "
+            f"(se necesita b(k-1) ≥ v-1)."
+        )
+
+
+def known_bibd(v, k, b):
+    """``(método, bloques)`` de un BIBD con b bloques del catálogo o de una
+    construcción directa, o None (sin búsqueda)."""
+    lam, rest = divmod(b * k * (k - 1), v * (v - 1))
+    if rest or lam == 0 or (b * k) % v:
+        return None
+    cached = default_catalog().get(v, k, lam)
+    if cached is not None:
+        return cached
+    blocks = construct_bibd(v, k, lam)
+    return None if blocks is None else (construction_method(v, k, lam), blocks)
+
+
+# ----------------------------------------------------------------------
+# Intercambio
+# ----------------------------------------------------------------------
+def _incidence(blocks, v):
+    n = np.zeros((v, len(blocks)))
+    for j, blk in enumerate(blocks):
+        n[list(blk), j] = 1
+    return n
+
+
+def _information(n, k):
+    return np.diag(n.sum(axis=1)) - (n @ n.T) / k
+
+
+def _forms(x, y, s, blk, others, k, alpha):
+    """(dᵀXd, dᵀXu, uᵀXu) para todos los pares p ∈ blk, q ∈ others."""
+    x_pp = np.diag(x)[blk][:, None]
+    x_qq = np.diag(x)[others][None, :]
+    x_pq = x[np.ix_(blk, others)]
+    y_p = y[blk][:, None]
+    y_q = y[others][None, :]
+    a = x_qq + x_pp - 2 * x_pq
+    beta = alpha * (x_qq - x_pp) - (y_q - y_p - x_pq + x_pp) / k
+    c = (alpha ** 2 * (x_qq + 2 * x_pq + x_pp)
+         - 2 * alpha / k * (y_q - x_pq + y_p - x_pp)
+         + (s - 2 * y_p + x_pp) / k ** 2)
+    return a, beta, c
+
+
+def _exchange(blocks, v, k, criterion, deadline=None, max_sweeps=100, tol=1e-10):
+    """Intercambios de mejora hasta un óptimo local; devuelve (bloques, barridos)."""
+    n = _incidence(blocks, v)
+    m = _information(n, k) + 1.0 / v
+    inv = np.linalg.inv(m)
+    inv2 = inv @ inv
+    alpha = (1 - 1 / k) / 2
+    members = [np.array(sorted(blk)) for blk in blocks]
+    sweeps = 0
+    improved = True
+    while improved and sweeps < max_sweeps:
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        improved = False
+        sweeps += 1
+        for j in range(len(members)):
+            blk = members[j]
+            others = np.setdiff1d(np.arange(v), blk, assume_unique=True)
+            if len(others) == 0:
+                continue
+            y = inv[:, blk].sum(axis=1)
+            s = y[blk].sum()
+            a, beta, c = _forms(inv, y, s, blk, others, k, alpha)
+            det_g = a * c - (1 + beta) ** 2  # = -det(M')/det(M)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                if criterion == "D":
+                    gain = np.log(-det_g)  # Δ log det
+                else:
+                    y2 = inv2[:, blk].sum(axis=1)
+                    a2, b2, c2 = _forms(inv2, y2, y2[blk].sum(), blk, others, k, alpha)
+                    gain = (c * a2 - 2 * (1 + beta) * b2 + a * c2) / det_g  # -Δ tr
+            gain = np.where(-det_g > tol, gain, -np.inf)  # M' singular: desconecta
+            pi, qi = np.unravel_index(np.argmax(gain), gain.shape)
+            if not gain[pi, qi] > tol:
+                continue
+
+            # Aceptar: V' = V - VW G⁻¹ WᵀV
+            p, q = blk[pi], others[qi]
+            d = np.zeros(v)
+            d[q], d[p] = 1.0, -1.0
+            u = -n[:, j] / k
+            u[p] += 1 / k
+            u[q] += alpha
+            u[p] += alpha
+            w = np.column_stack([d, u])
+            vw = inv @ w
+            g = np.array([[a[pi, qi], 1 + beta[pi, qi]], [1 + beta[pi, qi], c[pi, qi]]])
+            inv = inv - vw @ np.linalg.solve(g, vw.T)
+            inv = (inv + inv.T) / 2
+            inv2 = inv @ inv
+            n[p, j], n[q, j] = 0.0, 1.0
+            members[j] = np.sort(np.append(blk[blk != p], q))
+            improved = True
+    return [tuple(int(t) for t in blk) for blk in members], sweeps
+
+
+def _criteria(blocks, v, k):
+    """(tr C⁺, log det) calculados desde cero con autovalores."""
+    eig = np.linalg.eigvalsh(_information(_incidence(blocks, v), k))[1:]
+    if eig[0] <= 1e-9:
+        return np.inf, -np.inf
+    return float((1 / eig).sum()), float(np.log(eig).sum())
+
+
+def _perturb(blocks, v, size, rng):
+    """Reemplaza ``size`` tratamientos al azar (sin repetir dentro del bloque)."""
+    blocks = [list(blk) for blk in blocks]
+    for _ in range(size):
+        blk = blocks[rng.randrange(len(blocks))]
+        choices = [t for t in range(v) if t not in blk]
+        if choices:
+            blk[rng.randrange(len(blk))] = rng.choice(choices)
+    return [tuple(blk) for blk in blocks]
+
+
+def _run_start(v, k, b, criterion, deadline, max_sweeps, rounds, seed_seq, size=1):
+    """Un arranque (lote de ``run_batches`` de tamaño 1): intercambio hasta un
+    óptimo local y búsqueda local iterada.
+
+    Cada ronda perturba unos pocos tratamientos del mejor diseño y vuelve a
+    optimizar; se acepta si no empeora (permite recorrer mesetas).
+    """
+    if deadline is not None and time.monotonic() > deadline:
+        return None
+    rng = random.Random(int(seed_seq.generate_state(1)[0]))
+    r = -(-b * k // v)
+    for _ in range(INIT_TRIES):
+        blocks = _initial_blocks(v, k, r, b, rng)
+        if np.isfinite(_criteria(blocks, v, k)[0]):
+            break
+    else:
+        return None  # ningún diseño inicial conexo
+
+    def score(blocks):
+        trace, log_det = _criteria(blocks, v, k)
+        return (trace, -log_det) if criterion == "A" else (-log_det, trace)
+
+    blocks, sweeps = _exchange(blocks, v, k, criterion, deadline, max_sweeps)
+    best = score(blocks)
+    for _ in range(rounds):
+        if deadline is not None and time.monotonic() > deadline:
+            break
+        candidate = _perturb(blocks, v, rng.randint(2, max(2, k)), rng)
+        if not np.isfinite(_criteria(candidate, v, k)[0]):
+            continue
+        candidate, extra = _exchange(candidate, v, k, criterion, deadline, max_sweeps)
+        sweeps += extra
+        value = score(candidate)
+        if value[0] <= best[0] + 1e-9:
+            blocks, best = candidate, value
+    return (*_criteria(blocks, v, k), blocks, sweeps)
+
+
+def optimal_design(v, k, b, criterion="A", starts=8, rounds=20, seed=0, time_limit=None,
+                   workers=None, max_sweeps=100, progress=None):
+    """Mejor diseño de bloques incompletos (v, k, b) entre los arranques.
+
+    Sin ``time_limit`` se hace una tanda de ``starts`` arranques; con él se
+    repiten tandas (semillas ``[seed, tanda]``) hasta el límite o hasta
+    alcanzar la cota BIBD. El plazo se revisa antes de cada arranque, así que
+    la última tanda puede quedar incompleta. ``progress(arranques, total)``
+    se llama al terminar cada arranque.
+    """
+    start = time.perf_counter()
+    criterion = criterion.upper()
+    if criterion not in CRITERIA:
+        raise ValueError(f"❌ Criterio desconocido: {criterion}. Opciones: {', '.join(CRITERIA)}")
+    validate_sizes(v, k, b)
+    trace_bound, det_bound = bounds(v, k, b)
+
+    def design(blocks, trace, log_det, method, starts, sweeps):
+        return OptimalDesign(
+            v=v, k=k, b=b, criterion=criterion,
+            blocks=sorted(tuple(sorted(blk)) for blk in blocks),
+            trace=trace,
+            log_det=log_det,
+            a_efficiency=trace_bound / trace,
+            d_efficiency=float(np.exp((log_det - det_bound) / (v - 1))),
+            replications=_incidence(blocks, v).sum(axis=1).astype(int),
+            starts=starts,
+            sweeps=sweeps,
+            elapsed=time.perf_counter() - start,
+            seed=seed,
+            method=method,
+        )
+
+    known = known_bibd(v, k, b)
+    if known is not None:
+        method, blocks = known
+        return design(blocks, *_criteria(blocks, v, k), method, 0, 0)
+
+    deadline = time.monotonic() + time_limit if time_limit else None
+    task = partial(_run_start, v, k, b, criterion, deadline, max_sweeps, rounds)
+    parallel = starts * (rounds + 1) * b * k * v * v >= PARALLEL_MIN_WORK
+    # A: menor traza; D: mayor log det. El otro criterio desempata
+    key = (lambda res: (res[0], -res[1])) if criterion == "A" else (lambda res: (-res[1], res[0]))
+    done, wave = [], 0
+    while True:
+        report = None
+        if progress is not None:
+            report = partial(lambda prev, hechos, total: progress(prev + hechos, prev + total),
+                             wave * starts)
+        results = run_batches(task, [1] * starts, seed if wave == 0 else [seed, wave],
+                              deadline, workers, parallel=parallel, progress=report)
+        done += [res for res in results if res is not None]
+        wave += 1
+        if deadline is None or time.monotonic() > deadline or not done:
+            break
+        trace, log_det = min(done, key=key)[:2]
+        if trace <= trace_bound * (1 + 1e-9) or log_det >= det_bound - 1e-9:
+            break  # un BIBD: no hay diseño mejor
+
+    if not done:
+        raise RuntimeError("❌ No se encontró un diseño conexo en el tiempo disponible.")
+    trace, log_det, blocks, _ = min(done, key=key)
+    return design(blocks, trace, log_det, f"intercambio {criterion}-óptimo", len(done),
+                  sum(res[3] for res in done))
@@ -0,0 +1,156 @@
+"""Pruebas de aleatorización con permutaciones dentro de cada catador.
+
+Permutar las etiquetas de variedad dentro de un bloque no cambia la
+incidencia N ni los totales de bloque B, así que ``C⁺`` y ``N K⁻¹ B`` se
+calculan una sola vez y para cada permutación solo cambian los totales por
+variedad T. Por lotes de P permutaciones:
+
+- índices de permutación P × n con ``argsort(bloque + U)`` (U uniforme),
+- ``T = Y_perm X`` con X la matriz indicadora dispersa de variedades,
+- ``SC_trat(aj) = diag(Q C⁺ Qᵀ)`` con ``Q = T - N K⁻¹ B``.
+
+Como la SC dentro de bloques no cambia, la SC de tratamientos ajustada es
+equivalente al estadístico F. Para "el ganador supera al segundo" la
+diferencia de efectos ajustados es lineal en y (``d = gᵀy``); bajo la
+hipótesis nula de que ambas variedades son intercambiables se permutan sus
+dos puntajes en los bloques donde aparecen juntas, y cada intercambio suma
+``(g_p - g_q)(y_q - y_p)`` a d.
+
+Los lotes se reparten con ``mdex.jobs.run_batches``; cada lote usa su propia
+semilla derivada de ``seed``, de modo que el resultado no depende del número
+de procesos.
+"""
+
+import time
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+
+from mdex.absorption import DENSE_MAX_V, _solve, information_matrix
+from mdex.jobs import batch_sizes, run_batches
+from mdex.matrix import BlockMatrices
+
+# Celdas (permutaciones × observaciones) por lote
+BATCH_CELLS = 4_000_000
+# Por debajo de este trabajo total no vale la pena lanzar procesos
+PARALLEL_MIN_CELLS = 20_000_000
+
+
+@dataclass
+class PermutationResult:
+    n_perm: int
+    ss_treat: float
+    p_treatment: float
+    winner: object
+    runner_up: object
+    diff: float
+    p_winner: float
+    n_swaps: int  # bloques donde el ganador y el segundo aparecen juntos
+    elapsed: float
+    seed: int
+
+
+class _Problem:
+    """Datos fijos de la prueba, ordenados por bloque."""
+
+    def __init__(self, matrices):
+        v = matrices.v
+        y = matrices.scores.astype(np.float64)
+        y = y - y.mean()
+        c, q, b_tot, t_tot, _, _ = information_matrix(matrices, y)
+        self.const = t_tot - q  # N K⁻¹ B
+        self.tau, self.c_plus = _solve(c, q, v, dense=True)
+        self.ss_obs = float(self.tau @ q)
+
+        order = np.argsort(matrices.block_codes, kind="stable")
+        self.y = y[order]
+        self.blocks = matrices.block_codes[order].astype(np.float64)
+        treats = matrices.treat_codes[order]
+        n = len(y)
+        self.x = sparse.csr_matrix(
+            (np.ones(n), (np.arange(n), treats)), shape=(n, v)
+        )
+
+        # Ganador y segundo según los efectos ajustados observados
+        rank = np.argsort(-self.tau, kind="stable")
+        self.w, self.s = int(rank[0]), int(rank[1]) if v > 1 else int(rank[0])
+        self.diff_obs = float(self.tau[self.w] - self.tau[self.s])
+        h = self.c_plus[:, self.w] - self.c_plus[:, self.s]
+        block_sorted = matrices.block_codes[order]
+        counts = np.bincount(block_sorted, minlength=matrices.b)
+        g = h[treats] - (np.bincount(block_sorted, weights=h[treats]) / counts)[block_sorted]
+        # Primera aparición de cada variedad en cada bloque compartido
+        pos_w = self._first_positions(block_sorted, treats == self.w, matrices.b)
+        pos_s = self._first_positions(block_sorted, treats == self.s, matrices.b)
+        both = (pos_w >= 0) & (pos_s >= 0)
+        p, q_ = pos_w[both], pos_s[both]
+        self.swap_delta = (g[p] - g[q_]) * (self.y[q_] - self.y[p])
+
+    @staticmethod
+    def _first_positions(block_sorted, mask, b):
+        pos = np.full(b, -1)
+        rows = np.flatnonzero(mask)
+        # Al asignar en orden inverso queda la primera fila de cada bloque
+        pos[block_sorted[rows[::-1]]] = rows[::-1]
+        return pos
+
+    def run_batch(self, seed_seq, size):
+        rng = np.random.default_rng(seed_seq)
+        n = len(self.y)
+        keys = self.blocks[None, :] + rng.random((size, n))
+        perm = np.argsort(keys, axis=1)
+        totals = (self.x.T @ self.y[perm].T).T
+        q = totals - self.const
+        ss = np.einsum("ij,ij->i", q @ self.c_plus, q)
+        tol = 1e-9 * max(1.0, abs(self.ss_obs))
+        extreme_f = int((ss >= self.ss_obs - tol).sum())
+
+        extreme_w = 0
+        if len(self.swap_delta):
+            flips = rng.integers(0, 2, size=(size, len(self.swap_delta)))
+            d = self.diff_obs + flips @ self.swap_delta
+            extreme_w = int((d >= self.diff_obs - 1e-12).sum())
+        return extreme_f, extreme_w
+
+
+def permutation_test(df, block_col, treat_col, resp_col, n_perm=9999, seed=0,
+                     time_limit=None, workers=None, matrices=None, progress=None):
+    """Pruebas de permutación del efecto de variedad y del ganador contra el segundo.
+
+    ``progress(permutaciones, n_perm)`` se llama al terminar cada lote.
+    """
+    start = time.perf_counter()
+    matrices = matrices or BlockMatrices(df, block_col, treat_col, resp_col)
+    if matrices.v < 2:
+        raise ValueError("❌ Se necesitan al menos dos variedades.")
+    if matrices.v > DENSE_MAX_V:
+        raise ValueError(f"❌ La prueba de permutación admite hasta {DENSE_MAX_V} variedades.")
+    problem = _Problem(matrices)
+    n = len(problem.y)
+
+    size = int(np.clip(BATCH_CELLS // n, 1, 1000))
+    sizes = batch_sizes(n_perm, size)
+    deadline = time.monotonic() + time_limit if time_limit else None
+    results = run_batches(problem.run_batch, sizes, seed, deadline, workers,
+                          parallel=n * n_perm >= PARALLEL_MIN_CELLS, progress=progress)
+
+    done = [(r, k) for r, k in zip(results, sizes) if r is not None]
+    total = sum(k for _, k in done)
+    extreme_f = sum(r[0] for r, _ in done)
+    extreme_w = sum(r[1] for r, _ in done)
+    n_swaps = len(problem.swap_delta)
+
+    labels = matrices.treat_labels
+    return PermutationResult(
+        n_perm=total,
+        ss_treat=problem.ss_obs,
+        p_treatment=(1 + extreme_f) / (1 + total),
+        winner=labels[problem.w],
+        runner_up=labels[problem.s],
+        diff=problem.diff_obs,
+        p_winner=(1 + extreme_w) / (1 + total) if n_swaps else np.nan,
+        n_swaps=n_swaps,
+        elapsed=time.perf_counter() - start,
+        seed=seed,
+    )
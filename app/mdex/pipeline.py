@@ -0,0 +1,229 @@
+"""Análisis por lotes de archivos de cata, sin Streamlit.
+
+Para cada archivo se ejecutan los mismos pasos que las páginas de la app:
+verificación del diseño, ajuste intrabloque (o por absorción si no es un
+BIBD), medias ajustadas, comparaciones de Tukey y veredicto. Los archivos se
+reparten en un ``ProcessPoolExecutor``; un error en un archivo queda
+registrado en su resumen y no detiene a los demás. Cada archivo se identifica
+por su ruta relativa a la carpeta común de las entradas.
+
+Uso::
+
+    python -m mdex.pipeline "historico/*.csv" -o resultados/ --format parquet
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from mdex.absorption import fit_absorbed
+from mdex.comparisons import compare_means
+from mdex.dataset import TastingData
+from mdex.diagnostics import diagnose
+from mdex.ingest import BLANK_ATTR, read_tasting_file
+from mdex.intrablock import fit_intrablock
+from mdex.lsmeans import adjusted_means, ls_means_cov
+
+PATTERNS = ("*.csv", "*.parquet", "*.feather")
+
+
+def expand_inputs(inputs):
+    """Lista ordenada de archivos a partir de directorios, globs o rutas."""
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            for pattern in PATTERNS:
+                paths.extend(glob.glob(os.path.join(item, pattern)))
+        else:
+            paths.extend(glob.glob(item) or [item])
+    return sorted(set(os.path.normpath(p) for p in paths))
+
+
+def file_names(paths):
+    """Nombre de cada archivo relativo a la carpeta común de ``paths``.
+
+    ``2023/x.csv`` y ``2024/x.csv`` no se confunden en los resúmenes ni en la
+    tabla consolidada; con un solo archivo es su nombre.
+    """
+    full = [os.path.abspath(p) for p in paths]
+    if len(full) < 2:
+        return [os.path.basename(p) for p in full]
+    root = os.path.commonpath([os.path.dirname(p) for p in full])
+    return [os.path.relpath(p, root) for p in full]
+
+
+def design_summary(matrices):
+    """Parámetros del diseño: BIBD (v, b, k, r, λ), conectividad y eficiencia."""
+    return diagnose(matrices, pair_rows=0).as_dict()
+
+
+def analyze_file(path, block_col="Catador_ID", treat_col="Variedad_Codigo",
+                 resp_col="Puntaje_SCA", alpha=0.05, name=None):
+    """(tabla por café, resumen) de un archivo; ``name`` lo identifica en ambos."""
+    start = time.perf_counter()
+    name = name or os.path.basename(path)
+    df = read_tasting_file(path)
+    data = TastingData.from_frame(df, block_col, treat_col, resp_col)
+    matrices = data.matrices()
+    design = design_summary(matrices)
+
+    absorbed = fit_absorbed(df, block_col, treat_col, resp_col, matrices=matrices)
+    intra = fit_intrablock(df, block_col, treat_col, resp_col, matrices=matrices)
+    anova = intra.anova if intra is not None else absorbed.anova
+
+    table = adjusted_means(df, block_col, treat_col, resp_col, alpha=alpha, fit=absorbed,
+                           simple=data.variety_means())
+    means, cov = ls_means_cov(absorbed)
+    pairs, letters = compare_means(
+        means, absorbed.labels, absorbed.df_error, cov=cov,
+        se_diff=intra.se_diff if intra is not None else None, alpha=alpha,
+    )
+    table["Grupo"] = table["Café"].map(letters)
+    table = table.sort_values("Media Ajustada", ascending=False).reset_index(drop=True)
+    table.insert(0, "Archivo", name)
+    table["Puesto"] = np.arange(1, len(table) + 1)
+
+    verdict = {"ganador": table["Café"].iloc[0],
+               "media_ajustada": float(table["Media Ajustada"].iloc[0])}
+    if len(table) > 1:
+        second = table["Café"].iloc[1]
+        pair = pairs[pairs["Café A"].isin([verdict["ganador"], second])
+                     & pairs["Café B"].isin([verdict["ganador"], second])].iloc[0]
+        verdict.update(segundo=second, p_tukey=float(pair["p Tukey"]),
+                       significativo=bool(pair["Significativa"]))
+
+    treat_row = anova.iloc[0]
+    summary = {
+        "archivo": name,
+        "ruta": os.path.abspath(path),
+        "estado": "ok",
+        "filas_sin_puntaje": df.attrs.get(BLANK_ATTR, 0),
+        "diseno": design,
+        "anova": {
+            "F": float(treat_row["F"]),
+            "p": float(treat_row["PR(>F)"]),
+            "mse": float(intra.mse if intra is not None else absorbed.mse),
+            "gl_error": int(absorbed.df_error),
+        },
+        "veredicto": verdict,
+        "segundos": time.perf_counter() - start,
+    }
+    return table, summary
+
+
+def _error_summary(path, name, error, trace=None):
+    summary = {"archivo": name, "ruta": os.path.abspath(path), "estado": "error",
+               "error": f"{type(error).__name__}: {error}"}
+    if trace is not None:
+        summary["traza"] = trace
+    return summary
+
+
+def _safe_analyze(path, name, options):
+    try:
+        table, summary = analyze_file(path, name=name, **options)
+        return table, summary
+    except Exception as e:
+        return None, _error_summary(path, name, e, traceback.format_exc())
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    return str(obj)
+
+
+def write_outputs(tables, summaries, out_dir, fmt="csv"):
+    """Tabla consolidada, tabla de resúmenes y un JSON por archivo."""
+    os.makedirs(os.path.join(out_dir, "resumenes"), exist_ok=True)
+    for summary in summaries:
+        # Mismas subcarpetas que las entradas: los nombres relativos son únicos
+        name = os.path.join(out_dir, "resumenes", os.path.splitext(summary["archivo"])[0] + ".json")
+        os.makedirs(os.path.dirname(name), exist_ok=True)
+        with open(name, "w", encoding="utf-8") as f:
+            json.dump(summary, f, ensure_ascii=False, indent=2, default=_json_default)
+
+    flat = pd.json_normalize([{k: v for k, v in s.items() if k != "traza"} for s in summaries])
+    flat.to_csv(os.path.join(out_dir, "resumen.csv"), index=False)
+
+    if not tables:
+        return None
+    results = pd.concat(tables, ignore_index=True)
+    results["Café"] = results["Café"].astype(str)
+    if fmt == "parquet":
+        path = os.path.join(out_dir, "resultados.parquet")
+        try:
+            results.to_parquet(path, index=False)
+        except ImportError:
+            raise ValueError("❌ Escribir Parquet requiere instalar pyarrow.") from None
+    else:
+        path = os.path.join(out_dir, "resultados.csv")
+        results.to_csv(path, index=False)
+    return path
+
+
+def run_batch(paths, out_dir, fmt="csv", workers=None, **options):
+    """Analiza ``paths`` en paralelo y escribe los resultados en ``out_dir``."""
+    tables, summaries = {}, {}
+    names = dict(zip(paths, file_names(paths)))
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(paths) == 1:
+        for path in paths:
+            tables[path], summaries[path] = _safe_analyze(path, names[path], options)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_safe_analyze, path, names[path], options): path
+                       for path in paths}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    tables[path], summaries[path] = future.result()
+                except Exception as e:  # el proceso murió (memoria, señal...)
+                    tables[path] = None
+                    summaries[path] = _error_summary(path, names[path], e)
+    # Orden de entrada, independiente del orden en que terminan los procesos
+    ordered = [summaries[p] for p in paths]
+    output = write_outputs([tables[p] for p in paths if tables[p] is not None],
+                           ordered, out_dir, fmt)
+    return output, ordered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mdex.pipeline",
+        description="Análisis por lotes de archivos de cata (diseño, ajuste, medias y veredicto).",
+    )
+    parser.add_argument("inputs", nargs="+", help="directorios, globs o archivos")
+    parser.add_argument("-o", "--out", default="resultados", help="directorio de salida")
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="procesos en paralelo")
+    parser.add_argument("--bloque", default="Catador_ID")
+    parser.add_argument("--tratamiento", default="Variedad_Codigo")
+    parser.add_argument("--respuesta", default="Puntaje_SCA")
+    parser.add_argument("--alpha", type=float, default=0.05)
+    args = parser.parse_args(argv)
+
+    paths = expand_inputs(args.inputs)
+    if not paths:
+        parser.error("no se encontraron archivos")
+    output, summaries = run_batch(
+        paths, args.out, fmt=args.format, workers=args.workers, block_col=args.bloque,
+        treat_col=args.tratamiento, resp_col=args.respuesta, alpha=args.alpha,
+    )
+    errors = [s for s in summaries if s["estado"] != "ok"]
+    for s in errors:
+        print(f"{s['archivo']}: {s['error']}", file=sys.stderr)
+    print(f"{len(paths) - len(errors)}/{len(paths)} archivos analizados; resultados en {output}")
+    return 1 if errors and len(errors) == len(paths) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
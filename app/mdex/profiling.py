@@ -0,0 +1,290 @@
+"""Medición por etapas: tiempo, memoria máxima y perfil opcional con cProfile.
+
+Cada página envuelve sus pasos con ``stage("nombre")`` (administrador de
+contexto o decorador). Las mediciones van al ``Profiler`` de la sesión
+(panel "Performance" de la barra lateral, exportable a JSON) y al logger
+``mdex.perf`` como una línea JSON por etapa, para agregarlas entre sesiones
+(``MDEX_PERF_LOG=ruta`` las escribe además en un archivo).
+
+- Tiempo: ``time.perf_counter``, siempre.
+- Memoria: pico de ``tracemalloc`` durante la etapa, solo si se activa
+  (tiene costo). ``tracemalloc`` es global al proceso, así que con varias
+  sesiones simultáneas el pico incluye lo que asignen las demás. Las
+  sesiones que lo piden se cuentan: se detiene cuando la última lo
+  desactiva o se cierra, y el resto del servidor deja de pagar el costo.
+- cProfile: opcional; perfila solo las etapas de primer nivel (los perfiles
+  no se anidan) y guarda las funciones con mayor tiempo acumulado.
+
+Fuera de Streamlit (pipeline, benchmarks) ``stage`` solo mide y registra.
+"""
+
+import cProfile
+import io
+import json
+import logging
+import math
+import os
+import pstats
+import threading
+import time
+import tracemalloc
+import weakref
+from collections import deque
+from contextlib import ContextDecorator
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+
+HISTORY = 500        # etapas guardadas por sesión
+PROFILE_LINES = 25   # funciones por perfil de cProfile
+
+logger = logging.getLogger("mdex.perf")
+
+_local = threading.local()  # Profiler activo en el hilo de la sesión
+
+_tracing_lock = threading.Lock()
+_tracing_sessions = 0   # sesiones con la medición de memoria activa
+_tracing_owned = False  # True si tracemalloc lo inició este módulo
+
+
+def _hold_tracing():
+    global _tracing_sessions, _tracing_owned
+    with _tracing_lock:
+        if _tracing_sessions == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracing_owned = True
+        _tracing_sessions += 1
+
+
+def _release_tracing():
+    # Un tracemalloc iniciado por otro código (p. ej. python -X tracemalloc) no se detiene
+    global _tracing_sessions, _tracing_owned
+    with _tracing_lock:
+        _tracing_sessions -= 1
+        if _tracing_sessions == 0 and _tracing_owned:
+            tracemalloc.stop()
+            _tracing_owned = False
+
+
+def tracing_sessions():
+    """Sesiones que mantienen activo ``tracemalloc``."""
+    return _tracing_sessions
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    page: str
+    run: int
+    depth: int
+    seconds: float
+    peak_mb: float      # NaN si no se midió la memoria
+    started: float      # marca de tiempo UNIX
+    ok: bool
+    profile: str = ""   # resumen de pstats si cProfile estaba activo
+
+
+@lru_cache(maxsize=1)
+def _configure_log():
+    path = os.environ.get("MDEX_PERF_LOG")
+    if path:
+        handler = logging.FileHandler(path, encoding="utf-8")
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+
+
+def record_dict(record, profile=True):
+    """Registro como dict apto para JSON (NaN → None)."""
+    entry = asdict(record)
+    if not profile:
+        entry.pop("profile")
+    if isinstance(entry["peak_mb"], float) and math.isnan(entry["peak_mb"]):
+        entry["peak_mb"] = None
+    return entry
+
+
+def _session_id():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return ""
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else ""
+
+
+class Profiler:
+    """Mediciones de una sesión; ``begin_run`` marca cada ejecución de una página."""
+
+    def __init__(self, session_id=""):
+        self.session_id = session_id
+        self.records = deque(maxlen=HISTORY)
+        self.page = ""
+        self.run = 0
+        self.memory = False
+        self.cprofile = False
+        self._stack = []  # [inicio, pico propio] de las etapas abiertas
+        self._tracing = None  # weakref.finalize que libera tracemalloc
+
+    def begin_run(self, page, memory=False, cprofile=False):
+        self.page = page
+        self.run += 1
+        self.memory = memory
+        self.cprofile = cprofile
+        self._stack.clear()
+        self.trace_memory(memory)
+
+    def trace_memory(self, enabled):
+        """Toma o libera la referencia de esta sesión a ``tracemalloc``.
+
+        Si la sesión se cierra con la medición activa, el ``Profiler`` se
+        recolecta con su ``session_state`` y la referencia se libera igual.
+        """
+        if enabled and self._tracing is None:
+            _hold_tracing()
+            self._tracing = weakref.finalize(self, _release_tracing)
+        elif not enabled and self._tracing is not None:
+            self._tracing()  # un finalize se ejecuta una sola vez
+            self._tracing = None
+
+    def current_run(self):
+        return [r for r in self.records if r.run == self.run]
+
+    def to_json(self):
+        return json.dumps(
+            {"session": self.session_id, "records": [record_dict(r) for r in self.records]},
+            ensure_ascii=False, indent=2, default=str,
+        )
+
+    # -- uso interno de stage ------------------------------------------
+    def _update_peaks(self):
+        # El pico de tracemalloc se reinicia al abrir cada etapa: antes de
+        # hacerlo se traslada a todas las etapas abiertas
+        peak = tracemalloc.get_traced_memory()[1]
+        for frame in self._stack:
+            frame[1] = max(frame[1], peak)
+
+    def _enter(self):
+        if self.memory and tracemalloc.is_tracing():
+            self._update_peaks()
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+        else:
+            start = None
+        self._stack.append([start, 0])
+
+    def _exit(self):
+        start, peak = self._stack[-1]
+        if start is not None and tracemalloc.is_tracing():
+            self._update_peaks()
+            peak = self._stack[-1][1]
+            peak_mb = max(peak - start, 0) / 1024 ** 2
+        else:
+            peak_mb = float("nan")
+        self._stack.pop()
+        return peak_mb
+
+
+def current_profiler():
+    return getattr(_local, "profiler", None)
+
+
+def session_profiler(state, page, session_id=None):
+    """Profiler de la sesión (en ``state``), activo para esta ejecución de ``page``.
+
+    Las opciones de memoria y cProfile se leen de los controles del panel
+    (``perf_memoria`` y ``perf_cprofile``), que aplican desde la siguiente ejecución.
+    """
+    profiler = state.get("perf")
+    if profiler is None:
+        profiler = state["perf"] = Profiler(session_id if session_id is not None else _session_id())
+    memory = bool(state.get("perf_memoria", False)) or os.environ.get("MDEX_TRACE_MEMORY") == "1"
+    profiler.begin_run(page, memory=memory, cprofile=bool(state.get("perf_cprofile", False)))
+    _local.profiler = profiler
+    return profiler
+
+
+class stage(ContextDecorator):
+    """Mide una etapa: ``with stage("ajuste"):`` o ``@stage("ajuste")``."""
+
+    def __init__(self, name):
+        self.name = name
+        # Pila por hilo: un mismo decorador puede anidarse y usarse desde
+        # varias sesiones a la vez
+        self._local = threading.local()
+
+    @property
+    def _frames(self):
+        if not hasattr(self._local, "frames"):
+            self._local.frames = []
+        return self._local.frames
+
+    def __enter__(self):
+        profiler = current_profiler()
+        prof = None
+        if profiler is not None:
+            if profiler.cprofile and not profiler._stack:
+                prof = cProfile.Profile()
+            profiler._enter()
+        self._frames.append((profiler, prof, time.time(), time.perf_counter()))
+        if prof is not None:
+            prof.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        profiler, prof, started, t0 = self._frames.pop()
+        seconds = time.perf_counter() - t0
+        summary = ""
+        if prof is not None:
+            prof.disable()
+            out = io.StringIO()
+            pstats.Stats(prof, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            summary = out.getvalue()
+        depth, peak_mb, page, run = 0, float("nan"), "", 0
+        if profiler is not None:
+            depth = len(profiler._stack) - 1
+            peak_mb = profiler._exit()
+            page, run = profiler.page, profiler.run
+        record = StageRecord(self.name, page, run, depth, seconds, peak_mb, started,
+                             exc_type is None, summary)
+        if profiler is not None:
+            profiler.records.append(record)
+        _configure_log()
+        entry = record_dict(record, profile=False)
+        entry["session"] = profiler.session_id if profiler is not None else ""
+        logger.info(json.dumps(entry, ensure_ascii=False, default=str))
+        return False
+
+
+def perf_panel(profiler):
+    """Panel "Performance" plegable en la barra lateral."""
+    import pandas as pd
+    import streamlit as st
+
+    with st.sidebar.expander("Performance"):
+        st.toggle("Medir memoria por etapa", key="perf_memoria",
+                  help="Pico de memoria con tracemalloc (más lento). Aplica en la siguiente ejecución.")
+        st.toggle("Perfilar con cProfile", key="perf_cprofile",
+                  help="Perfil de las etapas de primer nivel. Aplica en la siguiente ejecución.")
+        records = profiler.current_run()
+        if not records:
+            st.caption("Sin etapas medidas en esta ejecución.")
+        else:
+            table = pd.DataFrame(
+                {
+                    "Etapa": ["  " * r.depth + r.stage for r in records],
+                    "ms": [r.seconds * 1000 for r in records],
+                    "Pico MB": [r.peak_mb for r in records],
+                }
+            )
+            # Las etapas se registran al terminar: orden de inicio para leerlas
+            table = table.iloc[sorted(range(len(records)), key=lambda i: records[i].started)]
+            st.dataframe(table.style.format({"ms": "{:.1f}", "Pico MB": "{:.2f}"}),
+                         hide_index=True)
+            total = sum(r.seconds for r in records if r.depth == 0)
+            st.caption(f"{profiler.page}: {total * 1000:.0f} ms medidos en esta ejecución.")
+            for r in records:
+                if r.profile:
+                    st.text(f"cProfile — {r.stage}")
+                    st.code(r.profile, language=None)
+        st.download_button("Exportar JSON", profiler.to_json(), "performance.json",
+                           "application/json")
@@ -0,0 +1,172 @@
+"""Búsqueda exacta de BIBD como cobertura exacta con multiplicidades.
+
+Cada par de tratamientos es una "columna" que debe cubrirse exactamente λ
+veces. Las capacidades restantes se guardan como máscaras de bits:
+``avail[x]`` tiene encendido el bit ``y`` mientras el par (x, y) todavía
+admite otro bloque. En cada nodo se ramifica sobre el par más restringido
+(el que tiene menos terceros tratamientos compatibles, al estilo DLX) y los
+candidatos se generan como cliques de la máscara común, así nunca se
+materializan todos los k-subconjuntos.
+
+Simetrías: el primer bloque se fija a {0, ..., k-1}; los tratamientos que
+aún no aparecen en ningún bloque son intercambiables, así que sólo se usan
+en orden (primero los de menor índice); y cuando se ramifica sobre un par
+con el bloque B, cualquier bloque que contenga ese par y sea
+lexicográficamente menor que B queda excluido en todo el subárbol (ya se
+exploró en una rama anterior). La búsqueda tiene presupuesto de nodos y de
+tiempo: no encontrar un diseño no demuestra que no exista.
+"""
+
+import time
+from itertools import combinations
+
+
+def _bits(mask):
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _cliques(cand, size, avail):
+    # Subconjuntos ordenados de ``cand`` de tamaño ``size`` mutuamente compatibles
+    if size == 0:
+        yield ()
+        return
+    for x in _bits(cand):
+        if (cand >> (x + 1)).bit_count() < size - 1:
+            return
+        rest = cand & avail[x] & ~((1 << (x + 1)) - 1)
+        for tail in _cliques(rest, size - 1, avail):
+            yield (x,) + tail
+
+
+def exact_cover_bibd(v, k, lam, max_nodes=2_000_000, time_limit=None, progress=None):
+    """Busca un BIBD(v, k, λ); devuelve ``(blocks | None, stats)``.
+
+    ``stats`` contiene el número de nodos explorados, el tiempo transcurrido
+    y si la búsqueda se detuvo por presupuesto. ``progress(nodos, max_nodos)``
+    se llama cada 1024 nodos.
+    """
+    start = time.perf_counter()
+    r = lam * (v - 1) // (k - 1)
+    b = v * r // k
+
+    full = (1 << v) - 1
+    avail = [full & ~(1 << i) for i in range(v)]
+    pair_rem = [[0 if x == y else lam for y in range(v)] for x in range(v)]
+    treat_rem = [r] * v
+    lower = {}
+    blocks = []
+
+    def place(block):
+        for t in block:
+            treat_rem[t] -= 1
+        for x, y in combinations(block, 2):
+            pair_rem[x][y] -= 1
+            pair_rem[y][x] -= 1
+            if pair_rem[x][y] == 0:
+                avail[x] &= ~(1 << y)
+                avail[y] &= ~(1 << x)
+        blocks.append(block)
+        # Poda: un par no puede necesitar más bloques de los que le quedan a
+        # sus tratamientos, y cada tratamiento pendiente necesita k-1
+        # compañeros disponibles
+        for t in block:
+            if treat_rem[t] < max(pair_rem[t]):
+                return False
+        return all(treat_rem[t] == 0 or avail[t].bit_count() >= k - 1 for t in block)
+
+    def unplace(block):
+        blocks.pop()
+        for t in block:
+            treat_rem[t] += 1
+        for x, y in combinations(block, 2):
+            if pair_rem[x][y] == 0:
+                avail[x] |= 1 << y
+                avail[y] |= 1 << x
+            pair_rem[x][y] += 1
+            pair_rem[y][x] += 1
+
+    def select():
+        # Par pendiente con menos terceros tratamientos compatibles.
+        # Devuelve None si no quedan pares, o "dead" si alguno es imposible.
+        best, best_count = None, None
+        for i in range(v):
+            if not treat_rem[i]:
+                continue
+            for j in _bits(avail[i] >> (i + 1)):
+                j += i + 1
+                c = (avail[i] & avail[j]).bit_count()
+                if c < k - 2:
+                    return "dead"
+                if best is None or c < best_count:
+                    best, best_count = (i, j), c
+                    if c == k - 2:
+                        return best
+        return best
+
+    def candidates(pair):
+        i, j = pair
+        # Tratamientos sin usar (distintos del par): sólo se admiten los
+        # ``n`` de menor índice cuando el bloque usa ``n`` de ellos
+        unused = [t for t in range(v) if treat_rem[t] == r and t != i and t != j]
+        for tail in _cliques(avail[i] & avail[j], k - 2, avail):
+            fresh = [t for t in tail if treat_rem[t] == r]
+            if fresh and fresh != unused[:len(fresh)]:
+                continue
+            block = tuple(sorted((i, j) + tail))
+            if any(block < lower[p] for p in combinations(block, 2) if p in lower):
+                continue
+            yield block
+
+    nodes = 1
+    exhausted = False
+    ok = place(tuple(range(k)))
+
+    # Pila explícita: (par, generador de candidatos, bloque colocado, cota previa)
+    stack = []
+    descend = ok
+    while True:
+        if descend:
+            pair = select()
+            if pair is None:
+                if len(blocks) == b:
+                    break
+            elif pair != "dead":
+                stack.append([pair, candidates(pair), None, None])
+        if not stack:
+            break
+        frame = stack[-1]
+        pair, gen, placed, prev = frame
+        if placed is not None:
+            unplace(placed)
+            if prev is None:
+                lower.pop(pair, None)
+            else:
+                lower[pair] = prev
+            frame[2] = None
+        block = next(gen, None)
+        if block is None:
+            stack.pop()
+            descend = False
+            continue
+        nodes += 1
+        if progress is not None and nodes % 1024 == 0:
+            progress(nodes, max_nodes)
+        if nodes > max_nodes or (time_limit is not None and nodes % 1024 == 0
+                                 and time.perf_counter() - start > time_limit):
+            exhausted = True
+            stack = []
+            break
+        frame[2], frame[3] = block, lower.get(pair)
+        lower[pair] = block
+        descend = place(block)
+
+    found = len(blocks) == b and not exhausted and select() is None
+    stats = {
+        "nodes": nodes,
+        "elapsed": time.perf_counter() - start,
+        "exhausted": exhausted,
+    }
+    return (list(blocks) if found else None), stats
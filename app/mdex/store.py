@@ -0,0 +1,184 @@
+"""Almacén de conjuntos de datos compartido por todas las sesiones.
+
+Cuando varios catadores abren el mismo archivo de temporada, cada sesión de
+Streamlit guardaba su propia copia del DataFrame. El almacén indexa cada
+archivo por el hash de su contenido y guarda una sola copia por conjunto de
+datos distinto; las sesiones solo guardan un ``DatasetHandle`` liviano.
+``put_upload`` además recuerda el hash de los bytes subidos: quien sube un
+archivo que ya se leyó recibe el handle sin volver a parsearlo. El tope no
+cubre la lectura de un archivo nuevo (dos sesiones que suben a la vez el
+mismo archivo lo leen ambas), solo las copias que quedan guardadas.
+
+Un tope global de memoria (``MDEX_STORE_MB``) desaloja los conjuntos menos
+usados hacia disco (Arrow IPC si pyarrow está instalado; pickle si no) y se
+recargan de forma transparente al pedirlos. Recargar copia el conjunto
+completo a memoria, donde vuelve a contar contra el tope.
+
+Los DataFrames entregados son compartidos y deben tratarse como inmutables.
+"""
+
+import hashlib
+import importlib.util
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+
+import pandas as pd
+
+from mdex.cache import dataset_key, nbytes
+
+DEFAULT_MAX_MB = 1024
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+def upload_key(raw, name=""):
+    """Hash de los bytes de un archivo subido; la extensión decide cómo se lee."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(os.path.splitext(name)[1].lower().encode())
+    digest.update(raw)
+    return digest.hexdigest()
+
+
+def default_spill_dir():
+    return os.environ.get(
+        "MDEX_STORE_DIR",
+        os.path.join(os.path.expanduser("~"), ".cache", "mdex", "datasets"),
+    )
+
+
+@dataclass(frozen=True)
+class DatasetHandle:
+    """Referencia liviana a un conjunto de datos del almacén."""
+
+    key: str
+    name: str
+    rows: int
+    columns: tuple
+    nbytes: int
+
+    def frame(self, store=None):
+        return (store or default_store()).get(self.key)
+
+
+class DatasetStore:
+    """LRU de DataFrames deduplicados por contenido, con desalojo a disco."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_MB * 1024 ** 2, spill_dir=None):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir or default_spill_dir()
+        self._memory = OrderedDict()  # clave -> (df, bytes)
+        self._spilled = {}  # clave -> ruta
+        self._uploads = {}  # hash de los bytes subidos -> handle
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+
+    def __contains__(self, key):
+        return key in self._memory or key in self._spilled
+
+    def put(self, df, name=""):
+        """Guarda ``df`` (si no estaba) y devuelve su handle."""
+        key = dataset_key(df, tuple(df.columns))
+        size = nbytes(df)
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+            elif key not in self._spilled:
+                self._insert(key, df, size)
+        return DatasetHandle(key, name, len(df), tuple(df.columns), size)
+
+    def put_upload(self, upload, read):
+        """Handle del archivo subido ``upload``; ``read(upload)`` solo se llama
+        si sus bytes no se habían leído antes.
+
+        ``upload`` es un objeto tipo archivo con ``name`` y ``getvalue()``,
+        como el ``UploadedFile`` de Streamlit.
+        """
+        digest = upload_key(upload.getvalue(), upload.name)
+        with self._lock:
+            handle = self._uploads.get(digest)
+        if handle is not None and handle.key in self:
+            return replace(handle, name=upload.name)
+        handle = self.put(read(upload), upload.name)
+        with self._lock:
+            self._uploads[digest] = handle
+        return handle
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key][0]
+            path = self._spilled.get(key)
+            if path is None:
+                raise KeyError(key)
+            df = self._load(path)
+            self._insert(key, df, nbytes(df))
+            return df
+
+    def _insert(self, key, df, size):
+        self._memory[key] = (df, size)
+        self.total_bytes += size
+        # El conjunto recién insertado nunca se desaloja: alguien lo está usando
+        while self.total_bytes > self.max_bytes and len(self._memory) > 1:
+            old_key, (old_df, old_size) = self._memory.popitem(last=False)
+            if old_key not in self._spilled:
+                self._spilled[old_key] = self._spill(old_key, old_df)
+            self.total_bytes -= old_size
+
+    # ------------------------------------------------------------------
+    # Disco
+    # ------------------------------------------------------------------
+    def _spill(self, key, df):
+        os.makedirs(self.spill_dir, exist_ok=True)
+        arrow_ok = HAS_PYARROW and isinstance(df.index, pd.RangeIndex) and df.index.start == 0
+        path = os.path.join(self.spill_dir, key + (".arrow" if arrow_ok else ".pkl"))
+        if arrow_ok:
+            df.to_feather(path)
+        else:
+            with open(path, "wb") as f:
+                pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return path
+
+    @staticmethod
+    def _load(path):
+        if path.endswith(".arrow"):
+            from pyarrow import feather
+
+            # El mapeo evita un búfer intermedio, pero to_pandas() copia los
+            # datos: el DataFrame recargado ocupa memoria como el original
+            return feather.read_table(path, memory_map=True).to_pandas()
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def clear(self):
+        with self._lock:
+            for path in self._spilled.values():
+                if os.path.exists(path):
+                    os.remove(path)
+            self._memory.clear()
+            self._spilled.clear()
+            self._uploads.clear()
+            self.total_bytes = 0
+
+
+@lru_cache(maxsize=1)
+def default_store():
+    """Almacén del proceso, compartido por todas las sesiones de Streamlit."""
+    max_mb = float(os.environ.get("MDEX_STORE_MB", DEFAULT_MAX_MB))
+    return DatasetStore(int(max_mb * 1024 ** 2))
+
+
+def session_dataset(state):
+    """DataFrame de la sesión a partir de su handle, o None si no hay datos."""
+    handle = state.get("dataset")
+    if handle is None:
+        return None
+    try:
+        return handle.frame()
+    except KeyError:
+        # El proceso se reinició y el almacén ya no tiene el conjunto
+        return None
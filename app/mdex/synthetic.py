@@ -0,0 +1,153 @@
+"""Paneles de cata sintéticos con el esquema de columnas de la app.
+
+El único archivo real tiene 30 puntajes; para medir cómo escalan el diseño y
+el análisis se generan paneles a partir de un BIBD(v, k, λ) repetido
+``replicas`` veces (cada réplica aporta b catadores nuevos):
+
+    puntaje = base + efecto de la variedad + sesgo del catador + ruido
+
+El sesgo del catador sigue la distribución elegida y define su perfil
+(Generoso si es positivo, Estricto si no). Cada celda se elimina con
+probabilidad ``missing`` para simular catas incompletas.
+
+Uso::
+
+    python -m mdex.synthetic -v 13 -k 4 -l 1 --replicas 500 -o panel.csv
+"""
+
+import argparse
+import os
+import string
+import sys
+
+import numpy as np
+import pandas as pd
+
+from mdex.bibd import find_bibd
+from mdex.ingest import SCORE_RANGE, apply_schema
+
+BIAS_DISTRIBUTIONS = ("normal", "t", "uniforme", "bimodal")
+
+# Nombres de las variedades del archivo original; el resto se numera
+VARIETY_NAMES = (
+    "Geisha (Panamá)", "Bourbon (El Salvador)", "Caturra (Colombia)",
+    "Typica (Ecuador)", "Pacamara (Guatemala)",
+)
+
+
+def variety_codes(v):
+    """Códigos A..Z (como en el archivo original) o V001.. si hay más de 26."""
+    if v <= 26:
+        return list(string.ascii_uppercase[:v])
+    return [f"V{i + 1:03d}" for i in range(v)]
+
+
+def taster_bias(rng, size, distribution="normal", scale=1.5):
+    """Sesgo de cada catador (en puntos SCA) según ``distribution``."""
+    if distribution == "normal":
+        return rng.normal(0.0, scale, size)
+    if distribution == "t":
+        # Colas pesadas: algunos catadores muy alejados del resto
+        return scale * rng.standard_t(3, size) / np.sqrt(3.0)
+    if distribution == "uniforme":
+        return rng.uniform(-scale * np.sqrt(3.0), scale * np.sqrt(3.0), size)
+    if distribution == "bimodal":
+        # Dos perfiles marcados (Generoso / Estricto) con poca dispersión interna
+        return rng.choice([-scale, scale], size) + rng.normal(0.0, scale / 4, size)
+    raise ValueError(
+        f"❌ Distribución desconocida: {distribution}. Opciones: {', '.join(BIAS_DISTRIBUTIONS)}"
+    )
+
+
+def synthetic_panel(v=5, k=3, lam=3, replicas=1, bias="normal", bias_scale=1.5,
+                    noise=1.0, missing=0.0, effect_scale=2.0, base=84.0, seed=0,
+                    return_effects=False):
+    """DataFrame con las columnas de ``datos_cata_cafe_bibd.csv``.
+
+    Con ``return_effects=True`` devuelve también la serie de efectos reales
+    de cada variedad, para comprobar que el análisis los recupera.
+    """
+    if not 0.0 <= missing < 1.0:
+        raise ValueError("❌ La tasa de celdas faltantes debe estar en [0, 1).")
+    design = find_bibd(v, k, lam)
+    blocks = np.asarray(design["blocks"], dtype=np.int32)  # b × k
+    b = len(blocks)
+    rng = np.random.default_rng(seed)
+
+    # Cada réplica usa el diseño con las variedades en otro orden dentro de
+    # cada bloque y los catadores barajados
+    n_tasters = b * replicas
+    layout = np.tile(blocks, (replicas, 1))[rng.permutation(n_tasters)]
+    layout = np.take_along_axis(layout, rng.random(layout.shape).argsort(axis=1), axis=1)
+
+    effects = rng.normal(0.0, effect_scale, v)
+    effects -= effects.mean()
+    biases = taster_bias(rng, n_tasters, bias, bias_scale)
+
+    taster = np.repeat(np.arange(n_tasters), k)
+    variety = layout.ravel()
+    score = base + effects[variety] + biases[taster] + rng.normal(0.0, noise, len(variety))
+    keep = rng.random(len(variety)) >= missing
+    taster, variety, score = taster[keep], variety[keep], score[keep]
+
+    codes = np.array(variety_codes(v), dtype=object)
+    names = np.array(
+        [VARIETY_NAMES[i] if i < len(VARIETY_NAMES) else f"Variedad {codes[i]}" for i in range(v)],
+        dtype=object,
+    )
+    df = pd.DataFrame({
+        "Catador_ID": taster + 1,
+        "Perfil_Catador": np.where(biases[taster] > 0, "Generoso", "Estricto"),
+        "Variedad_Codigo": codes[variety],
+        "Variedad_Nombre": names[variety],
+        "Puntaje_SCA": np.clip(score, *SCORE_RANGE).round(2),
+    })
+    df = apply_schema(df)
+    if return_effects:
+        return df, pd.Series(effects, index=pd.Index(codes, name="Variedad_Codigo"), name="Efecto")
+    return df
+
+
+def write_panel(df, path):
+    """Escribe el panel en CSV, Parquet o Feather según la extensión."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in (".parquet", ".feather"):
+        try:
+            if ext == ".parquet":
+                df.to_parquet(path, index=False)
+            else:
+                df.to_feather(path)
+        except ImportError:
+            raise ValueError("❌ Escribir Parquet/Feather requiere instalar pyarrow.") from None
+    else:
+        df.to_csv(path, index=False)
+    return path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m mdex.synthetic",
+        description="Genera un panel de cata sintético a partir de un BIBD(v, k, λ).",
+    )
+    parser.add_argument("-v", type=int, default=5, help="variedades")
+    parser.add_argument("-k", type=int, default=3, help="variedades por catador")
+    parser.add_argument("-l", "--lam", type=int, default=3, help="λ del diseño")
+    parser.add_argument("--replicas", type=int, default=1, help="copias del diseño (b catadores cada una)")
+    parser.add_argument("--sesgo", choices=BIAS_DISTRIBUTIONS, default="normal")
+    parser.add_argument("--escala-sesgo", type=float, default=1.5)
+    parser.add_argument("--ruido", type=float, default=1.0)
+    parser.add_argument("--faltantes", type=float, default=0.0, help="tasa de celdas faltantes")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("-o", "--out", default="panel_sintetico.csv")
+    args = parser.parse_args(argv)
+
+    df = synthetic_panel(args.v, args.k, args.lam, replicas=args.replicas, bias=args.sesgo,
+                         bias_scale=args.escala_sesgo, noise=args.ruido,
+                         missing=args.faltantes, seed=args.semilla)
+    write_panel(df, args.out)
+    print(f"{len(df)} puntajes de {df['Catador_ID'].nunique()} catadores en {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,25 @@
+"""Texto teórico de la página Diseño BIBD.
+
+El desarrollo (teoremas, ANOVA tradicional y ANOVA para BIBD) vive en
+``data/teoria_bibd.md`` y se lee una sola vez por proceso. Cada sección
+empieza con una línea ``<!-- sección: Título -->``; la página muestra solo la
+sección elegida en lugar de enviar todo el LaTeX en cada ejecución.
+"""
+
+import os
+import re
+from functools import lru_cache
+
+THEORY_PATH = os.path.join(os.path.dirname(__file__), "data", "teoria_bibd.md")
+
+_SECTION = re.compile(r"^<!-- sección: (.+?) -->\s*$", re.MULTILINE)
+
+
+@lru_cache(maxsize=1)
+def theory_sections(path=THEORY_PATH):
+    """{título: markdown} en el orden del archivo."""
+    with open(path, encoding="utf-8") as f:
+        text = f.read()
+    parts = _SECTION.split(text)
+    # parts = [preámbulo, título 1, cuerpo 1, título 2, cuerpo 2, ...]
+    return {title: body.strip() for title, body in zip(parts[1::2], parts[2::2])}
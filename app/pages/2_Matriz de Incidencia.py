@@ -1,46 +1,55 @@
 import streamlit as st
-import pandas as pd
-import seaborn as sns
-import matplotlib.pyplot as plt
-import numpy as np
+
+from mdex.heatmap import cached_heatmap
+from mdex.dataset import tasting_data
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.store import session_dataset
+
+perf = session_profiler(st.session_state, "Matriz de Incidencia")
+
+# Catadores por página cuando el panel es demasiado grande para la grilla densa
+MAX_FILAS = 1000
 
 st.title(" Matriz de Incidencia ")
 
 # Obtener dataframe
-df_original = st.session_state.get("df")
+df_original = session_dataset(st.session_state)
 
 if df_original is None:
     st.error("No se ha cargado ningún archivo desde la página principal.")
     st.stop()
 
-df = df_original.copy()
-
 # Selección de columna que representa la variedad
 variedad = st.selectbox(
     "Selecciona la columna que representa la variedad del café:",
     ["Variedad_Codigo", "Variedad_Nombre"]
 )
 
-# Filas = Catadores
-catadores = df["Catador_ID"].unique()
-
-# Columnas = Variedades
-variedades = df[variedad].unique()
-
 # -----------------------------------------------
 # MATRIZ Catador × Café CON PUNTAJES REALES
 # -----------------------------------------------
-matriz = pd.DataFrame(index=[f"#{i}" for i in catadores], columns=variedades)
+# Filas = Catadores, Columnas = Variedades. Los códigos enteros se calculan
+# una vez por archivo (TastingData en caché), no en cada ejecución
+with stage("matrices"):
+    matrices = tasting_data(df_original).matrices(variedad)
 
-for _, row in df.iterrows():
-    cat = f"#{row['Catador_ID']}"
-    cafe = row[variedad]
-    score = row["Puntaje_SCA"]
-    matriz.loc[cat, cafe] = score
+pagina = 0
+if matrices.is_small():
+    matriz = matrices.score_frame()
+else:
+    n_paginas = -(-matrices.b // MAX_FILAS)
+    pagina = st.number_input(f"Página de catadores (1–{n_paginas})", 1, n_paginas, 1) - 1
+    matriz = matrices.score_frame(slice(pagina * MAX_FILAS, (pagina + 1) * MAX_FILAS))
+    st.info(
+        f"Panel grande ({matrices.b} catadores × {matrices.v} variedades): "
+        f"se muestran {MAX_FILAS} catadores por página."
+    )
 
 # Mostrar matriz EXACTA como la imagen
 st.write("###  Matriz de Puntajes Reales (catadores vs variedades)")
-st.dataframe(matriz)
+with stage("tabla_puntajes"):
+    # Los puntajes son float32: en float64 y con 2 decimales 88.9 no se ve como 88.900002
+    st.dataframe(matriz.astype("float64").round(2))
 
 # -----------------------------------------------
 # HEATMAP con puntajes dentro de cada celda
@@ -48,16 +57,48 @@ st.dataframe(matriz)
 
 st.write("###  Heatmap de Puntajes ")
 
-# Convertir a float, reemplazar None por NaN
-heatmap_data = matriz.astype(float)
-
-plt.figure(figsize=(12, 6))
-sns.heatmap(
-    heatmap_data,
-    annot=True,        # muestra los puntajes dentro del cuadro
-    fmt=".2f",         # formato de decimales
-    cmap="viridis",    # mapa de colores
-    linewidths=0.5,
-    linecolor="black"
-)
-st.pyplot(plt)
+col1, col2 = st.columns(2)
+with col1:
+    orden = st.selectbox(
+        "Orden de los catadores:",
+        ["original", "media", "cluster"],
+        format_func={"original": "Original", "media": "Por puntaje medio",
+                     "cluster": "Agrupamiento jerárquico"}.get,
+    )
+with col2:
+    # Promediar por perfil solo si el archivo trae la columna de perfil
+    agrupaciones = ["ninguna", "grupo", "bloques"]
+    if "Perfil_Catador" not in df_original.columns:
+        agrupaciones.remove("grupo")
+    agrupacion = st.selectbox(
+        "Filas del heatmap:",
+        agrupaciones,
+        format_func={"ninguna": "Un catador por fila", "grupo": "Promedio por perfil de catador",
+                     "bloques": "Promedio de catadores consecutivos"}.get,
+    )
+tamano_bloque = 10
+if agrupacion == "bloques":
+    tamano_bloque = st.slider("Catadores por fila", 2, 500, 10)
+
+# La figura (PNG o Plotly) queda en caché por datos y opciones
+with stage("heatmap"):
+    heatmap = cached_heatmap(
+        df_original, "Catador_ID", variedad, "Puntaje_SCA",
+        group_col="Perfil_Catador" if agrupacion == "grupo" else None,
+        order=orden, page=int(pagina), page_size=MAX_FILAS, agg=agrupacion, bin_size=tamano_bloque,
+    )
+
+    if heatmap.kind == "plotly":
+        import plotly.io as pio
+
+        st.plotly_chart(pio.from_json(heatmap.payload), use_container_width=True)
+    else:
+        st.image(heatmap.payload, use_container_width=heatmap.kind == "raster")
+
+if not heatmap.annotated:
+    st.caption(
+        f"{heatmap.n_rows} filas × {heatmap.n_cols} variedades: las celdas son demasiado "
+        "pequeñas para mostrar los puntajes; pasa el cursor o reduce las filas para verlos."
+    )
+
+perf_panel(perf)
@@ -1,11 +1,18 @@
+from functools import partial
+
 import streamlit as st
 import pandas as pd
-import statsmodels.api as sm
-import statsmodels.formula.api as smf
+
+from mdex.cache import Analysis
+from mdex.jobs import default_runner, show_job
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.store import session_dataset
+
+perf = session_profiler(st.session_state, "Ajuste Intrabloque")
 
 st.title("Ajuste Intrabloque (BIBD)")
 
-df = st.session_state.get("df")  # <-- Usar el df cargado previamente
+df = session_dataset(st.session_state)  # <-- Usar el df cargado previamente
 
 if df is None:
     st.error("Primero debes cargar un DataFrame en la sección anterior.")
@@ -24,32 +31,163 @@ col_bloque = st.selectbox("Columna de Bloques", df.columns)
 col_trat = st.selectbox("Columna de Tratamientos", df.columns)
 col_resp = st.selectbox("Columna de Respuesta", df.columns)
 
+# ============================================================
+#      VERIFICACIÓN DEL DISEÑO
+# ============================================================
+
+st.subheader("Verificación del diseño")
+
+# BIBD: análisis en forma cerrada a partir de los totales. Los ajustes quedan
+# en la caché compartida con Medias Ajustadas y Veredicto Final
+analisis = Analysis(df, col_bloque, col_trat, col_resp)
+
+try:
+    with stage("diagnostico_diseno"):
+        diag = analisis.diagnostics()
+    d1, d2, d3, d4 = st.columns(4)
+    d1.metric("r (repeticiones)", f"{diag.r_min}–{diag.r_max}" if diag.r_min != diag.r_max else diag.r_max)
+    d2.metric("k (por catador)", f"{diag.k_min}–{diag.k_max}" if diag.k_min != diag.k_max else diag.k_max)
+    d3.metric("λ (por pareja)", f"{diag.lam_min}–{diag.lam_max}" if diag.lam_min != diag.lam_max else diag.lam_max)
+    d4.metric("Eficiencia", "—" if pd.isna(diag.efficiency) else f"{diag.efficiency:.4f}")
+    problemas = diag.issues()
+    if diag.is_bibd:
+        st.success("Los datos forman un BIBD: el ajuste intrabloque usará la forma cerrada.")
+    elif diag.connected:
+        st.warning("Los datos no forman un BIBD; se usará el ajuste general por absorción.\n\n"
+                   + "\n".join(f"- {p}" for p in problemas))
+    else:
+        st.error("❌ " + " ".join(problemas))
+    if not diag.is_bibd and len(diag.pairs):
+        with st.expander("Parejas de variedades con mayor desviación de λ"):
+            st.caption(f"λ medio {diag.lam_mean:.2f}, desviación estándar {diag.lam_sd:.2f}.")
+            st.dataframe(diag.pairs, hide_index=True)
+except Exception as e:
+    st.error(f"No fue posible verificar el diseño: {e}")
+
+# Varianza de bloques para el análisis combinado (solo BIBD)
+metodo_inter = st.selectbox(
+    "Estimación de la varianza entre catadores (análisis combinado)",
+    ["REML", "Yates (ANOVA)"],
+)
+
+# Prueba de aleatorización: no supone normalidad de los puntajes
+with st.expander("Prueba de permutación"):
+    usar_perm = st.checkbox("Calcular p-valores por permutación", value=True)
+    n_perm = st.number_input("Permutaciones", min_value=99, max_value=1_000_000, value=4999, step=1000)
+    semilla = st.number_input("Semilla", min_value=0, value=0, step=1)
+    limite = st.number_input("Tiempo máximo (s)", min_value=1.0, value=20.0, step=5.0)
+
 # ============================================================
 #      AJUSTE INTRABLOQUE (Modelo de Bloques Completos)
 # ============================================================
 
+def ajustar(analisis, metodo, usar_perm, n_perm, semilla, limite, progress=None):
+    """Ajustes de la página; corre como trabajo en segundo plano."""
+    ajuste = {"intrablock": analisis.intrablock(), "permutation": None}
+    if ajuste["intrablock"] is not None:
+        ajuste["combined"] = analisis.combined(metodo)
+    else:
+        ajuste["absorbed"] = analisis.absorbed()
+    if usar_perm:
+        ajuste["permutation"] = analisis.permutation(n_perm, semilla, limite, progress=progress)
+    return ajuste
+
+
+opciones = ("reml" if metodo_inter == "REML" else "yates", usar_perm, int(n_perm), int(semilla),
+            float(limite))
+clave = (analisis.key, "ajuste_pagina") + opciones
+
 if st.button("Ajustar Modelo Intrabloque"):
+    st.session_state.trabajo_ajuste = default_runner().submit(
+        clave, partial(ajustar, analisis, *opciones),
+        name="Ajuste del modelo", unit="permutaciones",
+    )
+
+# Solo se muestra el ajuste de las columnas y opciones actuales
+trabajo = st.session_state.get("trabajo_ajuste")
+if trabajo is not None and trabajo.key == clave:
+    with stage("ajuste_intrabloque"):
+        ajuste = show_job(trabajo)
+else:
+    ajuste = None
+
+if ajuste is not None:
     st.subheader("Modelo Lineal del Diseño en Bloques")
 
     # --------------------------------------------------------
     # MODELO: Y = μ + Tratamiento + Bloque + error
     # --------------------------------------------------------
 
-    formula = f"{col_resp} ~ C({col_trat}) + C({col_bloque})"
-
     try:
-        modelo = smf.ols(formula, data=df).fit()
-        anova_table = sm.stats.anova_lm(modelo, typ=2)
-
-        st.write("### Tabla ANOVA")
-        st.write(anova_table)
-
-        # ----------------------------------------------------
-        #   EFECTOS AJUSTADOS
-        # ----------------------------------------------------
-        st.subheader("Estimaciones del Modelo")
-        st.write(modelo.summary())
+        resultado = ajuste["intrablock"]
+
+        if resultado is not None:
+            st.caption(
+                f"Diseño BIBD detectado: v={resultado.v}, b={resultado.b}, "
+                f"k={resultado.k}, r={resultado.r}, λ={resultado.lam}"
+            )
+
+            st.write("### Tabla ANOVA")
+            st.write(resultado.anova)
+
+            # ----------------------------------------------------
+            #   EFECTOS AJUSTADOS
+            # ----------------------------------------------------
+            st.subheader("Estimaciones del Modelo")
+            st.write(resultado.effects)
+            st.write(f"Error estándar de una diferencia de efectos: {resultado.se_diff:.4f}")
+
+            # ----------------------------------------------------
+            #   RECUPERACIÓN DE INFORMACIÓN INTERBLOQUE
+            # ----------------------------------------------------
+            combinado = ajuste["combined"]
+            st.subheader("Análisis Combinado Intra/Interbloque")
+            c1, c2, c3 = st.columns(3)
+            c1.metric("σ² error", f"{combinado.sigma2:.4f}")
+            c2.metric("σ² catadores", f"{combinado.sigma2_block:.4f}")
+            c3.metric("Ganancia de eficiencia", f"{combinado.efficiency_gain:.3f}")
+            st.write(combinado.effects)
+            st.write(
+                f"Error estándar de una diferencia de efectos combinados: {combinado.se_diff:.4f}"
+            )
+        else:
+            # Datos no balanceados: bloques absorbidos y sistema reducido v × v
+            resultado = ajuste["absorbed"]
+            st.caption("Datos no balanceados: ajuste general por absorción de bloques.")
+
+            st.write("### Tabla ANOVA")
+            st.write(resultado.anova)
+
+            # ----------------------------------------------------
+            #   EFECTOS AJUSTADOS
+            # ----------------------------------------------------
+            st.subheader("Estimaciones del Modelo")
+            st.write(resultado.coefficients)
+            st.write(resultado.effects)
+
+        # --------------------------------------------------------
+        #   PRUEBA DE PERMUTACIÓN DENTRO DE CATADORES
+        # --------------------------------------------------------
+        perm = ajuste["permutation"]
+        if perm is not None:
+            st.subheader("Prueba de Permutación dentro de Catadores")
+            if perm.n_perm < n_perm:
+                st.warning(
+                    f"Se alcanzó el tiempo máximo: {perm.n_perm} de {int(n_perm)} permutaciones."
+                )
+            c1, c2 = st.columns(2)
+            c1.metric("p-valor (efecto de variedad)", f"{perm.p_treatment:.4f}")
+            if perm.n_swaps:
+                c2.metric(f"p-valor ({perm.winner} supera a {perm.runner_up})", f"{perm.p_winner:.4f}")
+            else:
+                c2.info(f"{perm.winner} y {perm.runner_up} nunca coinciden en un catador.")
+            st.caption(
+                f"{perm.n_perm} permutaciones en {perm.elapsed:.2f} s (semilla {perm.seed}); "
+                f"{perm.n_swaps} catadores evaluaron a ambos finalistas."
+            )
 
 
     except Exception as e:
         st.error(f"Error al ajustar el modelo: {e}")
+
+perf_panel(perf)
@@ -1,11 +1,14 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import statsmodels.formula.api as smf
-import plotly.express as px
+
+from mdex.cache import Analysis
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.store import session_dataset
+
+perf = session_profiler(st.session_state, "Medias Ajustadas")
 
 # Cargar o recuperar DataFrame
-df = st.session_state.get('df')
+df = session_dataset(st.session_state)
 if df is None:
     try:
         df = pd.read_csv('datos_cata_cafe_bibd.csv')
@@ -16,45 +19,22 @@ if df is None:
 
 st.title('Medias Ajustadas')
 
-# Medias simples por variedad
-medias_simples = df.groupby('Variedad_Codigo')['Puntaje_SCA'].mean().sort_index()
-
-# Ajuste: modelo con tratamiento (Variedad) y bloque (Catador)
-resultados = st.session_state.get('resultados')
-if resultados is None:
-    try:
-        modelo = smf.ols('Puntaje_SCA ~ C(Variedad_Codigo) + C(Catador_ID)', data=df).fit()
-
-        # Para cada variedad, predecimos para cada catador y promediamos
-        variedades = sorted(df['Variedad_Codigo'].unique())
-        catadores = sorted(df['Catador_ID'].unique())
-
-        medias_ajustadas = []
-        for v in variedades:
-            # construir DataFrame de predicción: la variedad v, para todos los catadores
-            pred_df = pd.DataFrame({
-                'Variedad_Codigo': [v] * len(catadores),
-                'Catador_ID': catadores,
-            })
-            preds = modelo.predict(pred_df)
-            medias_ajustadas.append(np.mean(preds))
-
-        resultados = pd.DataFrame({
-            'Café': variedades,
-            'Media Simple': [medias_simples.get(v, np.nan) for v in variedades],
-            'Media Ajustada': medias_ajustadas,
-        })
-
-        # Guardar para otras páginas
-        st.session_state['resultados'] = resultados
-
-    except Exception as e:
-        st.error(f'Error al ajustar modelo: {e}')
-        # En caso de fallo, construir al menos el dataframe de medias simples
-        resultados = pd.DataFrame({
-            'Café': medias_simples.index.tolist(),
-            'Media Simple': medias_simples.values,
-        })
+# Ajuste: modelo con tratamiento (Variedad) y bloque (Catador); las medias
+# ajustadas salen de los coeficientes con una matriz de contrastes. La caché
+# está indexada por el contenido del archivo, así que nunca quedan resultados
+# de un archivo anterior
+analisis = Analysis(df, 'Catador_ID', 'Variedad_Codigo', 'Puntaje_SCA')
+try:
+    with stage('medias_ajustadas'):
+        resultados = analisis.adjusted_means()
+except Exception as e:
+    st.error(f'Error al ajustar modelo: {e}')
+    # En caso de fallo, construir al menos el dataframe de medias simples
+    medias_simples = analisis.data.variety_means().sort_index()
+    resultados = pd.DataFrame({
+        'Café': medias_simples.index.tolist(),
+        'Media Simple': medias_simples.values,
+    })
 
 st.subheader('Resultados')
 st.dataframe(resultados)
@@ -63,56 +43,48 @@ st.dataframe(resultados)
 # Gráfica interactiva: Media Simple vs Media Ajustada (Plotly)
 # -------------------------------
 try:
-    plot_df = resultados[['Café', 'Media Simple', 'Media Ajustada']].copy()
-    # convertir a formato largo para Plotly
-    long_df = plot_df.melt(id_vars='Café',
-                           value_vars=['Media Simple', 'Media Ajustada'],
-                           var_name='Tipo', value_name='Puntaje')
-
-    # preparar customdata por variedad (simple, ajustada, diferencia, pct)
-    simple_map = plot_df.set_index('Café')['Media Simple'].to_dict()
-    ajust_map = plot_df.set_index('Café')['Media Ajustada'].to_dict()
-    custom_list = []
-    for _, row in long_df.iterrows():
-        cafe = row['Café']
-        s = simple_map.get(cafe, np.nan)
-        a = ajust_map.get(cafe, np.nan)
-        diff = a - s if (not np.isnan(a) and not np.isnan(s)) else np.nan
-        pct = (diff / s * 100) if (not np.isnan(diff) and s != 0) else np.nan
-        custom_list.append([s, a, diff, pct])
-    long_df['custom_s'] = [c[0] for c in custom_list]
-    long_df['custom_a'] = [c[1] for c in custom_list]
-    long_df['custom_diff'] = [c[2] for c in custom_list]
-    long_df['custom_pct'] = [c[3] for c in custom_list]
-
-    fig = px.bar(
-        long_df,
-        x='Café',
-        y='Puntaje',
-        color='Tipo',
-        barmode='group',
-        labels={'Puntaje': 'Puntaje', 'Café': 'Variedad'},
-        title='Comparación: Media Simple vs Media Ajustada',
-        height=420,
-        hover_data={'custom_s': False, 'custom_a': False, 'custom_diff': False, 'custom_pct': False},
-    )
-
-    # Mostrar valores en el hover incluyendo ambas medias y diferencia
-    hovertpl = (
-        '%{x}<br>'
-        'Tipo: %{legendgroup}<br>'
-        'Valor (barra): %{y:.2f}<br>'
-        'Media Simple: %{customdata[0]:.2f}<br>'
-        'Media Ajustada: %{customdata[1]:.2f}<br>'
-        'Diferencia: %{customdata[2]:.2f} (%{customdata[3]:.1f}%)<extra></extra>'
-    )
-
-    # attach customdata
-    fig.update_traces(customdata=long_df[['custom_s', 'custom_a', 'custom_diff', 'custom_pct']].values)
-    fig.update_traces(hovertemplate=hovertpl)
-
-    st.subheader('Comparativa de Medias')
-    st.plotly_chart(fig, use_container_width=True)
+    with stage('grafica_medias'):
+        import plotly.express as px
+
+        plot_df = resultados[['Café', 'Media Simple', 'Media Ajustada']].copy()
+        # customdata por variedad (simple, ajustada, diferencia, pct), vectorizado
+        plot_df['custom_s'] = plot_df['Media Simple']
+        plot_df['custom_a'] = plot_df['Media Ajustada']
+        plot_df['custom_diff'] = plot_df['custom_a'] - plot_df['custom_s']
+        plot_df['custom_pct'] = plot_df['custom_diff'] / plot_df['custom_s'].where(plot_df['custom_s'] != 0) * 100
+        custom_cols = ['custom_s', 'custom_a', 'custom_diff', 'custom_pct']
+        # convertir a formato largo para Plotly (las columnas custom se repiten por Tipo)
+        long_df = plot_df.melt(id_vars=['Café'] + custom_cols,
+                               value_vars=['Media Simple', 'Media Ajustada'],
+                               var_name='Tipo', value_name='Puntaje')
+
+        fig = px.bar(
+            long_df,
+            x='Café',
+            y='Puntaje',
+            color='Tipo',
+            barmode='group',
+            labels={'Puntaje': 'Puntaje', 'Café': 'Variedad'},
+            title='Comparación: Media Simple vs Media Ajustada',
+            height=420,
+            custom_data=custom_cols,
+        )
+
+        # Mostrar valores en el hover incluyendo ambas medias y diferencia
+        hovertpl = (
+            '%{x}<br>'
+            'Tipo: %{legendgroup}<br>'
+            'Valor (barra): %{y:.2f}<br>'
+            'Media Simple: %{customdata[0]:.2f}<br>'
+            'Media Ajustada: %{customdata[1]:.2f}<br>'
+            'Diferencia: %{customdata[2]:.2f} (%{customdata[3]:.1f}%)<extra></extra>'
+        )
+
+        # px reparte custom_data por traza (una por Tipo)
+        fig.update_traces(hovertemplate=hovertpl)
+
+        st.subheader('Comparativa de Medias')
+        st.plotly_chart(fig, use_container_width=True)
 except Exception as e:
     st.info(f'No se pudo generar la gráfica interactiva: {e}')
 
@@ -121,29 +93,44 @@ except Exception as e:
 # -------------------------------
 st.subheader('Catadores por Variedad')
 try:
-    # agrupar catadores y mostrar puntajes individuales
-    grouped = df.groupby('Variedad_Codigo')
-    for variedad, group in grouped:
-        with st.expander(f"Variedad {variedad} — {len(group)} puntuaciones"):
-            # mostrar catadores únicos con su perfil (Generoso/Estricto)
-            if 'Perfil_Catador' in group.columns:
-                cat_perf = (
-                    group[['Catador_ID', 'Perfil_Catador']]
-                    .drop_duplicates()
-                    .sort_values('Catador_ID')
-                    .reset_index(drop=True)
-                )
-                st.write('Catadores únicos y perfil:')
-                st.dataframe(cat_perf)
-            else:
-                catadores = sorted(group['Catador_ID'].unique())
-                st.write('Catadores únicos:', catadores)
-
-            # mostrar tabla con Catador_ID, Perfil_Catador y Puntaje_SCA
-            cols = ['Catador_ID', 'Puntaje_SCA']
-            if 'Perfil_Catador' in group.columns:
-                cols.insert(1, 'Perfil_Catador')
-            st.dataframe(group[cols].reset_index(drop=True))
+    # Índice variedad → filas, construido una vez por archivo (queda en caché)
+    with stage('indice_variedades'):
+        indice = analisis.variety_index()
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        busqueda = st.text_input('Buscar variedad (código o nombre):')
+    with col2:
+        por_pagina = st.selectbox('Variedades por página', [10, 25, 50, 100], index=1)
+    encontradas = indice.search(busqueda)
+
+    if len(encontradas) == 0:
+        st.info('Ninguna variedad coincide con la búsqueda.')
+    else:
+        n_paginas = -(-len(encontradas) // por_pagina)
+        pagina = 0
+        if n_paginas > 1:
+            pagina = st.number_input(f'Página (1–{n_paginas})', 1, n_paginas, 1) - 1
+        visibles = encontradas[pagina * por_pagina:(pagina + 1) * por_pagina]
+        st.caption(f'{len(encontradas)} de {len(indice.labels)} variedades')
+        st.dataframe(indice.summary(visibles), hide_index=True)
+
+        # Solo la variedad elegida carga sus tablas
+        elegida = st.selectbox(
+            'Ver catadores de la variedad:',
+            visibles,
+            format_func=lambda i: f"Variedad {indice.labels[i]} — {indice.counts[i]} puntuaciones",
+        )
+        perfiles = 'Perfil_Catador' in df.columns
+        if perfiles:
+            # catadores únicos con su perfil (Generoso/Estricto)
+            st.write('Catadores únicos y perfil:')
+            st.dataframe(indice.taster_profiles(df, elegida, 'Catador_ID'))
+
+        # tabla con Catador_ID, Perfil_Catador y Puntaje_SCA
+        cols = ['Catador_ID', 'Perfil_Catador', 'Puntaje_SCA'] if perfiles else ['Catador_ID', 'Puntaje_SCA']
+        st.dataframe(indice.scores(df, elegida, cols))
 except Exception as e:
     st.info(f'No se pudo listar los catadores por variedad: {e}')
 
+perf_panel(perf)
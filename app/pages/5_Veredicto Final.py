@@ -1,18 +1,29 @@
+from functools import partial
+
 import streamlit as st
 import pandas as pd
 
+from mdex.cache import Analysis
+from mdex.jobs import default_runner, show_job
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.store import session_dataset
+
 
 def main():
     st.title("Veredicto Final")
 
-    resultados = st.session_state.get("resultados")
-    if resultados is None:
-        st.error(
-            (
-                "No se encontraron resultados. Ejecuta primero el ajuste en "
-                "'Ajuste Intrabloque' o en 'Medias Ajustadas' para generar las medias."
-            )
-        )
+    df = session_dataset(st.session_state)
+    if df is None:
+        st.error("No hay datos cargados. Sube un archivo en la página principal.")
+        return
+
+    # Mismo ajuste (en caché) que la página Medias Ajustadas
+    try:
+        analisis = Analysis(df, "Catador_ID", "Variedad_Codigo", "Puntaje_SCA")
+        with stage("medias_ajustadas"):
+            resultados = analisis.adjusted_means()
+    except Exception as e:
+        st.error(f"Error al calcular las medias ajustadas: {e}")
         return
 
     if "Media Ajustada" not in resultados.columns:
@@ -39,25 +50,100 @@ def main():
             st.write(f"Puntaje Ajustado: {ganador['Media Ajustada']:.2f}")
         except Exception:
             st.write("Puntaje Ajustado:", ganador.get("Media Ajustada"))
+        if "IC Inferior" in resultados.columns and pd.notna(ganador.get("IC Inferior")):
+            st.write(
+                f"Intervalo de confianza 95%: "
+                f"[{ganador['IC Inferior']:.2f}, {ganador['IC Superior']:.2f}]"
+            )
 
     except Exception as e:
         st.error(f"Error al determinar el ganador: {e}")
         return
 
-    # Calcular eficiencia aproximada si están las medias simples
-    if "Media Simple" in resultados.columns:
-        try:
-            suma_aj = resultados["Media Ajustada"].sum()
-            suma_sim = resultados["Media Simple"].sum()
-            if suma_sim == 0 or pd.isna(suma_sim):
-                st.info(
-                    "No se puede calcular eficiencia: suma de medias simples inválida."
+    # ¿El ganador es significativamente mejor? Todas las parejas de una vez
+    ajuste = st.selectbox("Ajuste por comparaciones múltiples", ["Tukey", "Bonferroni", "Holm"])
+    try:
+        with stage("comparaciones"):
+            parejas, letras = analisis.comparisons(adjustment=ajuste.lower())
+        if len(series) > 1:
+            segundo = resultados.loc[series.drop(idx).idxmax(), "Café"]
+            fila = parejas[
+                parejas["Café A"].isin([ganador["Café"], segundo])
+                & parejas["Café B"].isin([ganador["Café"], segundo])
+            ].iloc[0]
+            p_aj = fila[f"p {ajuste}"]
+            if fila["Significativa"]:
+                st.success(
+                    f"{ganador['Café']} supera significativamente a {segundo} "
+                    f"(p ajustado por {ajuste} = {p_aj:.4f})."
                 )
             else:
-                eficiencia = (suma_aj / suma_sim) * 100
-                st.write(f"Eficiencia del diseño (aprox.): {eficiencia:.2f}%")
+                st.warning(
+                    f"{ganador['Café']} no es significativamente distinto de {segundo} "
+                    f"(p ajustado por {ajuste} = {p_aj:.4f})."
+                )
+
+        st.write("### Grupos (medias con una letra en común no difieren)")
+        grupos = (
+            resultados[["Café", "Media Ajustada"]]
+            .assign(Grupo=resultados["Café"].map(letras))
+            .sort_values("Media Ajustada", ascending=False)
+            .reset_index(drop=True)
+        )
+        st.dataframe(grupos)
+        with st.expander("Todas las comparaciones por parejas"):
+            st.dataframe(parejas)
+    except Exception as e:
+        st.info(f"No fue posible comparar las medias: {e}")
+
+    # Bootstrap por catadores: probabilidad de ser el mejor y puestos
+    st.write("### Probabilidad de ser el mejor (bootstrap por catadores)")
+    col1, col2 = st.columns(2)
+    n_boot = col1.number_input("Réplicas bootstrap", min_value=100, max_value=100_000,
+                               value=2000, step=500)
+    semilla = col2.number_input("Semilla", min_value=0, value=0, step=1)
+    clave = (analisis.key, "bootstrap", int(n_boot), int(semilla))
+    if st.button("Calcular probabilidades"):
+        # En segundo plano: la página sigue respondiendo y se puede cancelar
+        st.session_state.trabajo_bootstrap = default_runner().submit(
+            clave, partial(analisis.bootstrap, int(n_boot), int(semilla), time_limit=60.0),
+            name="Bootstrap", unit="réplicas",
+        )
+    trabajo = st.session_state.get("trabajo_bootstrap")
+    boot = None
+    if trabajo is not None and trabajo.key == clave:
+        with stage("bootstrap"):
+            boot = show_job(trabajo)
+    if boot is not None:
+        try:
+            if boot.n_boot < n_boot:
+                st.warning(f"Tiempo máximo alcanzado: {boot.n_boot} réplicas válidas.")
+            tabla = boot.rank_probs.iloc[:, : min(boot.rank_probs.shape[1], 10)].copy()
+            tabla.insert(0, "Puesto medio", boot.mean_rank)
+            st.dataframe(tabla.style.format("{:.3f}"))
+            st.caption(
+                f"{boot.n_boot} réplicas en {boot.elapsed:.2f} s (semilla {boot.seed}); "
+                f"{boot.n_failed} réplicas descartadas por dejar alguna variedad sin catadores."
+            )
         except Exception as e:
-            st.info(f"No fue posible calcular eficiencia: {e}")
+            st.info(f"No fue posible calcular el bootstrap: {e}")
+
+    # Factor de eficiencia del diseño frente a un diseño de bloques completos
+    try:
+        with stage("diagnostico_diseno"):
+            diag = analisis.diagnostics()
+        if pd.isna(diag.efficiency):
+            st.info(f"Eficiencia del diseño {diag.efficiency_method}.")
+        else:
+            st.write(f"Eficiencia del diseño: {diag.efficiency * 100:.2f}%")
+            st.caption(
+                f"Factor de eficiencia A calculado con {diag.efficiency_method}: fracción de "
+                "la precisión de un diseño de bloques completos con las mismas repeticiones."
+            )
+    except Exception as e:
+        st.info(f"No fue posible calcular eficiencia: {e}")
 
 
+perf = session_profiler(st.session_state, "Veredicto Final")
 main()
+perf_panel(perf)
@@ -0,0 +1,111 @@
+import streamlit as st
+
+from mdex.incremental import LiveSession
+from mdex.profiling import perf_panel, session_profiler, stage
+from mdex.dataset import tasting_data
+from mdex.store import session_dataset
+
+perf = session_profiler(st.session_state, "Sesión en Vivo")
+
+st.title("Sesión de Cata en Vivo")
+
+st.write(
+    "Registra los puntajes de cada catador a medida que termina su bloque. "
+    "Las medias ajustadas y la tabla ANOVA se actualizan sin volver a cargar el CSV."
+)
+
+# ============================================================
+#      ESTADO DE LA SESIÓN
+# ============================================================
+
+if "sesion" not in st.session_state:
+    st.session_state.sesion = LiveSession()
+
+sesion = st.session_state.sesion
+df = session_dataset(st.session_state)
+datos = tasting_data(df) if df is not None else None
+
+col1, col2 = st.columns(2)
+if df is not None and col1.button("Partir de los datos cargados"):
+    with stage("sesion_desde_datos"):
+        st.session_state.sesion = sesion = LiveSession.from_data(datos)
+if col2.button("Reiniciar sesión"):
+    st.session_state.sesion = sesion = LiveSession()
+
+# ============================================================
+#      REGISTRO DE UN BLOQUE
+# ============================================================
+
+st.subheader("Registrar catador")
+
+variedades = list(sesion.treat_labels)
+if not variedades and datos is not None:
+    variedades = sorted(datos.varieties)
+
+# Fuera del formulario: las variedades nuevas deben tener su campo de puntaje
+# antes de enviar el bloque
+nuevas = st.text_input("Variedades nuevas (separadas por coma)", "")
+# Sin repetir: cada variedad es un solo campo (y una sola clave de widget);
+# las existentes conservan su etiqueta original
+existentes = {str(x) for x in variedades}
+opciones = variedades + [
+    x for x in dict.fromkeys(x.strip() for x in nuevas.split(","))
+    if x and x not in existentes
+]
+
+with st.form("bloque", clear_on_submit=True):
+    catador = st.text_input("ID del catador")
+    puntajes = {}
+    for variedad in opciones:
+        valor = st.number_input(
+            f"Puntaje de {variedad}", min_value=0.0, max_value=100.0, value=None, step=0.25,
+            key=f"puntaje_{variedad}",
+        )
+        if valor is not None:
+            puntajes[variedad] = valor
+    enviado = st.form_submit_button("Agregar bloque")
+
+if enviado:
+    if not catador:
+        st.error("❌ Indica el ID del catador.")
+    elif not puntajes:
+        st.error("❌ Ingresa al menos un puntaje.")
+    else:
+        try:
+            # Mismo tipo que los catadores ya registrados: "2" es el catador 2
+            etiqueta = sesion.block_label(catador)
+        except ValueError as e:
+            st.error(str(e))
+        else:
+            with stage("agregar_bloque"):
+                sesion.add_block(etiqueta, puntajes)
+            st.success(f"Catador {catador}: {len(puntajes)} puntajes agregados.")
+
+# ============================================================
+#      RESULTADOS ACTUALES
+# ============================================================
+
+st.subheader("Resultados actuales")
+
+c1, c2, c3 = st.columns(3)
+c1.metric("Catadores", sesion.b)
+c2.metric("Variedades", sesion.v)
+c3.metric("Puntajes", sesion.n_obs)
+
+if sesion.n_obs > sesion.b + sesion.v - 1:
+    try:
+        # Un solo ajuste por ejecución para la tabla ANOVA y las medias
+        with stage("ajuste"):
+            ajuste = sesion.fit()
+        st.write("### Tabla ANOVA")
+        st.write(ajuste.anova)
+        with stage("medias_ajustadas"):
+            medias = sesion.adjusted_means(fit=ajuste)
+        st.write("### Medias ajustadas")
+        st.dataframe(medias)
+    except Exception as e:
+        st.error(f"Error al ajustar el modelo: {e}")
+else:
+    st.info("Aún no hay suficientes puntajes para estimar el error.")
+
+perf_panel(perf)
@@ -0,0 +1,84 @@
+import os
+import sys
+from collections import Counter
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_PATH = os.path.join(os.path.dirname(APP_DIR), "datos_cata_cafe_bibd.csv")
+
+# Las páginas importan ``mdex`` con app/ como directorio de trabajo
+sys.path.insert(0, APP_DIR)
+
+COLS = ("Catador_ID", "Variedad_Codigo", "Puntaje_SCA")
+FORMULA = "Puntaje_SCA ~ C(Variedad_Codigo) + C(Catador_ID)"
+
+
+def as_float64(df):
+    # Los ajustes leen float32; statsmodels debe ver exactamente los mismos puntajes
+    return df.assign(Puntaje_SCA=df["Puntaje_SCA"].astype(np.float32).astype(np.float64))
+
+
+def ols_fit(df):
+    """(datos, ajuste de ``smf.ols``) con columnas simples: las categorías solo
+    cambian el orden de los niveles."""
+    import statsmodels.formula.api as smf
+
+    data = pd.DataFrame({
+        "Catador_ID": df["Catador_ID"].astype(str).to_numpy(),
+        "Variedad_Codigo": df["Variedad_Codigo"].astype(str).to_numpy(),
+        "Puntaje_SCA": df["Puntaje_SCA"].to_numpy(dtype=np.float64),
+    })
+    return data, smf.ols(FORMULA, data=data).fit()
+
+
+def assert_bibd(blocks, v, k, lam):
+    """Comprobación directa con contadores, independiente de ``mdex.diagnostics``."""
+    from mdex.bibd import validate_parameters
+
+    b, r = validate_parameters(v, k, lam)
+    assert len(blocks) == b
+    assert all(len(set(blk)) == k == len(blk) for blk in blocks)
+    assert all(0 <= t < v for blk in blocks for t in blk)
+    reps = Counter(t for blk in blocks for t in blk)
+    assert set(reps.values()) == {r} and len(reps) == v
+    pairs = Counter(pair for blk in blocks for pair in combinations(sorted(blk), 2))
+    assert len(pairs) == v * (v - 1) // 2 and set(pairs.values()) == {lam}
+
+
+@pytest.fixture(autouse=True)
+def _catalogo_temporal(tmp_path, monkeypatch):
+    # Ningún test lee ni escribe el catálogo de diseños del usuario
+    from mdex.catalog import default_catalog
+
+    monkeypatch.setenv("MDEX_CATALOG", str(tmp_path / "designs.sqlite3"))
+    default_catalog.cache_clear()
+    yield
+    default_catalog.cache_clear()
+
+
+@pytest.fixture(scope="session")
+def cata():
+    """El archivo de cata del repositorio: BIBD(5, 3, 3) con 10 catadores."""
+    from mdex.ingest import read_tasting_file
+
+    return read_tasting_file(DATA_PATH)
+
+
+@pytest.fixture(scope="session")
+def panel_bibd():
+    """BIBD(7, 3, 1) repetido 4 veces, con sesgo de catador."""
+    from mdex.synthetic import synthetic_panel
+
+    return synthetic_panel(7, 3, 1, replicas=4, bias_scale=2.0, seed=1)
+
+
+@pytest.fixture(scope="session")
+def panel_desbalanceado():
+    """BIBD(9, 4, 3) con un 20 % de celdas eliminadas: ni balanceado ni completo."""
+    from mdex.synthetic import synthetic_panel
+
+    return synthetic_panel(9, 4, 3, replicas=2, missing=0.2, seed=2)
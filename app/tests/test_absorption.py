@@ -0,0 +1,79 @@
+"""Solución por absorción de bloques contra statsmodels."""
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+
+from conftest import COLS, as_float64, ols_fit
+from mdex.absorption import fit_absorbed
+from mdex.dataset import TastingData
+from mdex.incremental import LiveSession
+from mdex.intrablock import fit_intrablock
+from mdex.lsmeans import adjusted_means
+from mdex.matrix import BlockMatrices
+
+
+@pytest.mark.parametrize("panel", ["cata", "panel_bibd", "panel_desbalanceado"])
+def test_absorcion_igual_a_anova_lm_tipo_2(panel, request):
+    df = as_float64(request.getfixturevalue(panel))
+    _, modelo = ols_fit(df)
+    esperado = sm.stats.anova_lm(modelo, typ=2)
+    fit = fit_absorbed(df, *COLS)
+
+    assert fit.df_error == modelo.df_resid
+    np.testing.assert_allclose(fit.mse, modelo.mse_resid, rtol=1e-6)
+    np.testing.assert_allclose(fit.anova["df"].to_numpy(), esperado["df"].to_numpy())
+    np.testing.assert_allclose(fit.anova["sum_sq"].to_numpy(), esperado["sum_sq"].to_numpy(),
+                               rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(fit.anova["F"].to_numpy()[:2], esperado["F"].to_numpy()[:2],
+                               rtol=1e-6)
+
+    # Contrastes contra la primera variedad, como los coeficientes de ols
+    coef = fit.coefficients
+    np.testing.assert_allclose(coef["Coef."].to_numpy(), modelo.params[coef.index].to_numpy(),
+                               rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(coef["Std.Err."].to_numpy(), modelo.bse[coef.index].to_numpy(),
+                               rtol=1e-6)
+
+
+def test_absorcion_gradiente_conjugado_igual_a_denso(panel_desbalanceado):
+    denso = fit_absorbed(panel_desbalanceado, *COLS, dense=True)
+    iterativo = fit_absorbed(panel_desbalanceado, *COLS, dense=False)
+    np.testing.assert_allclose(iterativo.tau, denso.tau, atol=1e-7)
+    np.testing.assert_allclose(iterativo.anova["sum_sq"], denso.anova["sum_sq"], rtol=1e-7)
+
+
+def test_absorcion_igual_al_intrabloque_en_un_bibd(panel_bibd):
+    intra = fit_intrablock(panel_bibd, *COLS)
+    absorbido = fit_absorbed(panel_bibd, *COLS)
+    np.testing.assert_allclose(intra.effects["Efecto Ajustado"],
+                               absorbido.effects["Efecto Ajustado"], atol=1e-8)
+    np.testing.assert_allclose(intra.se_diff, absorbido.coefficients["Std.Err."].iloc[0],
+                               rtol=1e-6)
+
+
+def test_puntajes_vacios_no_son_observaciones(cata, panel_bibd):
+    # Un puntaje vacío en el archivo: el ajuste es el de los datos sin esa fila
+    df = as_float64(cata)
+    df.loc[3, "Puntaje_SCA"] = np.nan
+    _, modelo = ols_fit(df.dropna(subset=["Puntaje_SCA"]))
+    esperado = sm.stats.anova_lm(modelo, typ=2)
+    fit = fit_absorbed(df, *COLS)
+    assert fit.df_error == modelo.df_resid
+    np.testing.assert_allclose(fit.anova["F"].to_numpy()[:2], esperado["F"].to_numpy()[:2],
+                               rtol=1e-6)
+    assert np.isfinite(adjusted_means(df, *COLS)["Media Ajustada"]).all()
+    np.testing.assert_allclose(LiveSession.from_data(TastingData.from_frame(df)).anova()["F"],
+                               fit.anova["F"], rtol=1e-9)
+
+    # Filas vacías en celdas sin puntaje y un catador sin ninguno: el BIBD sigue siéndolo
+    vacias = pd.DataFrame({"Catador_ID": [panel_bibd["Catador_ID"].iloc[0], "sin puntajes"],
+                           "Variedad_Codigo": panel_bibd["Variedad_Codigo"].iloc[[5, 0]],
+                           "Puntaje_SCA": np.nan})
+    con_vacias = pd.concat([panel_bibd, vacias], ignore_index=True)
+    matrices = BlockMatrices(con_vacias, *COLS)
+    assert matrices.dropped == 2 and matrices.b == panel_bibd["Catador_ID"].nunique()
+    intra = fit_intrablock(con_vacias, *COLS)
+    assert intra is not None
+    np.testing.assert_allclose(intra.anova["F"], fit_intrablock(panel_bibd, *COLS).anova["F"])
@@ -0,0 +1,89 @@
+"""Suite de ``mdex.benchmark`` como pruebas: presupuestos de tiempo por etapa.
+
+Los presupuestos son holgados (un orden de magnitud sobre lo medido en una
+máquina de un núcleo) para que solo fallen ante regresiones reales, como
+volver a un bucle por filas. Para comparar corridas con tolerancia fina
+sigue estando ``python -m mdex.benchmark etapas --comparar base.json``.
+"""
+
+import importlib.util
+import os
+
+import pytest
+
+from mdex import benchmark
+
+# Escala a la que se cronometran las etapas (puntajes)
+SCALE = 100_000
+
+# Segundos (mediana) por etapa a ``SCALE`` puntajes
+STAGE_BUDGET_S = {
+    "lectura_csv": 2.0,
+    "hash_datos": 0.5,
+    "codificacion": 0.5,
+    "matrices": 0.5,
+    "grilla_heatmap": 0.5,
+    "ajuste_intrabloque": 0.5,
+    "ajuste_absorcion": 0.5,
+    "medias_ajustadas": 0.5,
+    "comparaciones": 10.0,
+}
+DESIGN_BUDGET_S = 2.0
+# Importar los módulos de mdex que carga cada página en frío
+IMPORT_BUDGET_S = 3.0
+
+# Se importan solo donde se usan (dentro de funciones o bloques)
+HEAVY_MODULES = ("matplotlib", "seaborn", "plotly", "statsmodels")
+
+
+@pytest.fixture(scope="module")
+def stage_results():
+    results = benchmark.run_stages(scales=(SCALE,), repeat=3, min_time=0.0, log=lambda *_: None)
+    return {r["etapa"]: r for r in results}
+
+
+@pytest.mark.parametrize("stage", sorted(STAGE_BUDGET_S))
+def test_etapa_dentro_del_presupuesto(stage_results, stage):
+    result = stage_results[stage]
+    assert result["puntajes"] >= SCALE
+    assert result["median_s"] < STAGE_BUDGET_S[stage], result
+
+
+def test_busqueda_de_disenos_dentro_del_presupuesto(stage_results):
+    designs = {name: r for name, r in stage_results.items() if name.startswith("find_bibd")}
+    assert len(designs) == len(benchmark.design_functions())
+    for name, result in designs.items():
+        assert result["median_s"] < DESIGN_BUDGET_S, name
+
+
+@pytest.mark.parametrize("page", benchmark.page_scripts(), ids=os.path.basename)
+def test_paginas_no_importan_modulos_pesados_al_arrancar(page):
+    imports = benchmark.top_level_imports(page)
+    heavy = [m for m in imports if m.split(".")[0] in HEAVY_MODULES]
+    assert not heavy, f"{os.path.basename(page)} importa {heavy} al nivel superior"
+
+
+def test_importacion_en_frio_de_mdex_dentro_del_presupuesto():
+    modules = sorted({m for page in benchmark.page_scripts()
+                      for m in benchmark.top_level_imports(page) if m.startswith("mdex")})
+    total, _ = benchmark.import_time(modules)
+    assert total < IMPORT_BUDGET_S
+
+
+@pytest.mark.skipif(importlib.util.find_spec("streamlit") is None,
+                    reason="streamlit no está instalado")
+def test_arranque_de_las_paginas_sin_errores():
+    results = benchmark.run_startup(n_scores=1_000, log=lambda *_: None)
+    for entry in results:
+        assert not entry.get("errores"), entry
+
+
+def test_compare_marca_solo_regresiones_reales():
+    def report(**times):
+        return {"resultados": [{"tipo": "etapa", "etapa": name, "puntajes": 10, "median_s": t}
+                               for name, t in times.items()]}
+
+    base = report(a=0.100, b=0.100, c=0.001)
+    current = report(a=0.110, b=0.200, c=0.004)  # c: demasiado corto para contar
+    regressions = benchmark.compare(base, current, tolerance=0.25)
+    assert [r["etapa"] for r in regressions] == ["b"]
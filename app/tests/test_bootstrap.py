@@ -0,0 +1,30 @@
+"""Bootstrap por bloques de la probabilidad de ser el mejor."""
+
+import numpy as np
+import pandas as pd
+
+from conftest import COLS
+from mdex.bootstrap import bootstrap_best
+
+
+def test_bootstrap_no_depende_del_numero_de_procesos(cata):
+    serie = bootstrap_best(cata, *COLS, n_boot=600, seed=3, workers=1)
+    paralelo = bootstrap_best(cata, *COLS, n_boot=600, seed=3, workers=2)
+    pd.testing.assert_frame_equal(serie.rank_probs, paralelo.rank_probs)
+    np.testing.assert_allclose(serie.rank_probs.sum(axis=1), 1.0)
+    np.testing.assert_allclose(serie.rank_probs.sum(axis=0), 1.0)
+
+
+def test_bootstrap_descarta_replicas_desconectadas():
+    # {A,B} y {C,D} repetidos más dos bloques puente: muchas réplicas tienen
+    # todas las variedades pero quedan desconectadas
+    bloques = [("A", "B"), ("C", "D"), ("A", "B"), ("C", "D"), ("B", "C"), ("A", "D")]
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        [(j, t, 84 + rng.normal()) for j, blk in enumerate(bloques) for t in blk],
+        columns=list(COLS),
+    )
+    res = bootstrap_best(df, *COLS, n_boot=1000, seed=1)
+    assert res.n_failed > 0
+    assert res.n_boot + res.n_failed == 1000
+    assert np.isfinite(res.rank_probs.to_numpy()).all()
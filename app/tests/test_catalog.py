@@ -0,0 +1,40 @@
+"""Catálogo persistente de diseños BIBD."""
+
+from conftest import assert_bibd
+from mdex.bibd import find_bibd
+from mdex.catalog import DesignCatalog
+
+
+def test_catalogo_semilla_valida(tmp_path):
+    catalog = DesignCatalog(str(tmp_path / "designs.sqlite3"))
+    for params in [(6, 3, 2), (10, 4, 2), (21, 4, 3), (21, 6, 3), (28, 3, 2), (49, 4, 1)]:
+        found = catalog.get(*params)
+        assert found is not None
+        assert_bibd(found[1], *params)
+
+
+def test_catalogo_persiste_y_descarta_filas_invalidas(tmp_path):
+    import json
+    import sqlite3
+
+    path = str(tmp_path / "designs.sqlite3")
+    bibd = find_bibd(13, 4, 1, use_catalog=False)
+    DesignCatalog(path).put(bibd)
+    # Otro proceso (otra instancia) lo lee del disco
+    method, blocks = DesignCatalog(path).get(13, 4, 1)
+    assert method == bibd["method"]
+    assert_bibd(blocks, 13, 4, 1)
+
+    # Una fila corrupta se descarta al leerla
+    with sqlite3.connect(path) as con:
+        con.execute("UPDATE designs SET blocks = ? WHERE v = 13 AND k = 4 AND lam = 1",
+                    (json.dumps([[0, 1, 2, 3]] * 13),))
+    assert DesignCatalog(path).get(13, 4, 1) is None
+
+
+def test_find_bibd_usa_el_catalogo():
+    primero = find_bibd(10, 4, 2)
+    assert_bibd(primero["blocks"], 10, 4, 2)
+    segundo = find_bibd(10, 4, 2)
+    assert segundo["stats"].get("catalog")
+    assert sorted(segundo["blocks"]) == sorted(primero["blocks"])
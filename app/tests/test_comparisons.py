@@ -0,0 +1,57 @@
+"""Comparaciones múltiples: p-valores ajustados y letras de agrupamiento."""
+
+from itertools import combinations
+
+import numpy as np
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from conftest import COLS
+from mdex.cache import Analysis, AnalysisCache
+from mdex.comparisons import compact_letters, compare_means, holm, tukey_pvalues
+
+
+def test_holm_igual_a_statsmodels():
+    p = np.random.default_rng(0).uniform(0, 0.2, 45)
+    np.testing.assert_allclose(holm(p), multipletests(p, method="holm")[1])
+
+
+@pytest.mark.parametrize("n", [10, 300])
+def test_tukey_igual_al_rango_studentizado(n):
+    # Con más de TUKEY_GRID parejas se interpola: tolerancia relativa del 1 %
+    q = np.random.default_rng(1).uniform(0.1, 6.0, n)
+    np.testing.assert_allclose(tukey_pvalues(q, 8, 30), stats.studentized_range.sf(q, 8, 30),
+                               rtol=1e-2, atol=1e-6)
+
+
+def _sin_letra_comun(letras, a, b):
+    return not set(letras[a]) & set(letras[b])
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_letras_coinciden_con_las_parejas_distintas(seed):
+    rng = np.random.default_rng(seed)
+    v = 12
+    means = rng.normal(0, 3, v)
+    labels = [f"V{i}" for i in range(v)]
+    different = [(i, j) for i, j in combinations(range(v), 2) if abs(means[i] - means[j]) > 2.5]
+    letras = compact_letters(means, labels, different)
+    distintas = {frozenset(p) for p in different}
+    for i, j in combinations(range(v), 2):
+        assert _sin_letra_comun(letras, labels[i], labels[j]) == (frozenset((i, j)) in distintas)
+
+
+@pytest.mark.parametrize("adjustment", ["tukey", "bonferroni", "holm"])
+def test_compare_means_en_el_archivo(cata, adjustment):
+    analisis = Analysis(cata, *COLS, cache=AnalysisCache())
+    parejas, letras = analisis.comparisons(adjustment=adjustment)
+    v = analisis.matrices.v
+    assert len(parejas) == v * (v - 1) // 2
+    for fila in parejas.itertuples():
+        assert fila.Significativa == _sin_letra_comun(letras, fila[1], fila[2])
+
+
+def test_compare_means_rechaza_ajuste_desconocido():
+    with pytest.raises(ValueError):
+        compare_means([1.0, 2.0], ["a", "b"], 10, se_diff=0.5, adjustment="sidak")
@@ -0,0 +1,98 @@
+"""Construcciones algebraicas directas de BIBD."""
+
+from itertools import combinations
+
+import pytest
+
+from conftest import assert_bibd
+from mdex import constructions
+from mdex.bibd import is_bibd, validate_parameters
+
+
+@pytest.mark.parametrize("q", [2, 3, 4, 5, 7, 8, 9, 16, 25, 27])
+def test_galois_field_es_un_campo(q):
+    field = constructions.galois_field(q)
+    elements = range(q)
+    for a in elements:
+        assert field.add(a, 0) == a and field.mul(a, 1) == a
+        assert sorted(field.add(a, x) for x in elements) == list(elements)
+        if a:
+            assert field.mul(a, field.inv(a)) == 1
+    # Distributividad en una muestra de ternas
+    for a, b, c in list(combinations(elements, 3))[:200]:
+        assert field.mul(a, field.add(b, c)) == field.add(field.mul(a, b), field.mul(a, c))
+
+
+def test_prime_power():
+    assert constructions.prime_power(27) == (3, 3)
+    assert constructions.prime_power(7) == (7, 1)
+    assert constructions.prime_power(12) is None
+
+
+@pytest.mark.parametrize("builder, params", [
+    (constructions.trivial_design, (6, 4, 6)),
+    (constructions.projective_geometry, (7, 3, 1)),
+    (constructions.projective_geometry, (13, 4, 1)),
+    (constructions.projective_geometry, (21, 5, 1)),
+    (constructions.projective_geometry, (15, 7, 3)),
+    (constructions.affine_geometry, (9, 3, 1)),
+    (constructions.affine_geometry, (16, 4, 1)),
+    (constructions.affine_geometry, (8, 4, 3)),
+    (constructions.paley_design, (11, 5, 2)),
+    (constructions.paley_design, (19, 9, 4)),
+    (constructions.steiner_triple_system, (13, 3, 1)),
+    (constructions.steiner_triple_system, (15, 3, 1)),
+    (constructions.geometry_lines, (27, 3, 1)),
+    (constructions.geometry_lines, (40, 4, 1)),
+    (constructions.complement_design, (7, 4, 2)),
+    (constructions.cyclic_difference_family, (7, 3, 2)),
+    (constructions.multiple_design, (8, 4, 6)),
+])
+def test_construcciones_dan_bibd_validos(builder, params):
+    blocks = builder(*params)
+    assert blocks is not None, f"{builder.__name__} no construyó {params}"
+    assert_bibd(blocks, *params)
+
+
+def test_construct_bibd_cubre_el_rango_comun():
+    # Todos los (v, k, λ) admisibles pequeños que alguna construcción resuelve son válidos
+    for v in range(3, 16):
+        for k in range(2, v):
+            for lam in range(1, 4):
+                try:
+                    validate_parameters(v, k, lam)
+                except ValueError:
+                    continue
+                blocks = constructions.construct_bibd(v, k, lam)
+                if blocks is not None:
+                    assert_bibd(blocks, v, k, lam)
+
+
+def test_is_bibd_rechaza_disenos_invalidos():
+    blocks = [tuple(b) for b in constructions.construct_bibd(7, 3, 1)]
+    assert is_bibd(blocks, 7, 3, 1)
+    roto = blocks[:-1] + [(0, 1, 2)]
+    assert not is_bibd(roto, 7, 3, 1)
+    assert not is_bibd(blocks[:-1], 7, 3, 1)
+
+
+def test_construcciones_directas_antes_de_la_busqueda(monkeypatch):
+    # Un múltiplo o complemento de un diseño directo no lanza la búsqueda acotada
+    def sin_busqueda(*args, **kwargs):
+        raise AssertionError("se buscó una familia de diferencias")
+
+    monkeypatch.setattr(constructions, "cyclic_difference_family", sin_busqueda)
+    constructions._construct.cache_clear()
+    try:
+        assert constructions.construction_method(25, 3, 3) == "múltiplo"
+        assert constructions.construction_method(13, 4, 6) == "múltiplo"
+        assert constructions.construction_method(7, 4, 2) == "complemento"
+    finally:
+        constructions._construct.cache_clear()
+
+
+@pytest.mark.parametrize("params", [(37, 4, 1), (37, 4, 2), (41, 5, 1)])
+def test_busqueda_acotada_cuando_no_hay_construccion_directa(params):
+    blocks = constructions.construct_bibd(*params)
+    assert blocks is not None
+    assert_bibd(blocks, *params)
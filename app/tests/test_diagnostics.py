@@ -0,0 +1,39 @@
+"""Diagnóstico de balance del diseño con la concurrencia dispersa."""
+
+import numpy as np
+
+from conftest import COLS
+from mdex.diagnostics import diagnose
+from mdex.matrix import BlockMatrices
+
+
+def _eficiencia_densa(matrices):
+    n = matrices.incidence().toarray().astype(float)
+    r, k = n.sum(axis=1), n.sum(axis=0)
+    c = np.diag(r) - n @ np.diag(1 / k) @ n.T
+    return (matrices.v - 1) / (r.mean() * np.linalg.pinv(c).trace())
+
+
+def test_bibd_del_archivo(cata):
+    diag = diagnose(BlockMatrices(cata, *COLS))
+    assert diag.is_bibd and diag.parameters == (3, 6, 3)
+    assert diag.connected and not diag.issues()
+    assert diag.efficiency == 3 * 5 / (6 * 3)
+    assert np.isclose(diag.efficiency, _eficiencia_densa(BlockMatrices(cata, *COLS)))
+
+
+def test_desbalanceado_con_autovalores(panel_desbalanceado):
+    matrices = BlockMatrices(panel_desbalanceado, *COLS)
+    diag = diagnose(matrices)
+    assert not diag.is_bibd and diag.parameters is None and diag.issues()
+    assert diag.efficiency_method == "autovalores de C"
+    assert np.isclose(diag.efficiency, _eficiencia_densa(matrices))
+
+
+def test_puntajes_vacios_no_cuentan_como_celdas(cata):
+    df = cata.copy()
+    df.loc[3, "Puntaje_SCA"] = np.nan
+    diag = diagnose(BlockMatrices(df, *COLS))
+    assert diag.n_obs == len(cata) - 1
+    assert not diag.is_bibd and diag.r_min == 5
+    assert diag.efficiency < 3 * 5 / (6 * 3)
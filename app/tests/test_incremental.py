@@ -0,0 +1,36 @@
+"""Sesión en vivo con estadísticos suficientes."""
+
+import numpy as np
+import pytest
+
+from conftest import COLS
+from mdex.absorption import fit_absorbed
+from mdex.dataset import TastingData
+from mdex.incremental import LiveSession
+
+
+def test_sesion_igual_al_ajuste_completo(panel_desbalanceado):
+    sesion = LiveSession()
+    for catador, bloque in panel_desbalanceado.groupby("Catador_ID", observed=True, sort=False):
+        sesion.add_block(catador, dict(zip(bloque["Variedad_Codigo"], bloque["Puntaje_SCA"])))
+    completo = fit_absorbed(panel_desbalanceado, *COLS)
+    np.testing.assert_allclose(sesion.anova()["sum_sq"], completo.anova["sum_sq"], rtol=1e-6)
+
+
+def test_un_solo_ajuste_hasta_el_siguiente_bloque(cata):
+    sesion = LiveSession.from_data(TastingData.from_frame(cata))
+    ajuste = sesion.fit()
+    assert sesion.fit() is ajuste
+    tabla = sesion.adjusted_means(fit=ajuste)
+    np.testing.assert_allclose(tabla["Media Ajustada"], sesion.adjusted_means()["Media Ajustada"])
+
+    sesion.add_block(sesion.block_label("11"), {"A": 85.0, "B": 84.0, "C": 80.0})
+    assert sesion.fit() is not ajuste and sesion.b == 11
+
+
+def test_etiquetas_con_el_tipo_de_la_sesion(cata):
+    sesion = LiveSession.from_data(TastingData.from_frame(cata))
+    assert sesion.block_label(" 2 ") == 2
+    with pytest.raises(ValueError, match="int"):
+        sesion.block_label("T17")
+    assert LiveSession().block_label("T17") == "T17"
@@ -0,0 +1,43 @@
+"""Lectura tipada y validación de archivos de cata."""
+
+import io
+
+import numpy as np
+import pytest
+
+from conftest import DATA_PATH
+from mdex.ingest import BLANK_ATTR, read_csv, read_tasting_file
+
+
+def _texto(vacias=()):
+    filas = open(DATA_PATH, encoding="utf-8").read().splitlines()
+    for i in vacias:
+        filas[i] = filas[i].rsplit(",", 1)[0] + ","
+    return "\n".join(filas)
+
+
+@pytest.mark.parametrize("chunksize", [None, 4])
+def test_filas_sin_puntaje_se_descartan_y_se_informan(chunksize):
+    completo = read_csv(io.StringIO(_texto()), chunksize=chunksize)
+    df = read_csv(io.StringIO(_texto([3, 7])), chunksize=chunksize)
+    assert completo.attrs[BLANK_ATTR] == 0
+    assert df.attrs[BLANK_ATTR] == 2 and len(df) == len(completo) - 2
+    assert not df["Puntaje_SCA"].isna().any()
+
+
+@pytest.mark.parametrize("chunksize", [None, 4])
+def test_ids_de_catador_con_el_mismo_tipo_por_cualquier_ruta(chunksize):
+    df = read_csv(io.StringIO(_texto()), chunksize=chunksize)
+    categorias = df["Catador_ID"].cat.categories
+    assert categorias.dtype == np.int64 and categorias.is_monotonic_increasing
+
+
+def test_puntajes_fuera_de_rango_o_archivo_sin_puntajes(tmp_path):
+    fuera = tmp_path / "fuera.csv"
+    fuera.write_text(_texto().replace(",88.9\n", ",188.9\n", 1), encoding="utf-8")
+    with pytest.raises(ValueError, match="fuera del rango"):
+        read_tasting_file(str(fuera))
+    vacio = tmp_path / "vacio.csv"
+    vacio.write_text(_texto(range(1, 31)), encoding="utf-8")
+    with pytest.raises(ValueError, match="ningún puntaje"):
+        read_tasting_file(str(vacio))
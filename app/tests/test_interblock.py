@@ -0,0 +1,52 @@
+"""Estimación combinada intra/interbloque contra MixedLM."""
+
+import numpy as np
+import pandas as pd
+import statsmodels.formula.api as smf
+
+from conftest import COLS, as_float64
+from mdex.interblock import fit_combined
+from mdex.intrablock import fit_intrablock
+
+
+def test_combinado_none_si_no_es_bibd(panel_desbalanceado):
+    assert fit_combined(panel_desbalanceado, *COLS) is None
+
+
+def test_combinado_reml_igual_a_mixedlm(panel_bibd):
+    df = as_float64(panel_bibd)
+    data = pd.DataFrame({
+        "Catador_ID": df["Catador_ID"].astype(str).to_numpy(),
+        "Variedad_Codigo": df["Variedad_Codigo"].astype(str).to_numpy(),
+        "Puntaje_SCA": df["Puntaje_SCA"].to_numpy(dtype=np.float64),
+    })
+    mixto = smf.mixedlm("Puntaje_SCA ~ C(Variedad_Codigo)", data, groups=data["Catador_ID"])
+    mixto = mixto.fit(reml=True, method=["lbfgs"])
+
+    combinado = fit_combined(df, *COLS, method="reml")
+    assert combinado.sigma2_block > 0
+    np.testing.assert_allclose(combinado.sigma2, mixto.scale, rtol=1e-4)
+    np.testing.assert_allclose(combinado.sigma2_block, float(mixto.cov_re.iloc[0, 0]), rtol=1e-3)
+
+    # Diferencias contra la primera variedad y sus errores estándar
+    efectos = combinado.effects["Efecto Combinado"]
+    nombres = [f"C(Variedad_Codigo)[T.{c}]" for c in efectos.index[1:]]
+    np.testing.assert_allclose((efectos.iloc[1:] - efectos.iloc[0]).to_numpy(),
+                               mixto.fe_params[nombres].to_numpy(), rtol=1e-4, atol=1e-5)
+
+    # Error estándar GLS de las diferencias con las varianzas estimadas por MixedLM
+    # (bse_fe incluye además la incertidumbre de las varianzas)
+    x = mixto.model.exog
+    z = pd.get_dummies(data["Catador_ID"]).to_numpy(dtype=np.float64)
+    v = mixto.scale * np.eye(len(data)) + float(mixto.cov_re.iloc[0, 0]) * z @ z.T
+    cov = np.linalg.inv(x.T @ np.linalg.solve(v, x))
+    np.testing.assert_allclose(combinado.se_diff, np.sqrt(np.diag(cov)[1:]), rtol=1e-3)
+
+
+def test_combinado_yates_no_pierde_precision_frente_al_intrabloque(panel_bibd):
+    combinado = fit_combined(panel_bibd, *COLS, method="yates")
+    intra = fit_intrablock(panel_bibd, *COLS)
+    assert 0 < combinado.theta <= 1
+    np.testing.assert_allclose(combinado.sigma2, intra.mse)
+    assert combinado.se_diff <= intra.se_diff
+    assert combinado.efficiency_gain >= 1
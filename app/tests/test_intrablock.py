@@ -0,0 +1,31 @@
+"""Análisis intrabloque de un BIBD en forma cerrada contra statsmodels."""
+
+import numpy as np
+import pytest
+import statsmodels.api as sm
+
+from conftest import COLS, as_float64, ols_fit
+from mdex.intrablock import fit_intrablock
+
+
+@pytest.mark.parametrize("panel", ["cata", "panel_bibd"])
+def test_intrabloque_igual_a_ols(panel, request):
+    df = as_float64(request.getfixturevalue(panel))
+    _, modelo = ols_fit(df)
+    esperado = sm.stats.anova_lm(modelo, typ=2)
+    intra = fit_intrablock(df, *COLS)
+    assert intra is not None
+    np.testing.assert_allclose(intra.anova["sum_sq"].to_numpy(), esperado["sum_sq"].to_numpy(),
+                               rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(intra.mse, modelo.mse_resid, rtol=1e-6)
+
+    # Diferencias contra la primera variedad: los coeficientes de ols y su error estándar
+    efectos = intra.effects["Efecto Ajustado"]
+    nombres = [f"C(Variedad_Codigo)[T.{c}]" for c in efectos.index[1:]]
+    np.testing.assert_allclose((efectos.iloc[1:] - efectos.iloc[0]).to_numpy(),
+                               modelo.params[nombres].to_numpy(), rtol=1e-6, atol=1e-8)
+    np.testing.assert_allclose(intra.se_diff, modelo.bse[nombres[0]], rtol=1e-6)
+
+
+def test_intrabloque_none_si_no_es_bibd(panel_desbalanceado):
+    assert fit_intrablock(panel_desbalanceado, *COLS) is None
@@ -0,0 +1,29 @@
+"""Recocido simulado y portafolio paralelo de BIBD."""
+
+import pytest
+
+from conftest import assert_bibd
+from mdex.local_search import anneal_bibd, portfolio_bibd
+
+
+def test_recocido_da_bibd_valido():
+    blocks = anneal_bibd(6, 3, 2, seed=0, max_steps=200_000)[0]
+    assert blocks is not None
+    assert_bibd(blocks, 6, 3, 2)
+
+
+@pytest.mark.parametrize("params", [(7, 3, 1), (9, 3, 2)])
+def test_portafolio_da_bibd_valido_y_reproducible(params):
+    primero = portfolio_bibd(*params, seed=4, workers=3, time_limit=60)
+    assert_bibd(primero["blocks"], *params)
+    assert primero["method"] == "recocido simulado"
+
+    # Mismo ganador (menor época, menor índice) y mismo diseño con la misma semilla
+    segundo = portfolio_bibd(*params, seed=4, workers=3, time_limit=60)
+    assert segundo["blocks"] == primero["blocks"]
+    assert (segundo["stats"]["worker"], segundo["stats"]["epoch"]) == \
+        (primero["stats"]["worker"], primero["stats"]["epoch"])
+
+    # La trayectoria del ganador depende solo de la semilla y su índice
+    solo = anneal_bibd(*params, seed=4, worker=primero["stats"]["worker"])[0]
+    assert solo == primero["blocks"]
@@ -0,0 +1,37 @@
+"""Medias ajustadas (LS-means) desde los coeficientes."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import COLS, as_float64, ols_fit
+from mdex.lsmeans import adjusted_means
+
+
+@pytest.mark.parametrize("panel", ["cata", "panel_desbalanceado"])
+def test_medias_ajustadas_iguales_a_predicciones_promediadas(panel, request):
+    """Mismo cálculo que la versión original de Medias Ajustadas, con su error estándar."""
+    df = as_float64(request.getfixturevalue(panel))
+    data, modelo = ols_fit(df)
+    variedades = sorted(data["Variedad_Codigo"].unique())
+    b = data["Catador_ID"].nunique()
+    nombres = modelo.params.index
+    medias, errores = [], []
+    for variedad in variedades:
+        # Fila media de la matriz de diseño de la variedad con cada catador
+        contraste = np.where(nombres.str.startswith("C(Catador_ID)"), 1.0 / b, 0.0)
+        contraste[nombres.get_loc("Intercept")] = 1.0
+        if f"C(Variedad_Codigo)[T.{variedad}]" in nombres:
+            contraste[nombres.get_loc(f"C(Variedad_Codigo)[T.{variedad}]")] = 1.0
+        # La misma media que predecir para todos los catadores y promediar
+        grid = pd.DataFrame({"Variedad_Codigo": variedad,
+                             "Catador_ID": sorted(data["Catador_ID"].unique())})
+        np.testing.assert_allclose(contraste @ modelo.params.to_numpy(),
+                                   modelo.predict(grid).mean(), rtol=1e-12)
+        medias.append(contraste @ modelo.params.to_numpy())
+        errores.append(np.sqrt(contraste @ modelo.cov_params().to_numpy() @ contraste))
+
+    tabla = adjusted_means(df, *COLS)
+    assert list(tabla["Café"].astype(str)) == variedades
+    np.testing.assert_allclose(tabla["Media Ajustada"], medias, rtol=1e-9)
+    np.testing.assert_allclose(tabla["Error Estándar"], errores, rtol=1e-6)
@@ -0,0 +1,40 @@
+"""Diseños A/D-óptimos por intercambio."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from conftest import assert_bibd
+from mdex.optimal import optimal_design
+
+
+@pytest.mark.parametrize("v,k,b,lam", [(9, 3, 12, 1), (13, 4, 13, 1), (7, 3, 14, 2)])
+def test_optimo_usa_el_bibd_conocido(v, k, b, lam):
+    design = optimal_design(v, k, b, time_limit=5)
+    assert design.a_efficiency == pytest.approx(1.0)
+    assert design.d_efficiency == pytest.approx(1.0)
+    assert design.starts == 0
+    assert_bibd(design.blocks, v, k, lam)
+
+
+def test_optimo_sigue_buscando_hasta_el_limite(monkeypatch):
+    # Reloj falso: avanza un segundo por arranque terminado, así el número de
+    # tandas no depende de la velocidad de la máquina
+    reloj = SimpleNamespace(now=0.0)
+    reloj.monotonic = reloj.perf_counter = lambda: reloj.now
+    monkeypatch.setattr("mdex.optimal.time", reloj)
+    monkeypatch.setattr("mdex.jobs.time", reloj)
+
+    def avanzar(hechos, total):
+        reloj.now += 1
+
+    # (8, 3, 10) no admite un BIBD: sin límite, una sola tanda de 8 arranques
+    corto = optimal_design(8, 3, 10, rounds=2, workers=1, progress=avanzar)
+    assert corto.starts == 8
+
+    # Con 20 s: dos tandas completas y en la tercera se corta entre arranques
+    # en cuanto vence el plazo (arranques en t = 16..20)
+    reloj.now = 0.0
+    largo = optimal_design(8, 3, 10, rounds=2, workers=1, time_limit=20, progress=avanzar)
+    assert largo.starts == 21
+    assert largo.a_efficiency >= corto.a_efficiency
@@ -0,0 +1,29 @@
+"""Pruebas de permutación dentro de catador: reproducibles y con potencia."""
+
+import numpy as np
+
+from conftest import COLS
+from mdex.permutation import permutation_test
+
+
+def test_permutacion_no_depende_del_numero_de_procesos(cata):
+    serie = permutation_test(cata, *COLS, n_perm=999, seed=3, workers=1)
+    paralelo = permutation_test(cata, *COLS, n_perm=999, seed=3, workers=2)
+    assert serie.n_perm == paralelo.n_perm == 999
+    assert serie.p_treatment == paralelo.p_treatment
+    assert serie.p_winner == paralelo.p_winner
+
+
+def test_permutacion_detecta_el_efecto_de_variedad(panel_bibd):
+    res = permutation_test(panel_bibd, *COLS, n_perm=999, seed=0)
+    assert res.p_treatment < 0.01
+    # Sin efecto de variedad el p-valor no es pequeño
+    nulo = panel_bibd.assign(Puntaje_SCA=np.random.default_rng(0).normal(84, 1, len(panel_bibd)))
+    assert permutation_test(nulo, *COLS, n_perm=999, seed=0).p_treatment > 0.01
+
+
+def test_permutacion_informa_progreso(cata):
+    vistos = []
+    permutation_test(cata, *COLS, n_perm=500, seed=0,
+                     progress=lambda done, total: vistos.append((done, total)))
+    assert vistos[-1] == (500, 500)
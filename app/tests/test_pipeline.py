@@ -0,0 +1,64 @@
+"""Análisis por lotes: nombres únicos por archivo y errores aislados."""
+
+import json
+import os
+import shutil
+
+import pandas as pd
+import pytest
+
+from conftest import DATA_PATH
+from mdex.pipeline import analyze_file, expand_inputs, file_names, main, run_batch
+
+
+@pytest.fixture
+def historico(tmp_path):
+    """Mismo nombre de archivo en dos años y un archivo roto."""
+    for year in ("2023", "2024"):
+        os.makedirs(tmp_path / "historico" / year)
+    shutil.copy(DATA_PATH, tmp_path / "historico" / "2023" / "cata.csv")
+    df = pd.read_csv(DATA_PATH)
+    df.assign(Puntaje_SCA=df["Puntaje_SCA"] - 1).to_csv(
+        tmp_path / "historico" / "2024" / "cata.csv", index=False)
+    (tmp_path / "historico" / "2024" / "roto.csv").write_text("Catador_ID,Puntaje_SCA\n1,80\n")
+    return tmp_path / "historico"
+
+
+def test_analyze_file_igual_al_archivo(historico):
+    table, summary = analyze_file(str(historico / "2023" / "cata.csv"))
+    assert summary["estado"] == "ok" and summary["archivo"] == "cata.csv"
+    assert summary["diseno"]["bibd"] and summary["filas_sin_puntaje"] == 0
+    assert list(table["Puesto"]) == list(range(1, len(table) + 1))
+
+
+def test_file_names_relativos_a_la_carpeta_comun(historico):
+    paths = expand_inputs([str(historico / "*" / "*.csv")])
+    assert file_names(paths) == [os.path.join("2023", "cata.csv"),
+                                 os.path.join("2024", "cata.csv"),
+                                 os.path.join("2024", "roto.csv")]
+    assert file_names(paths[:1]) == ["cata.csv"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_run_batch_aisla_errores_y_no_pisa_resumenes(historico, tmp_path, workers):
+    out = tmp_path / f"salida{workers}"
+    output, summaries = run_batch(expand_inputs([str(historico / "*" / "*.csv")]), str(out), workers=workers)
+
+    assert [s["estado"] for s in summaries] == ["ok", "ok", "error"]
+    assert "Faltan columnas" in summaries[2]["error"]
+    for name in ("2023/cata.json", "2024/cata.json", "2024/roto.json"):
+        assert (out / "resumenes" / name).exists()
+    with open(out / "resumenes" / "2024" / "cata.json", encoding="utf-8") as f:
+        assert json.load(f)["ruta"].endswith(os.path.join("2024", "cata.csv"))
+
+    results = pd.read_csv(output)
+    assert set(results["Archivo"]) == {os.path.join("2023", "cata.csv"),
+                                       os.path.join("2024", "cata.csv")}
+    medias = results.groupby("Archivo")["Media Ajustada"].max()
+    assert medias[os.path.join("2023", "cata.csv")] == pytest.approx(
+        medias[os.path.join("2024", "cata.csv")] + 1, abs=1e-4)
+
+
+def test_main_falla_solo_si_fallan_todos(historico, tmp_path):
+    assert main([str(historico / "*" / "*.csv"), "-o", str(tmp_path / "a"), "-j", "1"]) == 0
+    assert main([str(historico / "2024" / "roto.csv"), "-o", str(tmp_path / "b"), "-j", "1"]) == 1
@@ -0,0 +1,61 @@
+"""Medición por etapas y referencia compartida a tracemalloc."""
+
+import gc
+import math
+import tracemalloc
+
+import numpy as np
+
+from mdex import profiling
+from mdex.profiling import Profiler, session_profiler, stage
+
+
+def test_stage_registra_tiempo_y_anidamiento():
+    state = {}
+    perf = session_profiler(state, "prueba")
+    with stage("externa"):
+        with stage("interna"):
+            pass
+    registros = {r.stage: r for r in perf.current_run()}
+    assert registros["interna"].depth == 1 and registros["externa"].depth == 0
+    assert registros["externa"].seconds >= registros["interna"].seconds
+    assert math.isnan(registros["externa"].peak_mb)
+
+
+def test_tracemalloc_se_detiene_cuando_ninguna_sesion_lo_pide():
+    assert not tracemalloc.is_tracing()
+    a, b = {"perf_memoria": True}, {"perf_memoria": True}
+    perf_a = session_profiler(a, "A")
+    perf_b = session_profiler(b, "B")
+    with stage("asignacion"):
+        datos = np.ones(1_000_000)
+    assert perf_b.current_run()[-1].peak_mb >= datos.nbytes / 1024 ** 2 * 0.9
+    assert profiling.tracing_sessions() == 2
+
+    # Volver a ejecutar con la medición activa no suma referencias
+    session_profiler(a, "A")
+    assert profiling.tracing_sessions() == 2
+
+    # A la desactiva: B sigue midiendo
+    a["perf_memoria"] = False
+    session_profiler(a, "A")
+    assert tracemalloc.is_tracing() and profiling.tracing_sessions() == 1
+
+    # B se cierra sin desactivarla: al recolectar su Profiler se detiene
+    del b, perf_b
+    profiling._local.profiler = None
+    gc.collect()
+    assert profiling.tracing_sessions() == 0
+    assert not tracemalloc.is_tracing()
+    assert perf_a.memory is False
+
+
+def test_no_detiene_un_tracemalloc_ajeno():
+    tracemalloc.start()
+    try:
+        perf = Profiler()
+        perf.trace_memory(True)
+        perf.trace_memory(False)
+        assert tracemalloc.is_tracing()
+    finally:
+        tracemalloc.stop()
@@ -0,0 +1,23 @@
+"""Búsqueda exacta de BIBD por cobertura con conjuntos de bits."""
+
+import pytest
+
+from conftest import assert_bibd
+from mdex.search import exact_cover_bibd
+
+
+@pytest.mark.parametrize("params", [(5, 3, 3), (6, 3, 2), (10, 4, 2), (9, 4, 3), (7, 3, 1)])
+def test_busqueda_exacta_da_bibd_valido(params):
+    blocks, stats = exact_cover_bibd(*params)
+    assert blocks is not None, stats
+    assert_bibd(blocks, *params)
+
+
+def test_busqueda_exacta_informa_progreso_y_presupuesto():
+    vistos = []
+    blocks, stats = exact_cover_bibd(10, 4, 2, progress=lambda done, total: vistos.append(done))
+    assert blocks is not None and stats["nodes"] > 0
+    assert vistos == sorted(vistos)
+    # Sin presupuesto suficiente termina sin diseño en vez de colgarse
+    blocks, stats = exact_cover_bibd(15, 5, 2, max_nodes=50)
+    assert blocks is None and stats["nodes"] <= 50 + 1
@@ -0,0 +1,41 @@
+"""Almacén compartido: deduplicación por contenido y por bytes subidos."""
+
+import io
+
+from conftest import DATA_PATH
+from mdex.ingest import read_tasting_file
+from mdex.store import DatasetStore
+
+
+def _subida(nombre):
+    archivo = io.BytesIO(open(DATA_PATH, "rb").read())
+    archivo.name = nombre
+    return archivo
+
+
+def test_misma_subida_no_se_vuelve_a_leer(tmp_path):
+    store = DatasetStore(spill_dir=str(tmp_path))
+    lecturas = []
+
+    def leer(archivo):
+        lecturas.append(archivo.name)
+        return read_tasting_file(archivo)
+
+    primero = store.put_upload(_subida("a.csv"), leer)
+    segundo = store.put_upload(_subida("b.csv"), leer)
+    assert lecturas == ["a.csv"]
+    assert segundo.key == primero.key and segundo.name == "b.csv"
+    assert store.get(segundo.key) is store.get(primero.key)
+
+    store.clear()
+    store.put_upload(_subida("a.csv"), leer)
+    assert lecturas == ["a.csv", "a.csv"]
+
+
+def test_desalojo_a_disco_y_recarga(tmp_path, cata):
+    store = DatasetStore(max_bytes=1, spill_dir=str(tmp_path))
+    handle = store.put(cata, "cata.csv")
+    otro = store.put(cata.iloc[:10].reset_index(drop=True), "parcial.csv")
+    assert handle.key in store._spilled and otro.key in store._memory
+    recargado = store.get(handle.key)
+    assert recargado.equals(cata)